@@ -0,0 +1,49 @@
+"""Microbenchmark for building flashcards from Anki note JSON.
+
+Measures LanguageFlashcard.from_anki_json, one note at a time, and
+from_anki_json_batch on a synthetic deck from the fake Anki.
+
+Usage:
+    poetry run python benchmarks/from_anki_json.py --notes 50000
+"""
+
+import argparse
+import gc
+import time
+from typing import Callable
+
+from tutor.llm.models import LanguageFlashcard
+from tutor.utils.fake_anki import FakeAnkiCollection
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    collection = FakeAnkiCollection()
+    collection.seed(args.notes)
+    note_infos = collection.handle("notesInfo", {"notes": list(collection.notes)})
+    del collection
+    gc.collect()
+    gc.freeze()
+
+    cases = {
+        "single": lambda: [LanguageFlashcard.from_anki_json(n) for n in note_infos],
+        "batch": lambda: LanguageFlashcard.from_anki_json_batch(note_infos),
+    }
+    for name, run in cases.items():
+        best = min(_time(run) for _ in range(args.repeat))
+        print(f"{name:>8}: {len(note_infos) / best:>10,.0f} notes/sec ({best:.2f}s)")
+
+
+def _time(run: Callable[[], object]) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Microbenchmark for parsing the Related Words field.
+
+Compares the previous split-based parser with RelatedWordsParser, one note at
+a time and in batch, on the Related Words of a synthetic deck.
+
+Usage:
+    poetry run python benchmarks/related_words.py --notes 50000
+"""
+
+import argparse
+import gc
+import time
+from typing import Callable, List
+
+from tutor.llm.models import MandarinRelatedWord
+from tutor.llm.related_words import RelatedWordsParser
+from tutor.utils.fake_anki import FakeAnkiCollection
+
+
+def legacy_parse_related_words(related_words_text: str) -> List[MandarinRelatedWord]:
+    """The split-based parser RelatedWordsParser replaced."""
+    related_words = []
+    for line in related_words_text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("•") or line.startswith("-"):
+            line = line[1:].strip()
+        try:
+            word_part, rest = line.split("(", 1)
+            pronunciation_part, rest = rest.split(")", 1)
+            rest = rest.strip()
+            if rest.startswith("-"):
+                rest = rest[1:].strip()
+            english_part, relationship_part = rest.split("[", 1)
+            relationship_part = relationship_part.rstrip("]").strip()
+            related_words.append(
+                MandarinRelatedWord(
+                    word=word_part.strip(),
+                    english=english_part.strip(),
+                    relationship=relationship_part,
+                    pinyin=pronunciation_part.strip(),
+                )
+            )
+        except (ValueError, IndexError):
+            continue
+    return related_words
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    collection = FakeAnkiCollection()
+    collection.seed(args.notes, cantonese_fraction=0)
+    texts = [note["fields"]["Related Words"] for note in collection.notes.values()]
+    del collection
+    # Keep the fixture out of the garbage collector's way, so that every case
+    # pays the same collection costs
+    gc.collect()
+    gc.freeze()
+
+    parser = RelatedWordsParser(MandarinRelatedWord, "pinyin")
+    cases = {
+        "legacy": lambda: [legacy_parse_related_words(text) for text in texts],
+        "parser": lambda: [parser.parse(text) for text in texts],
+        "parser, batch": lambda: parser.parse_many(texts),
+    }
+    for name, run in cases.items():
+        best = min(_time(run) for _ in range(args.repeat))
+        print(f"{name:>15}: {len(texts) / best:>10,.0f} notes/sec ({best:.2f}s)")
+
+
+def _time(run: Callable[[], object]) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import click
+from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
 from tutor.commands.generate_topics import (
@@ -12,9 +14,22 @@ from tutor.commands.run_web import run_web
 from tutor.commands.setup_anki import setup_anki
 from tutor.commands.fix_cards import fix_cards
 from tutor.commands.config import config
+from tutor.commands.sync import sync
+from tutor.commands.fake_anki import fake_anki
+from tutor.commands.batch import batch
+from tutor.commands.stats import stats
 from tutor.llm_flashcards import GPT_3_5_TURBO, GPT_4, GPT_4o
+from tutor.llm.client import format_usage_summary
+from tutor.utils.cassette import RECORD, REPLAY, Cassette, LatencyModel, set_cassette
 
-from tutor.cli_global_state import set_debug, set_model, set_skip_confirm
+from tutor.cli_global_state import (
+    set_command,
+    set_debug,
+    set_model,
+    set_refresh_cache,
+    set_skip_confirm,
+    set_use_cache,
+)
 
 load_dotenv()
 
@@ -32,11 +47,94 @@ load_dotenv()
     default=False,
     help="Skip confirmation for commands",
 )
-def main(model: str, debug: bool, skip_confirm: bool) -> None:
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse cached LLM responses for prompts already sent",
+)
+@click.option(
+    "--refresh",
+    is_flag=True,
+    default=False,
+    help="Ignore cached LLM responses, replacing them with fresh ones",
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Record OpenAI, Azure TTS and AnkiConnect calls to this cassette file",
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Answer OpenAI, Azure TTS and AnkiConnect calls from this cassette file",
+)
+@click.option(
+    "--replay-latency",
+    default="recorded",
+    show_default=True,
+    help="How long replayed calls take: 'recorded', 'none', seconds for "
+    "every call, or seconds per kind of call, e.g. 'openai=2,tts=0.5,anki=0.01'",
+)
+def main(
+    model: str,
+    debug: bool,
+    skip_confirm: bool,
+    cache: bool,
+    refresh: bool,
+    record: Optional[Path],
+    replay: Optional[Path],
+    replay_latency: str,
+) -> None:
     """chinese-tutor tool"""
+    ctx = click.get_current_context()
+    ctx.call_on_close(_print_llm_usage)
+    set_command(_get_command_name(ctx.invoked_subcommand))
     set_model(model)
     set_debug(debug)
     set_skip_confirm(skip_confirm)
+    set_use_cache(cache)
+    set_refresh_cache(refresh)
+
+    if record and replay:
+        raise click.UsageError("Use only one of --record and --replay")
+    cassette = None
+    if record or replay:
+        try:
+            latency = LatencyModel.parse(replay_latency)
+        except ValueError:
+            raise click.BadParameter(
+                f"'{replay_latency}' is not a latency model",
+                param_hint="--replay-latency",
+            )
+        cassette = Cassette(record or replay, RECORD if record else REPLAY, latency)
+        # Cached LLM responses would hide the calls from the cassette
+        set_use_cache(False)
+        ctx.call_on_close(lambda: _print_cassette_summary(cassette))
+    set_cassette(cassette)
+
+
+def _get_command_name(name: str) -> str:
+    """The full name of a command, rather than its shortcut (e.g. "g")."""
+    command = main.commands.get(name)
+    names = [n for n, c in main.commands.items() if c is command]
+    return max(names, key=len, default=name)
+
+
+def _print_cassette_summary(cassette: Cassette) -> None:
+    verb = "Recorded" if cassette.mode == RECORD else "Replayed"
+    click.secho(
+        f"{verb} {cassette.count} call(s) with {cassette.path}",
+        fg="bright_black",
+        err=True,
+    )
+
+
+def _print_llm_usage() -> None:
+    summary = format_usage_summary()
+    if summary:
+        click.secho(summary, fg="bright_black", err=True)
 
 
 # Add generate_flashcard_from_word command and shortcut
@@ -54,6 +152,10 @@ main.add_command(run_web, name="web")
 main.add_command(setup_anki, name="setup-anki")
 main.add_command(fix_cards, name="fix-cards")
 main.add_command(list_lesser_known_cards, name="list-lesser-known-cards")
+main.add_command(sync, name="sync")
+main.add_command(fake_anki, name="fake-anki")
+main.add_command(batch, name="batch")
+main.add_command(stats, name="stats")
 main.add_command(generate_topics_prompt, name="generate-topics-prompt")
 main.add_command(select_conversation_topic, name="select-conversation-topic")
 main.add_command(config, name="config")
@@ -1,9 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 __GLOBAL_STATE: Dict[str, Any] = {}
 __MODEL: str = "__MODEL"
 __DEBUG: str = "__DEBUG"
 __SKIP_CONFIRM: str = "__SKIP_CONFIRM"
+__USE_CACHE: str = "__USE_CACHE"
+__REFRESH_CACHE: str = "__REFRESH_CACHE"
+__COMMAND: str = "__COMMAND"
 
 
 def set_model(model: str) -> None:
@@ -28,3 +31,27 @@ def set_skip_confirm(skip: bool) -> None:
 
 def get_skip_confirm() -> bool:
     return __GLOBAL_STATE.get(__SKIP_CONFIRM, False)
+
+
+def set_use_cache(use_cache: bool) -> None:
+    __GLOBAL_STATE[__USE_CACHE] = use_cache
+
+
+def get_use_cache() -> bool:
+    return __GLOBAL_STATE.get(__USE_CACHE, True)
+
+
+def set_refresh_cache(refresh: bool) -> None:
+    __GLOBAL_STATE[__REFRESH_CACHE] = refresh
+
+
+def get_refresh_cache() -> bool:
+    return __GLOBAL_STATE.get(__REFRESH_CACHE, False)
+
+
+def set_command(command: str) -> None:
+    __GLOBAL_STATE[__COMMAND] = command
+
+
+def get_command() -> Optional[str]:
+    return __GLOBAL_STATE.get(__COMMAND)
@@ -0,0 +1,137 @@
+import click
+import time
+from typing import Optional
+from tutor.cli_global_state import set_model
+from tutor.commands.fix_cards import _fix_cards_impl
+from tutor.llm.batch_jobs import (
+    APPLIED,
+    COMPLETED,
+    SUBMITTED,
+    BatchJob,
+    BatchJobStore,
+    get_batch_backend,
+    get_batch_responses_by_prompt,
+    refresh_batch_job,
+)
+
+
+@click.group()
+def batch() -> None:
+    """Manage offline batch jobs (submitted with `ct fix-cards --batch`)."""
+
+
+@batch.command(name="list")
+def list_jobs() -> None:
+    """List batch jobs and their status."""
+    jobs = BatchJobStore().list()
+    if not jobs:
+        click.echo("No batch jobs")
+    for job in jobs:
+        click.echo(_describe_job(job))
+
+
+@batch.command()
+@click.argument("job_id", required=False)
+def status(job_id: Optional[str]) -> None:
+    """Check on JOB_ID (or every pending job), downloading finished results."""
+    click.echo(_status_impl(job_id))
+
+
+@batch.command()
+@click.argument("job_id")
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Show what would be updated without making changes",
+)
+def apply(job_id: str, dry_run: bool = False) -> None:
+    """Update the cards of completed job JOB_ID with its results."""
+    click.echo(_apply_impl(job_id, dry_run))
+
+
+def _describe_job(job: BatchJob) -> str:
+    created = time.strftime("%Y-%m-%d %H:%M", time.localtime(job.created_at))
+    description = (
+        f"{job.job_id}: {job.status}, {len(job.prompts)} request(s) "
+        f"on {job.backend} with {job.model}, created {created}"
+    )
+    if job.errors:
+        description += f", {len(job.errors)} failed"
+    return description
+
+
+def _status_impl(job_id: Optional[str] = None) -> str:
+    """Implementation of the batch status command.
+
+    Args:
+        job_id: The job to check on, or None for every submitted job
+
+    Returns:
+        The status of the jobs
+    """
+    store = BatchJobStore()
+    if job_id:
+        jobs = [store.load(job_id)]
+    else:
+        jobs = [job for job in store.list() if job.status == SUBMITTED]
+        if not jobs:
+            return "No pending batch jobs"
+
+    lines = []
+    for job in jobs:
+        job = refresh_batch_job(store, job, get_batch_backend(job.backend))
+        lines.append(_describe_job(job))
+        if job.status == COMPLETED:
+            lines.append(f"  Update the cards with: ct batch apply {job.job_id}")
+    return "\n".join(lines)
+
+
+def _apply_impl(job_id: str, dry_run: bool = False) -> str:
+    """Implementation of the batch apply command.
+
+    Runs fix-cards on the job's notes with the job's model, taking new content
+    only from the job's results, so no LLM calls are made. Notes without a
+    result, e.g. because their request failed in the batch, are left for a
+    normal fix-cards run.
+
+    Args:
+        job_id: The job to apply
+        dry_run: If True, show what would be updated without making changes
+
+    Returns:
+        A summary of what was updated
+    """
+    store = BatchJobStore()
+    job = store.load(job_id)
+    job = refresh_batch_job(store, job, get_batch_backend(job.backend))
+    if job.status not in (COMPLETED, APPLIED):
+        return f"Batch job {job.job_id} is {job.status}, nothing to apply yet"
+
+    note_ids = [
+        note_id
+        for note_id in job.metadata["note_ids"]
+        if f"note-{note_id}" in job.responses
+    ]
+    if not note_ids:
+        return f"Batch job {job.job_id} has no results to apply"
+
+    set_model(job.model)
+    result = _fix_cards_impl(
+        job.metadata["deck"],
+        dry_run=dry_run,
+        force_update=job.metadata.get("force_update", False),
+        note_ids=note_ids,
+        responses=get_batch_responses_by_prompt(job),
+    )
+    if not dry_run:
+        job.status = APPLIED
+        store.save(job)
+
+    skipped = len(job.metadata["note_ids"]) - len(note_ids)
+    if skipped:
+        result += (
+            f"\nCards without a batch result (not updated): {skipped}. "
+            "Run `ct fix-cards` to regenerate them."
+        )
+    return result
@@ -0,0 +1,61 @@
+import click
+from tutor.utils.fake_anki import (
+    DEFAULT_FAKE_ANKI_PORT,
+    DEFAULT_SYNTHETIC_DECK,
+    FakeAnkiCollection,
+    FakeAnkiServer,
+)
+
+
+@click.command()
+@click.option(
+    "--port", default=DEFAULT_FAKE_ANKI_PORT, help="Port to run the server on"
+)
+@click.option("--notes", type=int, default=0, help="Number of synthetic notes to seed")
+@click.option(
+    "--deck", default=DEFAULT_SYNTHETIC_DECK, help="Deck to seed the notes into"
+)
+@click.option(
+    "--cantonese-fraction",
+    type=float,
+    default=0.2,
+    help="Share of the synthetic notes that are Cantonese",
+)
+@click.option(
+    "--latency",
+    type=float,
+    default=0.0,
+    help="Milliseconds added to every request, to mimic a busy Anki",
+)
+@click.option("--seed", type=int, default=0, help="Random seed for the notes")
+def fake_anki(
+    port: int,
+    notes: int,
+    deck: str,
+    cantonese_fraction: float,
+    latency: float,
+    seed: int,
+) -> None:
+    """Run a fake AnkiConnect server for testing and benchmarking.
+
+    Point commands at it with ANKI_CONNECT_URL, e.g.
+    ANKI_CONNECT_URL=http://127.0.0.1:8765 ./ct fix-cards --deck "DECK" --dry-run
+    """
+    collection = FakeAnkiCollection()
+    collection.ensure_models()
+    if notes:
+        click.echo(f"Seeding {notes} synthetic notes into '{deck}'...")
+        collection.seed(
+            notes, deck=deck, cantonese_fraction=cantonese_fraction, seed=seed
+        )
+
+    server = FakeAnkiServer(collection, port=port, latency=latency / 1000)
+    click.secho(f"Fake AnkiConnect listening on {server.address}", fg="green")
+    click.echo(f"Use it with: ANKI_CONNECT_URL={server.address} ./ct ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        click.echo(f"Handled {server.request_count} requests.")
@@ -1,7 +1,8 @@
 import click
-from typing import Optional
-from tutor.llm.models import ChineseFlashcard
-from tutor.utils.anki import AnkiConnectClient
+from typing import Dict, List, Optional, Tuple
+from tutor.llm.models import ChineseFlashcard, LanguageFlashcard
+from tutor.utils.anki import AnkiBatch, AnkiConnectClient
+from tutor.utils.note_table import NoteTable
 from tutor.llm_flashcards import (
     generate_flashcards,
 )
@@ -9,6 +10,14 @@ from tutor.utils.logging import dprint
 from tutor.llm.prompts import get_generate_flashcard_from_word_prompt
 from tutor.utils.azure import text_to_speech
 from tutor.utils.config import get_config
+from tutor.cli_global_state import get_model
+from tutor.llm.batch_jobs import (
+    BATCH_BACKENDS,
+    BatchJobStore,
+    OpenAIBatchBackend,
+    get_batch_backend,
+    submit_batch_job,
+)
 
 
 @click.command()
@@ -31,27 +40,55 @@ from tutor.utils.config import get_config
     default=False,
     help="Force update all cards even if they have all required fields",
 )
+@click.option(
+    "--batch",
+    is_flag=True,
+    default=False,
+    help="Submit the card content to generate as an offline batch job instead "
+    "(see `ct batch`)",
+)
+@click.option(
+    "--batch-backend",
+    type=click.Choice(list(BATCH_BACKENDS)),
+    default=OpenAIBatchBackend.name,
+    help="Where to run the batch job",
+)
 def fix_cards(
     deck: Optional[str],
     dry_run: bool = False,
     limit: Optional[int] = None,
     force_update: bool = False,
+    batch: bool = False,
+    batch_backend: str = OpenAIBatchBackend.name,
 ) -> None:
     """Fix all cards in a deck by regenerating them with latest features.
 
     Only regenerates audio if the sample usage changes.
+
+    With --batch, the prompts for all cards needing new content are submitted
+    as one batch job, which is cheaper for large decks. Check on it with
+    `ct batch status`, and update the cards with `ct batch apply` once done.
     """
     # Use default deck from config if not specified
     deck = deck or get_config().default_deck
-    result = _fix_cards_impl(deck, dry_run, limit, force_update)
+    if batch:
+        result = _submit_fix_cards_batch(deck, limit, force_update, batch_backend)
+    else:
+        result = _fix_cards_impl(deck, dry_run, limit, force_update)
     click.echo(result)
 
 
+# Number of cards whose fields are fetched and whose updates are sent together
+CHUNK_SIZE = 50
+
+
 def _fix_cards_impl(
     deck: str,
     dry_run: bool = False,
     limit: Optional[int] = None,
     force_update: bool = False,
+    note_ids: Optional[List[int]] = None,
+    responses: Optional[Dict[str, str]] = None,
 ) -> str:
     """Implementation of fix_cards command.
 
@@ -60,22 +97,25 @@ def _fix_cards_impl(
         dry_run: If True, show what would be updated without making changes
         limit: Maximum number of cards to process
         force_update: Force update all cards even if they have all required fields
+        note_ids: Only fix these notes of the deck (e.g. those of a batch job)
+        responses: Generated responses by prompt (e.g. a batch job's results).
+            If given, only cards whose prompt has a response get new content;
+            no LLM calls are made for the others.
 
     Returns:
         A summary of what was updated
     """
     ankiconnect_client = AnkiConnectClient()
 
-    # Get all cards in the deck
-    # Escape colons in deck name for Anki's query syntax
-    deck_query = f'deck:"{deck}"'
-    cards = ankiconnect_client.find_notes(deck_query)
-    if not cards:
+    # Only fetch IDs up front; note details are streamed in chunks below
+    if note_ids is None:
+        note_ids = _find_deck_note_ids(ankiconnect_client, deck)
+    if not note_ids:
         return f"No cards found in deck: {deck}"
 
-    total_cards = len(cards)
+    total_cards = len(note_ids)
     if limit:
-        cards = cards[:limit]
+        note_ids = note_ids[:limit]
         print(f"Found {total_cards} cards in deck: {deck}, processing first {limit}")
     else:
         print(f"Found {total_cards} cards in deck: {deck}")
@@ -84,124 +124,65 @@ def _fix_cards_impl(
         print("DRY RUN: No changes will be made")
 
     stats = {
-        "total": len(cards),
+        "total": len(note_ids),
         "updated": 0,
         "audio_updated": 0,
         "skipped": 0,  # Cards that don't need updates
+        "malformed_related_words": 0,  # Cards with unparseable related words
     }
 
-    for i, card in enumerate(cards, 1):
-        try:
-            print(f"\nProcessing card {i}/{len(cards)}: {card.word}")
-
-            # Check if card needs content updates
-            needs_content_update = False
-            needs_audio_only = False
-            reasons = []
-            fields = ankiconnect_client.get_note_fields(card.anki_note_id)
-
-            # Get content and audio fields using the new methods
-            content_fields = ChineseFlashcard.get_content_fields()
-            audio_fields = ChineseFlashcard.get_audio_fields()
-
-            # Check content fields
-            for field in content_fields:
-                if field not in fields or not fields[field]:
-                    needs_content_update = True
-                    reasons.append(f"missing {field}")
-
-            # Check audio fields separately
-            for field in audio_fields:
-                if field not in fields or not fields[field]:
-                    needs_audio_only = True
-                    reasons.append(f"missing {field}")
-
-            # Force update if requested
-            if force_update:
-                needs_content_update = True
-                reasons.append("force update requested")
-
-            # Skip if both content and audio are up to date
-            if not needs_content_update and not needs_audio_only:
-                print("Card is up to date, skipping...")
-                stats["skipped"] += 1
-                continue
-
-            print(f"Updates needed: {', '.join(reasons)}")
-
-            # Generate new card content only if needed
-            if needs_content_update:
-                prompt = get_generate_flashcard_from_word_prompt(card.word)
-                dprint(prompt)
-                flashcards = generate_flashcards(prompt)
-                dprint(flashcards)
-                new_card = flashcards.flashcards[0]
-            else:
-                # Use existing card data if only audio needs updating
-                new_card = card
-
-            # Check if we need to update audio
-            need_sample_audio = (
-                force_update
-                or "Sample Usage (Audio)" not in fields
-                or not fields["Sample Usage (Audio)"]
-                or card.sample_usage != new_card.sample_usage
-            )
-            need_word_audio = (
-                force_update
-                or "Word (Audio)" not in fields
-                or not fields["Word (Audio)"]
-                or card.word != new_card.word
-            )
+    # Work through the cards in chunks: one notesInfo request fetches a whole
+    # chunk, and the chunk's updates are flushed as `multi` requests. Cards are
+    # classified from a compact NoteTable; full flashcards are only built for
+    # the cards that need updating.
+    i = 0
+    for note_infos in ankiconnect_client.iter_note_info_chunks(note_ids, CHUNK_SIZE):
+        table = NoteTable.from_note_infos(note_infos)
+        batch = ankiconnect_client.batch()
+        pending_cards = []
 
-            if need_sample_audio:
-                print("Sample usage changed, will regenerate audio:")
-                print(f"Old: {card.sample_usage}")
-                print(f"New: {new_card.sample_usage}")
-
-            if need_word_audio:
-                print("Word audio will be generated")
-
-            if not dry_run:
-                # Generate audio files as needed
-                sample_usage_audio_filepath = None
-                word_audio_filepath = None
-
-                if need_sample_audio:
-                    sample_usage_audio_filepath = text_to_speech(
-                        new_card.sample_usage, new_card.LANGUAGE
-                    )
-
-                if need_word_audio:
-                    word_audio_filepath = text_to_speech(
-                        new_card.word, new_card.LANGUAGE
-                    )
-
-                ankiconnect_client.update_flashcard(
-                    card.anki_note_id,
-                    new_card,
-                    sample_usage_audio_filepath=sample_usage_audio_filepath,
-                    word_audio_filepath=word_audio_filepath,
+        for row in table:
+            i += 1
+            word = table.word(row)
+            try:
+                print(f"\nProcessing card {i}/{len(note_ids)}: {word}")
+                fields = table.fields(row)
+                if malformed_lines := _get_malformed_related_words(fields):
+                    stats["malformed_related_words"] += 1
+                    print(f"Related words that cannot be parsed: {malformed_lines}")
+                needs_content_update, needs_audio_only, reasons = _get_update_reasons(
+                    fields, force_update
                 )
-                stats["updated"] += 1
-                if need_sample_audio or need_word_audio:
-                    stats["audio_updated"] += 1
-            else:
-                print("Would update card with:")
-                print(new_card)
-                if need_sample_audio:
-                    print("Would regenerate sample usage audio")
-                if need_word_audio:
-                    print("Would regenerate word audio")
-                stats["updated"] += 1
-                if need_sample_audio or need_word_audio:
-                    stats["audio_updated"] += 1
-        except Exception as e:
-            print(f"Error processing card {card.word}: {e}")
-            # Fail fast on errors
-            raise Exception(
-                f"Failed to process card {card.word}. Fix any issues and try again."
-            )
+                # Skip if both content and audio are up to date
+                if not needs_content_update and not needs_audio_only:
+                    print("Card is up to date, skipping...")
+                    stats["skipped"] += 1
+                    continue
+
+                print(f"Updates needed: {', '.join(reasons)}")
+                card = table.to_flashcard(row)
+                if _fix_card(
+                    ankiconnect_client,
+                    card,
+                    fields,
+                    needs_content_update,
+                    stats,
+                    dry_run,
+                    force_update,
+                    batch,
+                    responses,
+                ):
+                    pending_cards.append(card)
+            except Exception as e:
+                print(f"Error processing card {word}: {e}")
+                # Keep the updates already made for earlier cards in the chunk
+                _flush_updates(batch, pending_cards)
+                # Fail fast on errors
+                raise Exception(
+                    f"Failed to process card {word}. Fix any issues and try again."
+                )
+
+        _flush_updates(batch, pending_cards)
 
     # Generate summary
     summary = [
@@ -211,8 +192,251 @@ def _fix_cards_impl(
         f"Cards skipped (up to date): {stats['skipped']}",
         f"Audio files regenerated: {stats['audio_updated']}",
     ]
+    if stats["malformed_related_words"]:
+        summary.append(
+            "Cards with related words that cannot be parsed (left as is): "
+            f"{stats['malformed_related_words']}"
+        )
 
     if dry_run:
         summary.insert(1, "DRY RUN - No changes were made")
 
     return "\n".join(summary)
+
+
+def _find_deck_note_ids(ankiconnect_client: AnkiConnectClient, deck: str) -> List[int]:
+    # Escape colons in deck name for Anki's query syntax
+    deck_query = f'deck:"{deck}"'
+    return ankiconnect_client.find_note_ids(deck_query)
+
+
+def _submit_fix_cards_batch(
+    deck: str,
+    limit: Optional[int] = None,
+    force_update: bool = False,
+    backend_name: str = OpenAIBatchBackend.name,
+) -> str:
+    """Submit a batch job generating new content for the cards that need it.
+
+    Cards are classified as in _fix_cards_impl, but instead of generating
+    content one card at a time, the prompts of all cards needing new content
+    are submitted together. Cards that only need audio are left for a normal
+    fix-cards run, as they need no LLM calls.
+
+    Returns:
+        A summary of the submitted job
+    """
+    ankiconnect_client = AnkiConnectClient()
+    note_ids = _find_deck_note_ids(ankiconnect_client, deck)
+    if limit:
+        note_ids = note_ids[:limit]
+
+    prompts = {}
+    job_note_ids = []
+    for note_infos in ankiconnect_client.iter_note_info_chunks(note_ids, CHUNK_SIZE):
+        table = NoteTable.from_note_infos(note_infos)
+        for row in table:
+            needs_content_update, _, _ = _get_update_reasons(
+                table.fields(row), force_update
+            )
+            if needs_content_update:
+                note_id = table.note_ids[row]
+                prompts[f"note-{note_id}"] = get_generate_flashcard_from_word_prompt(
+                    table.word(row)
+                )
+                job_note_ids.append(note_id)
+
+    if not prompts:
+        return f"No cards in deck '{deck}' need new content, nothing to submit"
+
+    job = submit_batch_job(
+        BatchJobStore(),
+        get_batch_backend(backend_name),
+        prompts,
+        get_model(),
+        metadata={
+            "command": "fix-cards",
+            "deck": deck,
+            "force_update": force_update,
+            "note_ids": job_note_ids,
+        },
+    )
+    return "\n".join(
+        [
+            f"Submitted batch job {job.job_id} for {len(prompts)} card(s) "
+            f"in deck '{deck}'",
+            f"Check on it with: ct batch status {job.job_id}",
+            f"Once complete, update the cards with: ct batch apply {job.job_id}",
+        ]
+    )
+
+
+def _get_update_reasons(
+    fields: Dict[str, str], force_update: bool
+) -> Tuple[bool, bool, List[str]]:
+    """Work out which updates a card needs from its Anki field values.
+
+    Returns:
+        (needs content update, needs audio update, human-readable reasons)
+    """
+    needs_content_update = False
+    needs_audio_only = False
+    reasons = []
+
+    # Get content and audio fields using the new methods
+    content_fields = ChineseFlashcard.get_content_fields()
+    audio_fields = ChineseFlashcard.get_audio_fields()
+
+    # Check content fields
+    for field in content_fields:
+        if field not in fields or not fields[field]:
+            needs_content_update = True
+            reasons.append(f"missing {field}")
+
+    # Check audio fields separately
+    for field in audio_fields:
+        if field not in fields or not fields[field]:
+            needs_audio_only = True
+            reasons.append(f"missing {field}")
+
+    # Force update if requested
+    if force_update:
+        needs_content_update = True
+        reasons.append("force update requested")
+
+    return needs_content_update, needs_audio_only, reasons
+
+
+def _get_malformed_related_words(fields: Dict[str, str]) -> List[str]:
+    """Get the lines of a card's Related Words field that cannot be parsed.
+
+    These are only reported: they are often hand edits, which regenerating the
+    card would overwrite.
+    """
+    return (
+        ChineseFlashcard.related_words_parser()
+        .parse(fields.get("Related Words", ""))
+        .malformed_lines
+    )
+
+
+def _fix_card(
+    ankiconnect_client: AnkiConnectClient,
+    card: LanguageFlashcard,
+    fields: Dict[str, str],
+    needs_content_update: bool,
+    stats: Dict[str, int],
+    dry_run: bool,
+    force_update: bool,
+    batch: AnkiBatch,
+    responses: Optional[Dict[str, str]] = None,
+) -> bool:
+    """Update a single card that needs fixing, queueing the update on the batch.
+
+    Args:
+        responses: If given, the only generated content to use, by prompt
+
+    Returns:
+        True if an update was queued on the batch
+    """
+    # Generate new card content only if needed
+    if needs_content_update:
+        prompt = get_generate_flashcard_from_word_prompt(card.word)
+        dprint(prompt)
+        if responses is not None and prompt not in responses:
+            # E.g. the word was edited after the batch job was submitted
+            print(f"No generated content for '{card.word}', skipping")
+            stats["skipped"] += 1
+            return False
+        flashcards = generate_flashcards(prompt, responses=responses)
+        dprint(flashcards)
+        if not flashcards:
+            raise Exception(f"Failed to generate a flashcard for '{card.word}'")
+        new_card = flashcards[0]
+    else:
+        # Use existing card data if only audio needs updating
+        new_card = card
+
+    # Check if we need to update audio
+    need_sample_audio = (
+        force_update
+        or "Sample Usage (Audio)" not in fields
+        or not fields["Sample Usage (Audio)"]
+        or card.sample_usage != new_card.sample_usage
+    )
+    need_word_audio = (
+        force_update
+        or "Word (Audio)" not in fields
+        or not fields["Word (Audio)"]
+        or card.word != new_card.word
+    )
+
+    if need_sample_audio:
+        print("Sample usage changed, will regenerate audio:")
+        print(f"Old: {card.sample_usage}")
+        print(f"New: {new_card.sample_usage}")
+
+    if need_word_audio:
+        print("Word audio will be generated")
+
+    if dry_run:
+        print("Would update card with:")
+        print(new_card)
+        if need_sample_audio:
+            print("Would regenerate sample usage audio")
+        if need_word_audio:
+            print("Would regenerate word audio")
+        _count_update(stats, need_sample_audio or need_word_audio)
+        return False
+
+    # Generate audio files as needed
+    sample_usage_audio_filepath = None
+    word_audio_filepath = None
+
+    if need_sample_audio:
+        sample_usage_audio_filepath = text_to_speech(
+            new_card.sample_usage, new_card.LANGUAGE
+        )
+
+    if need_word_audio:
+        word_audio_filepath = text_to_speech(new_card.word, new_card.LANGUAGE)
+
+    if not ankiconnect_client.update_flashcard(
+        card.anki_note_id,
+        new_card,
+        sample_usage_audio_filepath=sample_usage_audio_filepath,
+        word_audio_filepath=word_audio_filepath,
+        batch=batch,
+        current_fields=fields,
+    ):
+        # The regenerated card matches the note exactly
+        print("No fields changed, nothing to write")
+        stats["skipped"] += 1
+        return False
+    _count_update(stats, need_sample_audio or need_word_audio)
+    return True
+
+
+def _count_update(stats: Dict[str, int], audio_updated: bool) -> None:
+    stats["updated"] += 1
+    if audio_updated:
+        stats["audio_updated"] += 1
+
+
+def _flush_updates(batch: AnkiBatch, cards: List[LanguageFlashcard]) -> None:
+    """Send the queued updates and fail fast if any of them were rejected."""
+    results = batch.flush()
+    if not results:
+        return
+
+    for pending in results:
+        if pending.error:
+            note_id = pending.params["note"]["id"]
+            word = next(
+                (card.word for card in cards if card.anki_note_id == note_id),
+                note_id,
+            )
+            print(f"Error updating card {word}: {pending.error}")
+            raise Exception(
+                f"Failed to process card {word}. Fix any issues and try again."
+            )
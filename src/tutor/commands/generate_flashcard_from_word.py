@@ -1,14 +1,14 @@
 import click
 import sys
-from typing import List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from tutor.utils.anki import AnkiConnectClient
+from tutor.utils.deck_mirror import DeckMirror
 from tutor.llm_flashcards import (
-    generate_flashcards,
+    generate_flashcards_for_words,
     maybe_add_flashcards_to_deck,
-    get_word_exists_query,
 )
-from tutor.llm.prompts import get_generate_flashcard_from_word_prompt
 from tutor.utils.logging import dprint
 from tutor.utils.config import get_config
 from tutor.language_processing import LanguagePreprocessor
@@ -34,8 +34,25 @@ def read_words_from_stdin() -> List[str]:
     default=None,
     help="Language for the flashcard (defaults to config setting)",
 )
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Generate flashcards for this many words per OpenAI request",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of OpenAI requests to run concurrently",
+)
 def generate_flashcard_from_word(
-    deck: Optional[str], language: Optional[str], words: Tuple[str, ...]
+    deck: Optional[str],
+    language: Optional[str],
+    batch_size: int,
+    jobs: int,
+    words: Tuple[str, ...],
 ) -> None:
     """Add new Anki flashcards for one or more WORDS to DECK.
 
@@ -44,6 +61,8 @@ def generate_flashcard_from_word(
         ct g --language cantonese 你好       # Single word in Cantonese
         ct g 你好 再见 谢谢                 # Multiple space-separated words
         echo "你好\n再见" | ct g             # Read from stdin (newline-separated)
+        ct g --batch-size 20 < words.txt    # 20 words per OpenAI request
+        ct g --jobs 8 < words.txt           # 8 OpenAI requests at a time
     """
     # Combine words from arguments and stdin
     all_words = list(words)
@@ -59,49 +78,134 @@ def generate_flashcard_from_word(
     deck_name = deck or get_config().default_deck
     lang = language or get_config().default_language
 
-    _generate_flashcard_from_word_impl(deck_name, tuple(all_words), lang)
+    _generate_flashcard_from_word_impl(
+        deck_name, tuple(all_words), lang, batch_size, jobs
+    )
+
+
+class _PlannedWord(NamedTuple):
+    """A word to process, with the message to show instead if it is skipped."""
+
+    number: int
+    word: str
+    skip_message: Optional[str] = None
+
+
+def _plan_batches(
+    words: tuple[str, ...],
+    language: str,
+    batch_size: int,
+    mirror: DeckMirror,
+    existence_deck: str,
+) -> List[List[_PlannedWord]]:
+    """Split the words into batches, working out which of them to skip.
+
+    Words are converted for the language first. Words already in the deck, or
+    repeated in the input, are skipped.
+    """
+    batches = []
+    processed_words = set()
+    for batch_start in range(0, len(words), batch_size):
+        batch = []
+        for number, word in enumerate(
+            words[batch_start : batch_start + batch_size], batch_start + 1
+        ):
+            # Process word based on language (simplified for Mandarin, traditional for Cantonese)
+            word = LanguagePreprocessor.process_for_language(word, language)
+
+            skip_message = None
+            if word in processed_words:
+                skip_message = f"Already processed '{word}' in this run, skipping"
+            else:
+                processed_words.add(word)
+                existing_cards = mirror.find_by_word(existence_deck, word)
+                if existing_cards:
+                    skip_message = (
+                        f"Card for '{word}' exists already:\n{existing_cards[0]}"
+                    )
+            batch.append(_PlannedWord(number, word, skip_message))
+        batches.append(batch)
+    return batches
 
 
 def _generate_flashcard_from_word_impl(
-    deck: str, words: tuple[str, ...], language: str = "mandarin"
+    deck: str,
+    words: tuple[str, ...],
+    language: str = "mandarin",
+    batch_size: int = 1,
+    jobs: int = 1,
 ) -> None:
     """Implementation of generate_flashcard_from_word command.
 
-    For each word:
     1. Convert traditional characters to simplified (if any)
-    2. Check if the card already exists in Anki
-    3. Generate flashcard content using OpenAI if needed
-    4. Add the flashcard to Anki if it doesn't already exist
+    2. Check if the cards already exist, using the local deck mirror
+    3. Generate flashcard content for the remaining words using OpenAI, with
+       one request per batch of `batch_size` words. Batches are generated in
+       up to `jobs` worker threads, up to `jobs` batches ahead of the one
+       being reviewed, so the next card is usually ready by the time the
+       current one is confirmed.
+    4. Add each flashcard to Anki. Results are shown and confirmed in input
+       order on the main thread, whatever order they are generated in.
 
     Args:
         deck: The Anki deck to add flashcards to
         words: The words to generate flashcards for
         language: The language to generate flashcards for ("mandarin" or "cantonese")
+        batch_size: How many words to generate flashcards for per OpenAI request
+        jobs: How many OpenAI requests to run at once
     """
     ankiconnect_client = AnkiConnectClient()
     total = len(words)
 
-    for i, word in enumerate(words, 1):
-        # Process word based on language (simplified for Mandarin, traditional for Cantonese)
-        word = LanguagePreprocessor.process_for_language(word, language)
-
-        if total > 1:
-            click.secho(f"\nProcessing word {i}/{total}: {word}", fg="blue")
-
-        # Check if card already exists
-        existing_cards = ankiconnect_client.find_notes(
-            get_word_exists_query(word, language)
-        )
-        if existing_cards:
-            click.secho(f"Card for '{word}' exists already:", fg="yellow")
-            click.echo(f"{existing_cards[0]}")
-            continue
-
-        # Generate new card content
-        prompt = get_generate_flashcard_from_word_prompt(word, language)
-        dprint(prompt)
-        flashcards = generate_flashcards(prompt, language)
-        dprint(flashcards)
-
-        if not maybe_add_flashcards_to_deck(flashcards, deck):
-            click.secho(f"No new flashcard added for '{word}'", fg="red")
+    # Existence checks run against the local mirror, refreshed if stale
+    existence_deck = get_config().default_deck
+    with DeckMirror(ankiconnect_client) as mirror:
+        mirror.sync_if_stale(existence_deck)
+        batches = _plan_batches(words, language, batch_size, mirror, existence_deck)
+
+    def new_words_of(batch: List[_PlannedWord]) -> List[str]:
+        return [planned.word for planned in batch if planned.skip_message is None]
+
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    futures: Dict[int, Future] = {}
+    next_batch = 0
+    completed = False
+    try:
+        for i, batch in enumerate(batches):
+            # Keep `jobs` batches generating ahead of the one being reviewed
+            while next_batch < len(batches) and next_batch <= i + jobs:
+                if new_words := new_words_of(batches[next_batch]):
+                    futures[next_batch] = executor.submit(
+                        generate_flashcards_for_words, new_words, language
+                    )
+                next_batch += 1
+
+            for planned in batch:
+                if total > 1:
+                    click.secho(
+                        f"\nProcessing word {planned.number}/{total}: {planned.word}",
+                        fg="blue",
+                    )
+                if planned.skip_message:
+                    click.secho(planned.skip_message, fg="yellow")
+
+            new_words = new_words_of(batch)
+            if not new_words:
+                continue
+
+            # Generate new card content
+            flashcards_by_word = futures.pop(i).result()
+            dprint(flashcards_by_word)
+
+            for word in new_words:
+                flashcard = flashcards_by_word.get(word)
+                flashcards = [flashcard] if flashcard else []
+                if not maybe_add_flashcards_to_deck(flashcards, deck):
+                    click.secho(f"No new flashcard added for '{word}'", fg="red")
+        completed = True
+    except KeyboardInterrupt:
+        click.secho("\nAborted by user", fg="yellow", bold=True)
+    finally:
+        # Drop queued batches. On Ctrl-C or an error, don't block on the
+        # requests already running (their responses still end up in the cache)
+        executor.shutdown(wait=completed, cancel_futures=True)
@@ -2,7 +2,9 @@ import click
 import random
 from typing import Optional
 from tutor.utils.anki import AnkiConnectClient
+from tutor.utils.deck_mirror import DeckMirror
 from tutor.utils.logging import dprint
+from tutor.utils.note_table import NoteTable
 from tutor.utils.config import get_config
 
 
@@ -34,18 +36,34 @@ def _list_lesser_known_cards_impl(deck: str, count: int) -> str:
     # cards rated "again" or "hard" in the past 7 days
     query = f'(deck:"{deck}" rated:7:1 OR deck:"{deck}" rated:7:2)'
     dprint(query)
-    cards = ankiconnect_client.find_notes(query)
+    note_ids = ankiconnect_client.find_note_ids(query)
 
-    if not cards:
+    # Review history needs live Anki, but note contents come from the mirror
+    with DeckMirror(ankiconnect_client) as mirror:
+        mirror.sync_if_stale(deck)
+        mirrored = mirror.get_note_infos(note_ids)
+    missing_ids = [nid for nid in note_ids if nid not in mirrored]
+
+    # Only a few fields of each card are shown, so keep them in a compact table
+    # rather than building a flashcard per note
+    table = NoteTable.from_note_infos(mirrored.values())
+    if missing_ids:
+        for note_infos in ankiconnect_client.iter_note_info_chunks(missing_ids):
+            table.extend(note_infos)
+
+    if not len(table):
         return f"No lesser-known cards found in deck: {deck}"
 
     # Make sure we don't try to sample more cards than exist
-    sample_count = min(count, len(cards))
+    sample_count = min(count, len(table))
 
     # Build the result string
     result = [f"Lesser-known cards from deck '{deck}':"]
 
-    for fc in random.sample(cards, sample_count):
-        result.append(f"- {fc.word} ({fc.pinyin}): {fc.english}")
+    for row in random.sample(range(len(table)), sample_count):
+        result.append(
+            f"- {table.word(row)} ({table.pronunciation(row)}): "
+            f"{table.get(row, 'English')}"
+        )
 
     return "\n".join(result)
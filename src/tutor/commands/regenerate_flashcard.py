@@ -1,9 +1,7 @@
 import click
 from tutor.utils.anki import AnkiConnectClient
-from tutor.llm_flashcards import (
-    generate_flashcards,
-    get_word_exists_query,
-)
+from tutor.utils.deck_mirror import DeckMirror
+from tutor.llm_flashcards import generate_flashcards
 from tutor.utils.logging import dprint
 from tutor.llm.prompts import get_generate_flashcard_from_word_prompt
 from tutor.utils.azure import text_to_speech
@@ -43,9 +41,10 @@ def _regenerate_flashcard_impl(word: str, language: str = "mandarin") -> str:
     processed_word = LanguagePreprocessor.process_for_language(word, language)
 
     ankiconnect_client = AnkiConnectClient()
-    flashcards = ankiconnect_client.find_notes(
-        get_word_exists_query(processed_word, language)
-    )
+    deck = get_config().default_deck
+    with DeckMirror(ankiconnect_client) as mirror:
+        mirror.sync_if_stale(deck)
+        flashcards = mirror.find_by_word(deck, processed_word)
     if not flashcards:
         return f"Could not find any cards matching '{processed_word}', exiting"
 
@@ -69,7 +68,9 @@ def _regenerate_flashcard_impl(word: str, language: str = "mandarin") -> str:
     dprint(prompt)
     flashcards = generate_flashcards(prompt, language)
     dprint(flashcards)
-    new_flashcard = flashcards.flashcards[0]
+    if not flashcards:
+        return f"Failed to generate a new flashcard for '{processed_word}'"
+    new_flashcard = flashcards[0]
     audio_filepath = text_to_speech(new_flashcard.sample_usage, language)
     ankiconnect_client.update_flashcard(note_id, new_flashcard, audio_filepath)
 
@@ -32,6 +32,8 @@ def setup_anki(languages: str):
     # Check connection to Anki
     try:
         client.list_decks()
+        # Start from fresh note types; one lookup is then shared by all languages
+        client.note_types.model_names(refresh=True)
         click.secho("✓ Connected to Anki successfully.\n", fg="green")
     except Exception as e:
         click.secho("✗ Error connecting to Anki:", fg="red", bold=True)
@@ -58,9 +60,7 @@ def setup_anki(languages: str):
             # Check if note type already exists
             model_name = f"chinese-tutor-{language}"
             click.echo(f"  Checking if note type '{model_name}' exists...")
-            models = client.send_request(AnkiAction.MODEL_NAMES, {})
-
-            if model_name in models:
+            if client.note_types.has_model(model_name):
                 # Check if the note type has all the expected fields
                 from tutor.llm_flashcards import get_flashcard_class_for_language
 
@@ -254,9 +254,8 @@ class NoteTypeManager:
         model_name = f"chinese-tutor-{language}"
 
         try:
-            # Check if the model already exists
-            models = self.client.send_request(AnkiAction.MODEL_NAMES, {})
-            if model_name in models:
+            # Check if the model already exists, using the cached model names
+            if self.client.note_types.has_model(model_name):
                 return model_name
             else:
                 raise AnkiConnectError(
@@ -323,6 +322,8 @@ class NoteTypeManager:
                 },
             )
 
+            self.client.note_types.invalidate()
+
             print(
                 f"Created note type '{model_name}' with Chinese front and English front templates."
             )
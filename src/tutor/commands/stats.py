@@ -0,0 +1,77 @@
+import click
+import re
+import time
+from typing import Optional
+from tutor.llm.telemetry import iter_records, summarize
+
+_WINDOW_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+@click.group()
+def stats() -> None:
+    """Report on local usage statistics."""
+
+
+@stats.command()
+@click.option(
+    "--since",
+    default="7d",
+    show_default=True,
+    help="Time window to report on, e.g. 30m, 24h, 7d, 4w, or 'all'",
+)
+def llm(since: str) -> None:
+    """Latency, tokens, cost and repairs of LLM calls, by command and model."""
+    click.echo(_llm_stats_impl(_parse_window(since)))
+
+
+def _parse_window(window: str) -> Optional[float]:
+    """Convert a window like "7d" to seconds, or None for "all"."""
+    if window == "all":
+        return None
+    match = re.fullmatch(r"(\d+)([mhdw])", window.strip())
+    if not match:
+        raise click.BadParameter(
+            f"'{window}' is not a window like 30m, 24h, 7d or 4w", param_hint="--since"
+        )
+    return int(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+
+
+def _format_optional(value: Optional[float], fmt: str) -> str:
+    return "-" if value is None else format(value, fmt)
+
+
+def _llm_stats_impl(window: Optional[float] = None) -> str:
+    """Implementation of the stats llm command.
+
+    Args:
+        window: Seconds to look back, or None for every recorded call
+
+    Returns:
+        A table of LLM call statistics per command and model
+    """
+    since = 0.0 if window is None else time.time() - window
+    summaries = summarize(list(iter_records(since)))
+    if not summaries:
+        return "No LLM calls recorded in this window"
+
+    header = (
+        f"{'command':<30} {'model':<14} {'calls':>6} {'errors':>6} {'retries':>7} "
+        f"{'p50 s':>7} {'p95 s':>7} {'prompt':>9} {'cached':>7} {'output':>8} "
+        f"{'cards':>6} {'tok/card':>8} {'cost $':>8} {'repairs':>7} {'failed':>6}"
+    )
+    lines = [header]
+    total_cost = 0.0
+    for (command, model), s in sorted(summaries.items()):
+        cached_share = s["cached_tokens"] / max(s["prompt_tokens"], 1)
+        lines.append(
+            f"{command:<30} {model:<14} {s['calls']:>6} {s['errors']:>6} "
+            f"{s['retries']:>7} {_format_optional(s['p50'], '.2f'):>7} "
+            f"{_format_optional(s['p95'], '.2f'):>7} {s['prompt_tokens']:>9} "
+            f"{cached_share:>7.0%} {s['completion_tokens']:>8} {s['cards']:>6} "
+            f"{_format_optional(s['tokens_per_card'], '.0f'):>8} "
+            f"{_format_optional(s['cost'], '.4f'):>8} {s['repairs']:>7} "
+            f"{s['failed_repairs']:>6}"
+        )
+        total_cost += s["cost"] or 0.0
+    lines.append(f"Estimated total cost: ${total_cost:.4f}")
+    return "\n".join(lines)
@@ -0,0 +1,44 @@
+import click
+from typing import Optional
+from tutor.utils.deck_mirror import DeckMirror
+from tutor.utils.config import get_config
+
+
+@click.command()
+@click.option("--deck", type=str, default=None, help="Deck to sync")
+@click.option(
+    "--full",
+    is_flag=True,
+    default=False,
+    help="Re-fetch every note instead of only the changed ones",
+)
+def sync(deck: Optional[str], full: bool = False) -> None:
+    """Refresh the local mirror of DECK used for fast card lookups."""
+    # Use default deck from config if not specified
+    deck = deck or get_config().default_deck
+    result = _sync_impl(deck, full)
+    click.echo(result)
+
+
+def _sync_impl(deck: str, full: bool = False) -> str:
+    """Implementation of sync command.
+
+    Args:
+        deck: Name of the deck to sync
+        full: Re-fetch every note instead of only the changed ones
+
+    Returns:
+        A summary of what changed in the mirror
+    """
+    with DeckMirror() as mirror:
+        stats = mirror.sync(deck, full=full)
+
+    return "\n".join(
+        [
+            f"Synced deck mirror for '{deck}':",
+            f"Added: {stats['added']}",
+            f"Updated: {stats['updated']}",
+            f"Removed: {stats['removed']}",
+            f"Unchanged: {stats['unchanged']}",
+        ]
+    )
@@ -0,0 +1,323 @@
+"""Offline batch jobs for generating flashcards in bulk.
+
+Deck-wide regeneration (e.g. `fix-cards --force-update` on thousands of cards)
+is slow and expensive with synchronous chat completions. Instead, every prompt
+is written to a JSONL file and submitted as one batch job, which completes in
+the background at a lower price. Job state is stored in the config directory,
+so a job can be polled and resumed from later CLI invocations.
+
+Completed responses are stored with the job. Applying a job runs the normal
+update path with the responses by prompt, so it takes each card's content
+from them instead of calling the model.
+
+Submission and polling go through a BatchBackend. OpenAIBatchBackend uses the
+OpenAI Batch API; LocalBatchBackend is a stand-in that answers requests itself
+when polled, so the whole flow can be run without network access.
+"""
+
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from openai import OpenAI
+from pydantic import BaseModel, Field
+
+from tutor.llm.client import chat_completion, get_openai_client
+from tutor.llm_flashcards import get_flashcards_request
+from tutor.utils.config import get_config_dir
+from tutor.utils.logging import dprint
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Job statuses
+SUBMITTED = "submitted"
+COMPLETED = "completed"
+FAILED = "failed"
+APPLIED = "applied"
+
+
+def get_default_batch_jobs_dir() -> Path:
+    """Returns the default directory for batch job state."""
+    jobs_dir = get_config_dir() / "batch_jobs"
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    return jobs_dir
+
+
+class BatchJob(BaseModel):
+    """Local state of a submitted batch job."""
+
+    job_id: str
+    backend: str
+    batch_id: str
+    model: str
+    status: str = SUBMITTED
+    created_at: float = Field(default_factory=time.time)
+    # Prompts by request ID
+    prompts: Dict[str, str]
+    # Response content by request ID, once the job completed
+    responses: Dict[str, str] = Field(default_factory=dict)
+    # Request IDs whose response was an error, with the error
+    errors: Dict[str, str] = Field(default_factory=dict)
+    # What the job was submitted for, e.g. the deck and note IDs of fix-cards
+    metadata: Dict = Field(default_factory=dict)
+
+
+class BatchBackend(ABC):
+    """Submits batch request files and retrieves their results."""
+
+    name: str
+
+    @abstractmethod
+    def submit(self, requests_path: Path) -> str:
+        """Submit a JSONL file of requests, returning the batch ID."""
+
+    @abstractmethod
+    def poll(self, batch_id: str) -> str:
+        """Get the status of a batch: SUBMITTED, COMPLETED or FAILED."""
+
+    @abstractmethod
+    def download(self, batch_id: str) -> List[Dict]:
+        """Get the result lines of a completed batch.
+
+        Each line has the OpenAI Batch API output format: a `custom_id`, and
+        either a `response` with the chat completion as its `body`, or an
+        `error`.
+        """
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Runs batch jobs with the OpenAI Batch API."""
+
+    name = "openai"
+
+    def __init__(self, client: Optional[OpenAI] = None):
+        self.client = client or get_openai_client()
+
+    def submit(self, requests_path: Path) -> str:
+        with open(requests_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> str:
+        status = self.client.batches.retrieve(batch_id).status
+        if status == "completed":
+            return COMPLETED
+        if status in ("failed", "expired", "cancelled"):
+            return FAILED
+        return SUBMITTED
+
+    def download(self, batch_id: str) -> List[Dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                text = self.client.files.content(file_id).text
+                lines.extend(json.loads(line) for line in text.splitlines() if line)
+        return lines
+
+
+def _chat_completion(body: Dict) -> Dict:
+    """Answer a batch request with a synchronous chat completion."""
+    return chat_completion(**body).model_dump()
+
+
+class LocalBatchBackend(BatchBackend):
+    """Stand-in for a batch API that answers requests itself.
+
+    Submitted request files are copied into a local directory. A batch
+    completes as soon as it is polled, by passing each request body to
+    `respond`, which returns a chat completion dict. By default requests are
+    answered with synchronous chat completions; tests pass a fake instead.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        respond: Callable[[Dict], Dict] = _chat_completion,
+    ):
+        self.directory = Path(directory or get_default_batch_jobs_dir() / "local")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.respond = respond
+
+    def submit(self, requests_path: Path) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex}"
+        self._path(batch_id, "input").write_text(requests_path.read_text())
+        return batch_id
+
+    def poll(self, batch_id: str) -> str:
+        output_path = self._path(batch_id, "output")
+        if not output_path.exists():
+            with open(output_path, "w") as out:
+                for line in self._path(batch_id, "input").read_text().splitlines():
+                    request = json.loads(line)
+                    out.write(json.dumps(self._run(request), ensure_ascii=False))
+                    out.write("\n")
+        return COMPLETED
+
+    def download(self, batch_id: str) -> List[Dict]:
+        text = self._path(batch_id, "output").read_text()
+        return [json.loads(line) for line in text.splitlines() if line]
+
+    def _run(self, request: Dict) -> Dict:
+        try:
+            body = self.respond(request["body"])
+        except Exception as e:
+            return {
+                "custom_id": request["custom_id"],
+                "response": None,
+                "error": {"message": str(e)},
+            }
+        return {
+            "custom_id": request["custom_id"],
+            "response": {"status_code": 200, "body": body},
+            "error": None,
+        }
+
+    def _path(self, batch_id: str, kind: str) -> Path:
+        return self.directory / f"{batch_id}.{kind}.jsonl"
+
+
+BATCH_BACKENDS: Dict[str, Callable[[], BatchBackend]] = {
+    OpenAIBatchBackend.name: OpenAIBatchBackend,
+    LocalBatchBackend.name: LocalBatchBackend,
+}
+
+
+def get_batch_backend(name: str) -> BatchBackend:
+    """Create the batch backend with the given name.
+
+    Raises:
+        ValueError: If there is no such backend
+    """
+    if name not in BATCH_BACKENDS:
+        raise ValueError(
+            f"Unknown batch backend '{name}', expected one of: "
+            f"{', '.join(BATCH_BACKENDS)}"
+        )
+    return BATCH_BACKENDS[name]()
+
+
+class BatchJobStore:
+    """Stores batch jobs as JSON files, with their request files alongside."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory else get_default_batch_jobs_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def save(self, job: BatchJob) -> None:
+        self._job_path(job.job_id).write_text(job.model_dump_json(indent=2))
+
+    def load(self, job_id: str) -> BatchJob:
+        """Load a job.
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        path = self._job_path(job_id)
+        if not path.exists():
+            raise KeyError(f"No batch job with ID '{job_id}'")
+        return BatchJob.model_validate_json(path.read_text())
+
+    def list(self) -> List[BatchJob]:
+        """Get all jobs, oldest first."""
+        jobs = [
+            BatchJob.model_validate_json(path.read_text())
+            for path in self.directory.glob("*.json")
+        ]
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def requests_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.requests.jsonl"
+
+    def _job_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+
+def submit_batch_job(
+    store: BatchJobStore,
+    backend: BatchBackend,
+    prompts: Dict[str, str],
+    model: str,
+    metadata: Optional[Dict] = None,
+) -> BatchJob:
+    """Write the prompts to a batch file, submit it and save the job.
+
+    Args:
+        store: Where to save the job
+        backend: The backend to submit the job to
+        prompts: Flashcard prompts by request ID
+        model: The model to generate flashcards with
+        metadata: What the job is for, used when applying it
+
+    Returns:
+        The submitted job
+    """
+    job_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    requests_path = store.requests_path(job_id)
+    with open(requests_path, "w") as f:
+        for request_id, prompt in prompts.items():
+            request = {
+                "custom_id": request_id,
+                "method": "POST",
+                "url": CHAT_COMPLETIONS_ENDPOINT,
+                "body": get_flashcards_request(prompt, model),
+            }
+            f.write(json.dumps(request, ensure_ascii=False))
+            f.write("\n")
+
+    job = BatchJob(
+        job_id=job_id,
+        backend=backend.name,
+        batch_id=backend.submit(requests_path),
+        model=model,
+        prompts=prompts,
+        metadata=metadata or {},
+    )
+    store.save(job)
+    dprint(f"Submitted batch job {job.job_id} ({len(prompts)} requests)")
+    return job
+
+
+def refresh_batch_job(
+    store: BatchJobStore, job: BatchJob, backend: BatchBackend
+) -> BatchJob:
+    """Poll a submitted job, storing its responses with it once complete.
+
+    Jobs that are no longer waiting on the backend are returned unchanged.
+    """
+    if job.status != SUBMITTED:
+        return job
+
+    status = backend.poll(job.batch_id)
+    if status == COMPLETED:
+        for line in backend.download(job.batch_id):
+            request_id = line["custom_id"]
+            if request_id not in job.prompts:
+                continue
+            response = line.get("response") or {}
+            if line.get("error") or response.get("status_code") != 200:
+                job.errors[request_id] = str(line.get("error") or response)
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+            job.responses[request_id] = content
+    job.status = status
+    store.save(job)
+    return job
+
+
+def get_batch_responses_by_prompt(job: BatchJob) -> Dict[str, str]:
+    """Get the response content of a completed job by prompt."""
+    return {
+        job.prompts[request_id]: content
+        for request_id, content in job.responses.items()
+    }
@@ -0,0 +1,499 @@
+"""Process-wide OpenAI client with per-model rate limiting.
+
+Creating an `OpenAI()` client per call throws away its connection pool, and
+concurrent callers (`ct g --jobs`, the web app) used to run into 429s with
+nothing coordinating them, so the SDK's own retries kept stalling. All chat
+completions now go through one shared client with explicit timeouts, and
+through a RateLimiter per model: a token bucket for requests per minute and
+one for tokens per minute.
+
+Limits can be set per model in config.yaml:
+
+    openai_rate_limits:
+      gpt-4o:
+        requests_per_minute: 500
+        tokens_per_minute: 30000
+
+and are otherwise learned from the `x-ratelimit-*` response headers. A 429
+pauses every caller of that model until the server's `retry-after`, and halves
+its request rate until requests succeed again.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, Mapping, Optional
+
+import openai
+from openai import OpenAI
+from openai.types.chat import ChatCompletion, ParsedChatCompletion
+
+from tutor.llm.telemetry import record_llm_call
+from tutor.utils.cassette import get_cassette
+from tutor.utils.logging import dprint
+from tutor.utils.retry import RetryPolicy
+
+# Fail fast when OpenAI cannot be reached, but give long generations time
+DEFAULT_TIMEOUT = openai.Timeout(120.0, connect=5.0)
+
+# Starting limits until the config or response headers say otherwise
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 30_000
+
+# Tokens a completion is assumed to produce, before its usage is known
+DEFAULT_COMPLETION_TOKENS = 1_000
+
+# Rates are never slowed below this fraction of the limit
+MIN_RATE_FACTOR = 1 / 16
+
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `capacity` tokens per minute.
+
+    The level may go negative, when a request turned out to cost more than was
+    taken for it; callers then wait until the debt is paid off.
+    """
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.rate_factor = 1.0
+        self._level = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        rate = self.capacity * self.rate_factor / 60
+        self._level = min(self.capacity, self._level + (now - self._updated_at) * rate)
+        self._updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / (self.capacity * self.rate_factor / 60)
+
+    def take(self, amount: float) -> None:
+        self._level -= amount
+
+    def limit_level(self, level: float) -> None:
+        """Lower the level to what the server reports as remaining."""
+        self._level = min(self._level, level)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits of one model.
+
+    Args:
+        model: The model the limits apply to
+        requests_per_minute: Request limit, or None to use the default until
+            the response headers report the real one
+        tokens_per_minute: Token limit, or None likewise
+    """
+
+    def __init__(
+        self,
+        model: str,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.model = model
+        # Configured limits are caps; reported limits never raise them
+        self._configured_requests = requests_per_minute
+        self._configured_tokens = tokens_per_minute
+        self.requests = TokenBucket(requests_per_minute or DEFAULT_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(tokens_per_minute or DEFAULT_TOKENS_PER_MINUTE)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def acquire(self, estimated_tokens: int) -> None:
+        """Block until a request of about `estimated_tokens` may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(
+                    self._paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(estimated_tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(estimated_tokens)
+                    return
+            dprint(f"Rate limiting {self.model}, waiting {wait:.1f}s")
+            time.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once a request's real usage is known."""
+        with self._lock:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+    def record_success(self, headers: Mapping[str, str]) -> None:
+        """Adjust to the rate-limit headers of a successful response."""
+        with self._lock:
+            self._apply_headers(headers)
+            # Speed back up gradually after a 429
+            for bucket in (self.requests, self.tokens):
+                bucket.rate_factor = min(1.0, bucket.rate_factor * 1.1)
+
+    def record_rate_limited(self, headers: Mapping[str, str]) -> float:
+        """Back off after a 429, pausing every caller of the model.
+
+        Returns:
+            Seconds until requests resume
+        """
+        retry_after = _parse_duration(headers.get("retry-after"))
+        if retry_after is None:
+            retry_after = 1.0
+        with self._lock:
+            self._apply_headers(headers)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self.requests.rate_factor = max(
+                MIN_RATE_FACTOR, self.requests.rate_factor / 2
+            )
+        dprint(f"Rate limited on {self.model}, pausing for {retry_after:.1f}s")
+        return retry_after
+
+    def _apply_headers(self, headers: Mapping[str, str]) -> None:
+        for bucket, configured, kind in (
+            (self.requests, self._configured_requests, "requests"),
+            (self.tokens, self._configured_tokens, "tokens"),
+        ):
+            limit = _parse_number(headers.get(f"x-ratelimit-limit-{kind}"))
+            if limit:
+                bucket.capacity = min(limit, configured) if configured else limit
+            remaining = _parse_number(headers.get(f"x-ratelimit-remaining-{kind}"))
+            if remaining is not None:
+                bucket.limit_level(remaining)
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a duration like "20", "1.5s", "120ms" or "6m0s" into seconds."""
+    if not value:
+        return None
+    seconds = _parse_number(value)
+    if seconds is not None:
+        return seconds
+
+    total = 0.0
+    number = ""
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char.isdigit() or char == ".":
+            number += char
+        elif value.startswith("ms", i):
+            total += float(number or 0) / 1000
+            number = ""
+            i += 1
+        elif char in "hms":
+            total += float(number or 0) * {"h": 3600, "m": 60, "s": 1}[char]
+            number = ""
+        else:
+            return None
+        i += 1
+    return total
+
+
+def estimate_tokens(params: Dict) -> int:
+    """Roughly estimate the tokens a chat completion request will use.
+
+    Chinese text is about one token per character, and English about one per
+    four; one per two characters is a conservative middle ground.
+    """
+    prompt_chars = sum(
+        len(message.get("content") or "") for message in params.get("messages", [])
+    )
+    completion_tokens = params.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return math.ceil(prompt_chars / 2) + completion_tokens
+
+
+_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_openai_client() -> OpenAI:
+    """Get the process-wide OpenAI client.
+
+    The SDK's own retries are turned off, since they do not coordinate
+    between callers; chat_completion retries instead.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = OpenAI(timeout=DEFAULT_TIMEOUT, max_retries=0)
+        return _client
+
+
+def _get_configured_rate_limits(model: str) -> Dict:
+    # Imported here as loading the config needs a default deck, which the web
+    # app does not
+    from tutor.utils.config import get_config
+
+    try:
+        return get_config().openai_rate_limits.get(model, {})
+    except ValueError:
+        return {}
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """Get the shared rate limiter of a model."""
+    with _lock:
+        limiter = _rate_limiters.get(model)
+        if limiter is None:
+            limits = _get_configured_rate_limits(model)
+            limiter = _rate_limiters[model] = RateLimiter(
+                model,
+                requests_per_minute=limits.get("requests_per_minute"),
+                tokens_per_minute=limits.get("tokens_per_minute"),
+            )
+        return limiter
+
+
+# Token usage of this process, by model
+_usage: Dict[str, Dict[str, int]] = {}
+
+
+def _record_usage(model: str, usage) -> None:
+    """Add up a response's token usage, including prompt tokens served from
+    OpenAI's prompt prefix cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+    with _lock:
+        counts = _usage.setdefault(
+            model,
+            {
+                "requests": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "completion_tokens": 0,
+            },
+        )
+        counts["requests"] += 1
+        counts["prompt_tokens"] += usage.prompt_tokens
+        counts["cached_tokens"] += cached_tokens
+        counts["completion_tokens"] += usage.completion_tokens
+    dprint(
+        f"{model} usage: {usage.prompt_tokens} prompt tokens "
+        f"({cached_tokens} cached), {usage.completion_tokens} completion tokens"
+    )
+
+
+def get_usage_stats() -> Dict[str, Dict[str, int]]:
+    """Get the token usage of this process, by model."""
+    with _lock:
+        return {model: dict(counts) for model, counts in _usage.items()}
+
+
+def format_usage_summary() -> Optional[str]:
+    """Summarize this process's token usage, or None if no requests were made."""
+    lines = []
+    for model, counts in get_usage_stats().items():
+        cached_share = counts["cached_tokens"] / max(counts["prompt_tokens"], 1)
+        lines.append(
+            f"{model}: {counts['requests']} request(s), "
+            f"{counts['prompt_tokens']} prompt tokens "
+            f"({counts['cached_tokens']} cached, {cached_share:.0%}), "
+            f"{counts['completion_tokens']} completion tokens"
+        )
+    return "\n".join(["OpenAI usage:", *lines]) if lines else None
+
+
+def _call_rate_limited(
+    params: Dict, send: Callable, retry_policy: Optional[RetryPolicy] = None
+):
+    """Send a chat completion request through its model's rate limiter.
+
+    Every call, successful or not, is recorded in the LLM telemetry log.
+
+    Args:
+        params: The chat completion parameters
+        send: Sends the request with the raw response API of a client
+        retry_policy: How often to retry failed requests
+
+    Returns:
+        The parsed response
+    """
+    call = _send_rate_limited(params, send, retry_policy)
+    completion = call.response
+    call.finish(completion.usage)
+    return completion
+
+
+class _RateLimitedCall:
+    """A request sent through the rate limiter, until its usage is known."""
+
+    def __init__(self, params: Dict, limiter: RateLimiter):
+        self.model = params["model"]
+        self.limiter = limiter
+        self.estimated_tokens = estimate_tokens(params)
+        self.started_at = time.monotonic()
+        self.queued = 0.0
+        self.attempts = 0
+        self.response = None
+
+    def finish(self, usage) -> None:
+        """Record the usage of a successful call."""
+        if usage is not None:
+            self.limiter.record_usage(self.estimated_tokens, usage.total_tokens)
+            _record_usage(self.model, usage)
+        self.record("ok", usage)
+
+    def record(self, outcome: str, usage=None) -> None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        record_llm_call(
+            self.model,
+            latency=time.monotonic() - self.started_at,
+            attempts=self.attempts,
+            outcome=outcome,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0),
+            completion_tokens=getattr(usage, "completion_tokens", 0),
+            cached_tokens=getattr(details, "cached_tokens", None) or 0,
+            queued=self.queued,
+        )
+
+
+def _send_rate_limited(
+    params: Dict, send: Callable, retry_policy: Optional[RetryPolicy] = None
+) -> _RateLimitedCall:
+    """Send a request, retrying until it succeeds or runs out of attempts.
+
+    Failures are recorded in the telemetry log here; the caller finishes
+    successful calls once their usage is known.
+    """
+    retry_policy = retry_policy or RetryPolicy(max_attempts=5, base_delay=1.0)
+    call = _RateLimitedCall(params, get_rate_limiter(params["model"]))
+    limiter = call.limiter
+
+    try:
+        for attempt in range(retry_policy.max_attempts):
+            acquire_started_at = time.monotonic()
+            limiter.acquire(call.estimated_tokens)
+            call.queued += time.monotonic() - acquire_started_at
+            call.attempts += 1
+            try:
+                raw_response = send(get_openai_client(), params)
+            except _RETRYABLE_ERRORS as e:
+                # The request never ran, so return its tokens
+                limiter.record_usage(call.estimated_tokens, 0)
+                if attempt == retry_policy.max_attempts - 1:
+                    raise
+                if isinstance(e, openai.RateLimitError):
+                    # The limiter makes every caller wait for retry-after
+                    limiter.record_rate_limited(e.response.headers)
+                else:
+                    dprint(f"OpenAI request failed ({e}), retrying")
+                    retry_policy.sleep(attempt)
+                continue
+
+            limiter.record_success(raw_response.headers)
+            call.response = raw_response.parse()
+            return call
+    except Exception as e:
+        call.record(type(e).__name__)
+        raise
+
+
+def chat_completion(**params):
+    """Create a chat completion with the shared client and rate limiting.
+
+    Takes the same parameters as `client.chat.completions.create`.
+    """
+
+    def send():
+        return _call_rate_limited(
+            params,
+            lambda client, p: client.chat.completions.with_raw_response.create(**p),
+        )
+
+    cassette = get_cassette()
+    if cassette is None:
+        return send()
+    return cassette.call(
+        "openai",
+        params["model"],
+        params,
+        send,
+        encode=lambda completion: completion.model_dump(mode="json"),
+        decode=ChatCompletion.model_validate,
+    )
+
+
+def parse_chat_completion(**params):
+    """Create a structured-output chat completion, like chat_completion.
+
+    Takes the same parameters as `client.beta.chat.completions.parse`.
+    """
+
+    def send():
+        return _call_rate_limited(
+            params,
+            lambda client, p: client.beta.chat.completions.with_raw_response.parse(**p),
+        )
+
+    cassette = get_cassette()
+    if cassette is None:
+        return send()
+    return cassette.call(
+        "openai",
+        params["model"],
+        params,
+        send,
+        encode=lambda completion: completion.model_dump(mode="json"),
+        decode=ParsedChatCompletion[params["response_format"]].model_validate,
+    )
+
+
+def stream_chat_completion(**params) -> Iterator[str]:
+    """Stream a chat completion's content as it is generated.
+
+    Takes the same parameters as `client.chat.completions.create`, without
+    `stream`. Rate limiting, retries and usage are handled like
+    chat_completion; requests are only retried until the stream starts.
+
+    Returns:
+        An iterator over chunks of the completion's content
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return _stream_rate_limited(params)
+    return cassette.stream(
+        "openai", params["model"], params, lambda: _stream_rate_limited(params)
+    )
+
+
+def _stream_rate_limited(params: Dict) -> Iterator[str]:
+    params = {**params, "stream": True, "stream_options": {"include_usage": True}}
+    call = _send_rate_limited(
+        params, lambda client, p: client.chat.completions.with_raw_response.create(**p)
+    )
+    usage = None
+    try:
+        for chunk in call.response:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                if choice.delta.content:
+                    yield choice.delta.content
+    except BaseException as e:
+        # Including GeneratorExit, when the caller stops reading
+        call.record(type(e).__name__, usage)
+        close = getattr(call.response, "close", None)
+        if close is not None:
+            close()
+        raise
+    call.finish(usage)
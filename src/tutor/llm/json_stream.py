@@ -0,0 +1,160 @@
+"""Incremental parsing of a JSON object as it streams in.
+
+A streamed completion arrives a few characters at a time, and json.loads can
+only parse the whole response. JsonFieldStream reads the chunks as they come
+and reports the text of each top-level string field as soon as it is known,
+so the first field can be shown before the model has written the rest.
+"""
+
+import json
+from typing import List, Optional, Tuple
+
+# Parser states
+_EXPECT_OBJECT = "expect_object"
+_EXPECT_KEY = "expect_key"
+_IN_KEY = "in_key"
+_EXPECT_COLON = "expect_colon"
+_EXPECT_VALUE = "expect_value"
+_IN_VALUE = "in_value"
+_SKIP_NESTED = "skip_nested"
+_SKIP_SCALAR = "skip_scalar"
+_DONE = "done"
+
+_END_OF_STRING = object()
+
+
+class JsonFieldStream:
+    """Extracts the top-level string fields of a JSON object from chunks.
+
+    Nested objects, arrays and non-string values are skipped. The parser is
+    lenient: it reports what it can and leaves validating the complete
+    response to the caller.
+    """
+
+    def __init__(self):
+        self._state = _EXPECT_OBJECT
+        self._key: List[str] = []
+        self._field: Optional[str] = None
+        # Characters of an escape sequence after the backslash, if inside one
+        self._escape: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        # Nesting depth and string state of a skipped object or array
+        self._depth = 0
+        self._skip_in_string = False
+        self._skip_escape = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the end of the object has been read."""
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Parse the next chunk of the response.
+
+        Returns:
+            (field, text) pairs of string field text read from the chunk, in
+            order, with consecutive text of the same field merged
+        """
+        events: List[Tuple[str, str]] = []
+        for c in chunk:
+            text = self._feed_char(c)
+            if text:
+                if events and events[-1][0] == self._field:
+                    events[-1] = (self._field, events[-1][1] + text)
+                else:
+                    events.append((self._field, text))
+        return events
+
+    def _feed_char(self, c: str) -> Optional[str]:
+        state = self._state
+        if state == _EXPECT_OBJECT:
+            if c == "{":
+                self._state = _EXPECT_KEY
+        elif state == _EXPECT_KEY:
+            if c == '"':
+                self._key = []
+                self._state = _IN_KEY
+            elif c == "}":
+                self._state = _DONE
+        elif state == _IN_KEY:
+            decoded = self._string_char(c)
+            if decoded is _END_OF_STRING:
+                self._state = _EXPECT_COLON
+            elif decoded:
+                self._key.append(decoded)
+        elif state == _EXPECT_COLON:
+            if c == ":":
+                self._state = _EXPECT_VALUE
+        elif state == _EXPECT_VALUE:
+            if c == '"':
+                self._field = "".join(self._key)
+                self._state = _IN_VALUE
+            elif c in "{[":
+                self._depth = 1
+                self._state = _SKIP_NESTED
+            elif not c.isspace():
+                self._state = _SKIP_SCALAR
+        elif state == _IN_VALUE:
+            decoded = self._string_char(c)
+            if decoded is _END_OF_STRING:
+                self._state = _EXPECT_KEY
+            else:
+                return decoded
+        elif state == _SKIP_NESTED:
+            self._skip_nested_char(c)
+        elif state == _SKIP_SCALAR:
+            if c == ",":
+                self._state = _EXPECT_KEY
+            elif c == "}":
+                self._state = _DONE
+        return None
+
+    def _string_char(self, c: str):
+        """Decode the next character of a string.
+
+        Returns:
+            The decoded text (empty inside an escape sequence), or
+            _END_OF_STRING at the closing quote
+        """
+        if self._escape is not None:
+            self._escape += c
+            if self._escape[0] == "u" and len(self._escape) < 5:
+                return ""
+            decoded = json.loads(f'"\\{self._escape}"')
+            self._escape = None
+            return self._join_surrogates(decoded)
+        if c == "\\":
+            self._escape = ""
+            return ""
+        if c == '"':
+            self._high_surrogate = None
+            return _END_OF_STRING
+        return c
+
+    def _join_surrogates(self, decoded: str) -> str:
+        # Characters outside the BMP are escaped as a pair of \u escapes
+        code = ord(decoded)
+        if 0xD800 <= code < 0xDC00:
+            self._high_surrogate = code
+            return ""
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        return decoded
+
+    def _skip_nested_char(self, c: str) -> None:
+        if self._skip_in_string:
+            if self._skip_escape:
+                self._skip_escape = False
+            elif c == "\\":
+                self._skip_escape = True
+            elif c == '"':
+                self._skip_in_string = False
+        elif c == '"':
+            self._skip_in_string = True
+        elif c in "{[":
+            self._depth += 1
+        elif c in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._state = _EXPECT_KEY
@@ -1,6 +1,11 @@
-from typing import List, Literal, Union, ClassVar, Dict, Type, Any
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple, Union, ClassVar, Dict
+from typing import Type, Any
 from pydantic.json_schema import SkipJsonSchema
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, create_model
+
+from tutor.llm.related_words import RelatedWordsParser, get_related_words_parser
+from tutor.utils.logging import dprint
 
 
 class RelatedWord(BaseModel):
@@ -36,6 +41,10 @@ class LanguageFlashcard(BaseModel):
     # Class attribute to identify the language - subclasses must override this
     LANGUAGE: ClassVar[str] = "base"
 
+    # How related words are stored - subclasses must override these
+    RELATED_WORD_CLASS: ClassVar[Type[RelatedWord]] = RelatedWord
+    PRONUNCIATION_FIELD: ClassVar[str] = ""
+
     # Registry to keep track of all language-specific flashcard classes
     _registry: ClassVar[Dict[str, Type["LanguageFlashcard"]]] = {}
 
@@ -79,21 +88,76 @@ class LanguageFlashcard(BaseModel):
         This base implementation determines which language-specific class to use,
         then delegates to that class's _from_anki_json implementation.
         """
+        # Delegate to the language-specific implementation
+        flashcard_class = cls._get_class_for_anki_json(anki_json)
+        return flashcard_class._from_anki_json(anki_json)
+
+    @classmethod
+    def from_anki_json_batch(
+        cls, anki_jsons: List[Dict[str, Any]]
+    ) -> List["LanguageFlashcard"]:
+        """Create flashcards from many notes, parsing related words in one pass.
+
+        Args:
+            anki_jsons: Notes as returned by AnkiConnect's notesInfo
+
+        Returns:
+            One flashcard per note, in the same order
+        """
+        flashcards = []
+        related_words_by_class: Dict[Type[LanguageFlashcard], List[int]] = {}
+        for anki_json in anki_jsons:
+            flashcard_class = cls._get_class_for_anki_json(anki_json)
+            related_words_by_class.setdefault(flashcard_class, []).append(
+                len(flashcards)
+            )
+            flashcards.append(
+                flashcard_class._from_anki_json(anki_json, parse_related_words=False)
+            )
+
+        for flashcard_class, indices in related_words_by_class.items():
+            texts = [
+                anki_jsons[i]["fields"].get("Related Words", {}).get("value", "")
+                for i in indices
+            ]
+            results = flashcard_class.related_words_parser().parse_many(texts)
+            for i, result in zip(indices, results):
+                flashcard = flashcards[i]
+                if result.related_words:
+                    flashcard.related_words = result.related_words
+                if result.malformed_lines:
+                    _report_malformed_related_words(
+                        flashcard.anki_note_id, result.malformed_lines
+                    )
+
+        return flashcards
+
+    @staticmethod
+    def _get_class_for_anki_json(
+        anki_json: Dict[str, Any],
+    ) -> Type["LanguageFlashcard"]:
+        """Determine the flashcard class of a note from its model name."""
         # Determine language based on model name if available
         model_name = anki_json.get("modelName", "").lower()
 
         # Choose language class based on model name
         if "cantonese" in model_name:
-            flashcard_class = CantoneseFlashcard
+            return CantoneseFlashcard
         else:
             # Default to Mandarin if not explicitly Cantonese
-            flashcard_class = MandarinFlashcard
+            return MandarinFlashcard
 
-        # Delegate to the language-specific implementation
-        return flashcard_class._from_anki_json(anki_json)
+    @classmethod
+    def related_words_parser(cls) -> RelatedWordsParser:
+        """Get the parser for this language's `Related Words` field."""
+        return get_related_words_parser(cls.RELATED_WORD_CLASS, cls.PRONUNCIATION_FIELD)
 
     @classmethod
-    def _from_anki_json(cls, anki_json: Dict[str, Any]):
+    def _from_anki_json(
+        cls,
+        anki_json: Dict[str, Any],
+        parse_related_words: bool = True,
+    ):
         """Language-specific implementation to create a flashcard from Anki note JSON.
 
         This should be overridden by subclasses to handle language-specific fields.
@@ -108,6 +172,8 @@ class LanguageFlashcard(BaseModel):
     ) -> List[RelatedWord]:
         """Parse related words text into a list of RelatedWord objects.
 
+        Lines that cannot be parsed are skipped, and logged in debug mode.
+
         Args:
             related_words_text: Text containing related words in the format "word (pronunciation) - english [relationship]"
             related_word_class: The class to use for creating related word objects
@@ -116,42 +182,11 @@ class LanguageFlashcard(BaseModel):
         Returns:
             List of RelatedWord objects
         """
-        related_words = []
-
-        # Split by lines and process each line
-        for line in related_words_text.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-
-            # Remove bullet points if present
-            if line.startswith("•") or line.startswith("-"):
-                line = line[1:].strip()
-
-            # Parse format: "word (pronunciation) - english [relationship]"
-            try:
-                # Split into parts
-                word_part, rest = line.split("(", 1)
-                pronunciation_part, rest = rest.split(")", 1)
-                rest = rest.strip()
-                if rest.startswith("-"):
-                    rest = rest[1:].strip()
-                english_part, relationship_part = rest.split("[", 1)
-                relationship_part = relationship_part.rstrip("]").strip()
-
-                # Create RelatedWord object with the appropriate pronunciation field
-                kwargs = {
-                    "word": word_part.strip(),
-                    "english": english_part.strip(),
-                    "relationship": relationship_part,
-                    pronunciation_field: pronunciation_part.strip(),
-                }
-                related_words.append(related_word_class(**kwargs))
-            except (ValueError, IndexError):
-                # Skip malformed entries
-                continue
-
-        return related_words
+        parser = get_related_words_parser(related_word_class, pronunciation_field)
+        result = parser.parse(related_words_text)
+        if result.malformed_lines:
+            _report_malformed_related_words(None, result.malformed_lines)
+        return result.related_words
 
     @classmethod
     def get_required_anki_fields(cls) -> List[str]:
@@ -215,6 +250,8 @@ class MandarinFlashcard(LanguageFlashcard):
     """Flashcard specifically for Mandarin Chinese."""
 
     LANGUAGE: ClassVar[str] = "mandarin"
+    RELATED_WORD_CLASS: ClassVar[Type[RelatedWord]] = MandarinRelatedWord
+    PRONUNCIATION_FIELD: ClassVar[str] = "pinyin"
 
     # Update field mappings to include Mandarin-specific fields
     ANKI_FIELD_NAMES: ClassVar[Dict[str, str]] = {
@@ -232,29 +269,41 @@ class MandarinFlashcard(LanguageFlashcard):
     )
 
     @classmethod
-    def _from_anki_json(cls, anki_json: Dict[str, Any]):
+    def _from_anki_json(
+        cls,
+        anki_json: Dict[str, Any],
+        parse_related_words: bool = True,
+    ):
         """Create a Mandarin flashcard from Anki note JSON."""
         fields = anki_json["fields"]
 
         # Extract basic fields
-        instance = cls(
-            anki_note_id=anki_json["noteId"],
-            word=fields["Chinese"]["value"],
-            pinyin=fields["Pinyin"]["value"],
-            english=fields["English"]["value"],
-            sample_usage=fields["Sample Usage"]["value"],
-            sample_usage_english=fields["Sample Usage (English)"]["value"],
-            frequency=None,  # Currently field is only at generation
-        )
+        values = {
+            "anki_note_id": anki_json["noteId"],
+            "word": fields["Chinese"]["value"],
+            "pinyin": fields["Pinyin"]["value"],
+            "english": fields["English"]["value"],
+            "sample_usage": fields["Sample Usage"]["value"],
+            "sample_usage_english": fields["Sample Usage (English)"]["value"],
+            "frequency": None,  # Currently field is only at generation
+            "related_words": [],
+        }
 
         # Parse related words if present
-        if "Related Words" in fields and fields["Related Words"]["value"]:
+        if (
+            parse_related_words
+            and "Related Words" in fields
+            and fields["Related Words"]["value"]
+        ):
             related_words_text = fields["Related Words"]["value"]
-            instance.related_words = cls._parse_related_words(
-                related_words_text, MandarinRelatedWord, "pinyin"
-            )
+            result = cls.related_words_parser().parse(related_words_text)
+            values["related_words"] = result.related_words
+            if result.malformed_lines:
+                _report_malformed_related_words(
+                    anki_json["noteId"], result.malformed_lines
+                )
 
-        return instance
+        return cls.model_validate(values)
 
     def __str__(self):
         base_str = f"""
@@ -290,6 +339,8 @@ class CantoneseFlashcard(LanguageFlashcard):
     """Flashcard specifically for Cantonese."""
 
     LANGUAGE: ClassVar[str] = "cantonese"
+    RELATED_WORD_CLASS: ClassVar[Type[RelatedWord]] = CantoneseRelatedWord
+    PRONUNCIATION_FIELD: ClassVar[str] = "jyutping"
 
     # Update field mappings to include Cantonese-specific fields
     ANKI_FIELD_NAMES: ClassVar[Dict[str, str]] = {
@@ -309,29 +360,41 @@ class CantoneseFlashcard(LanguageFlashcard):
     )
 
     @classmethod
-    def _from_anki_json(cls, anki_json: Dict[str, Any]):
+    def _from_anki_json(
+        cls,
+        anki_json: Dict[str, Any],
+        parse_related_words: bool = True,
+    ):
         """Create a Cantonese flashcard from Anki note JSON."""
         fields = anki_json["fields"]
 
         # Extract basic fields
-        instance = cls(
-            anki_note_id=anki_json["noteId"],
-            word=fields["Chinese"]["value"],
-            jyutping=fields["Jyutping"]["value"],
-            english=fields["English"]["value"],
-            sample_usage=fields["Sample Usage"]["value"],
-            sample_usage_english=fields["Sample Usage (English)"]["value"],
-            frequency=None,  # Currently field is only at generation
-        )
+        values = {
+            "anki_note_id": anki_json["noteId"],
+            "word": fields["Chinese"]["value"],
+            "jyutping": fields["Jyutping"]["value"],
+            "english": fields["English"]["value"],
+            "sample_usage": fields["Sample Usage"]["value"],
+            "sample_usage_english": fields["Sample Usage (English)"]["value"],
+            "frequency": None,  # Currently field is only at generation
+            "related_words": [],
+        }
 
         # Parse related words if present
-        if "Related Words" in fields and fields["Related Words"]["value"]:
+        if (
+            parse_related_words
+            and "Related Words" in fields
+            and fields["Related Words"]["value"]
+        ):
             related_words_text = fields["Related Words"]["value"]
-            instance.related_words = cls._parse_related_words(
-                related_words_text, CantoneseRelatedWord, "jyutping"
-            )
+            result = cls.related_words_parser().parse(related_words_text)
+            values["related_words"] = result.related_words
+            if result.malformed_lines:
+                _report_malformed_related_words(
+                    anki_json["noteId"], result.malformed_lines
+                )
 
-        return instance
+        return cls.model_validate(values)
 
     def __str__(self):
         base_str = f"""
@@ -358,6 +421,91 @@ class LanguageFlashcards(BaseModel):
     flashcards: List[LanguageFlashcard]
 
 
+@lru_cache(maxsize=None)
+def get_flashcard_list_adapter(
+    flashcard_class: Type[LanguageFlashcard],
+) -> TypeAdapter:
+    """Get a (cached) TypeAdapter that validates a list of flashcards.
+
+    Building a TypeAdapter compiles a validator, so it is done once per class.
+    """
+    return TypeAdapter(List[flashcard_class])
+
+
+def _to_strict_schema(schema: Any) -> Any:
+    """Make a JSON schema usable as a strict OpenAI structured-output schema.
+
+    Strict schemas need every property to be required, no additional
+    properties, no defaults, and a type for every enum.
+    """
+    if isinstance(schema, list):
+        return [_to_strict_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    strict = {
+        key: _to_strict_schema(value)
+        for key, value in schema.items()
+        if key != "default"
+    }
+    if "properties" in strict:
+        strict["additionalProperties"] = False
+        strict["required"] = list(strict["properties"])
+    if "enum" in strict and "type" not in strict:
+        types = {"string" if value is not None else "null" for value in strict["enum"]}
+        strict["type"] = sorted(types)
+    return strict
+
+
+def get_structured_output_format(model_class: Type[BaseModel]) -> Dict[str, Any]:
+    """Get the `response_format` that makes OpenAI respond with a model's JSON."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model_class.__name__,
+            "strict": True,
+            "schema": _to_strict_schema(model_class.model_json_schema()),
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def get_flashcards_response_format(
+    flashcard_class: Type[LanguageFlashcard],
+) -> Dict[str, Any]:
+    """Get the structured-output format of a `flashcards` array response."""
+    response_class = create_model(
+        f"{flashcard_class.__name__}s",
+        flashcards=(List[flashcard_class], ...),
+    )
+    return get_structured_output_format(response_class)
+
+
+@lru_cache(maxsize=None)
+def get_flashcard_fields_response_format(
+    flashcard_class: Type[LanguageFlashcard], field_names: Tuple[str, ...]
+) -> Dict[str, Any]:
+    """Get the structured-output format of a subset of a flashcard's fields.
+
+    Used to ask for corrected values of just the fields that failed validation.
+    """
+    fields = flashcard_class.model_fields
+    response_class = create_model(
+        f"{flashcard_class.__name__}Fields",
+        **{
+            name: (fields[name].annotation, Field(description=fields[name].description))
+            for name in field_names
+        },
+    )
+    return get_structured_output_format(response_class)
+
+
+def _report_malformed_related_words(note_id: Optional[int], lines: List[str]) -> None:
+    note = f"note {note_id}" if note_id is not None else "a note"
+    for line in lines:
+        dprint(f"Skipping malformed related word in {note}: {line!r}")
+
+
 # For backward compatibility
 ChineseFlashcard = MandarinFlashcard
 ChineseFlashcards = LanguageFlashcards
@@ -1,3 +1,15 @@
+"""Prompts for generating flashcards.
+
+Every flashcard request is a system message plus a user message. The system
+message holds the long, static instructions and is byte-identical for a given
+(language, learner level), so OpenAI's prompt prefix caching can reuse it across
+requests; it is compiled once per process. The user message holds the task,
+with the variable word or text last.
+"""
+
+from functools import lru_cache
+from typing import List
+
 from tutor.utils.config import get_config
 
 _LANGUAGE_DESCRIPTIONS = {
@@ -5,27 +17,12 @@ _LANGUAGE_DESCRIPTIONS = {
     "cantonese": "Cantonese Chinese",
 }
 
-
-def _get_flashcard_description(language: str) -> str:
-    """Get the flashcard description for the specified language.
-
-    Args:
-        language: The language to get the description for ("mandarin" or "cantonese")
-
-    Returns:
-        The flashcard description for the language
-    """
-    language_name = _LANGUAGE_DESCRIPTIONS.get(language.lower(), "Mandarin Chinese")
-    pronunciation_field = "pinyin" if language.lower() == "mandarin" else "jyutping"
-    learner_level = get_config().learner_level
-
-    return f"""
-Generate a {language_name} flashcard that helps {learner_level} students understand:
+_SYSTEM_PROMPT_TEMPLATE = """You are a {language_name} tutor creating Anki flashcards for {learner_level} students. Each flashcard helps students understand:
 1. The word's meaning and usage context
 2. How it's naturally used in sentences
 3. Its relationship to other commonly paired words or words with similar patterns
 
-Your response must be a valid JSON object with these fields:
+Respond with a valid JSON object that has a "flashcards" array of flashcard objects, each with these fields:
 - "word": The Chinese character(s)
 - "{pronunciation_field}": The pronunciation with tone marks/numbers
 - "english": The English translation
@@ -35,8 +32,51 @@ Your response must be a valid JSON object with these fields:
   - "word": The related Chinese character(s)
   - "{pronunciation_field}": The pronunciation with tone marks/numbers
   - "english": The English translation
-  - "relationship": How this word relates to the main word (e.g., "synonym", "antonym", "similar pattern")
-"""
+  - "relationship": How this word relates to the main word (e.g., "synonym", "antonym", "similar pattern")"""
+
+_WORD_PROMPT_TEMPLATE = """Generate a flashcard for the word/phrase below. If the input seems wrong, please select the most-likely intended phrase.
+Word/phrase: {word}"""
+
+_WORDS_PROMPT_TEMPLATE = """Generate one flashcard for each of the {count} words/phrases below, in the same order. The "word" field of each flashcard must be exactly the word/phrase as given.
+{word_list}"""
+
+_PARAGRAPH_PROMPT_TEMPLATE = """Below the line is a paragraph from an article. Extract 3-5 key vocabulary and grammar phrases, except proper nouns, and generate a flashcard for each.
+--
+{text}"""
+
+_CONVERSATION_PROMPT_TEMPLATE = """Below the line is a conversation between a language learner and a LLM assistant. Extract 3-5 key vocabulary and grammar phrases, except proper nouns, and generate a flashcard for each.
+--
+{text}"""
+
+_REPAIR_PROMPT_TEMPLATE = """The following flashcard failed validation:
+{flashcard_json}
+
+Respond with a valid JSON object containing corrected values for only the fields with errors, keeping the rest of the flashcard in mind.
+Errors:
+{error_list}"""
+
+
+@lru_cache(maxsize=None)
+def _compile_system_prompt(language: str, learner_level: str) -> str:
+    language_name = _LANGUAGE_DESCRIPTIONS.get(language, "Mandarin Chinese")
+    pronunciation_field = "pinyin" if language == "mandarin" else "jyutping"
+    return _SYSTEM_PROMPT_TEMPLATE.format(
+        language_name=language_name,
+        learner_level=learner_level,
+        pronunciation_field=pronunciation_field,
+    )
+
+
+def get_flashcard_system_prompt(language: str = "mandarin") -> str:
+    """Get the static system prompt for generating flashcards.
+
+    Args:
+        language: The language of the flashcards ("mandarin" or "cantonese")
+
+    Returns:
+        The system prompt for the language and the configured learner level
+    """
+    return _compile_system_prompt(language.lower(), get_config().learner_level)
 
 
 def get_generate_flashcard_from_word_prompt(word: str, language: str = "mandarin"):
@@ -44,17 +84,30 @@ def get_generate_flashcard_from_word_prompt(word: str, language: str = "mandarin
 
     Args:
         word: The word to create a flashcard for
-        language: The language of the word ("mandarin" or "cantonese")
+        language: The language of the word ("mandarin" or "cantonese"), which
+            is described by the system prompt
 
     Returns:
         A prompt for generating a flashcard
     """
-    flashcard_description = _get_flashcard_description(language)
+    return _WORD_PROMPT_TEMPLATE.format(word=word)
+
 
-    return f"""Generate a {language} flashcard for the word/phrase {word}. If the input seems wrong, please select the most-likely intended phrase.
+def get_generate_flashcards_from_words_prompt(
+    words: List[str], language: str = "mandarin"
+):
+    """Generate a prompt for creating one flashcard per word, in one request.
+
+    Args:
+        words: The words to create flashcards for
+        language: The language of the words ("mandarin" or "cantonese"), which
+            is described by the system prompt
 
-Respond with a single valid JSON object that follows this structure exactly.
-{flashcard_description}"""
+    Returns:
+        A prompt for generating flashcards
+    """
+    word_list = "\n".join(f"- {word}" for word in words)
+    return _WORDS_PROMPT_TEMPLATE.format(count=len(words), word_list=word_list)
 
 
 def get_generate_flashcard_from_paragraph_prompt(text: str, language: str = "mandarin"):
@@ -62,21 +115,13 @@ def get_generate_flashcard_from_paragraph_prompt(text: str, language: str = "man
 
     Args:
         text: The paragraph to extract words from
-        language: The language of the paragraph ("mandarin" or "cantonese")
+        language: The language of the paragraph ("mandarin" or "cantonese"),
+            which is described by the system prompt
 
     Returns:
         A prompt for generating flashcards
     """
-    language_name = _LANGUAGE_DESCRIPTIONS.get(language.lower(), "Mandarin Chinese")
-    flashcard_description = _get_flashcard_description(language)
-
-    return f"""Below the line is a paragraph from an article in {language_name}. Extract 3-5 key vocabulary and grammar phrases, except proper nouns.
---
-{text}
---
-
-Respond with a valid JSON object that has a "flashcards" array containing multiple flashcard objects, one for each extracted word or phrase.
-{flashcard_description}"""
+    return _PARAGRAPH_PROMPT_TEMPLATE.format(text=text)
 
 
 def get_generate_flashcard_from_llm_conversation_prompt(
@@ -86,18 +131,26 @@ def get_generate_flashcard_from_llm_conversation_prompt(
 
     Args:
         text: The conversation to extract words from
-        language: The language of the conversation ("mandarin" or "cantonese")
+        language: The language of the conversation ("mandarin" or "cantonese"),
+            which is described by the system prompt
 
     Returns:
         A prompt for generating flashcards
     """
-    language_name = _LANGUAGE_DESCRIPTIONS.get(language.lower(), "Mandarin Chinese")
-    flashcard_description = _get_flashcard_description(language)
+    return _CONVERSATION_PROMPT_TEMPLATE.format(text=text)
 
-    return f"""Below the line is a conversation between a language learner and a LLM assistant in {language_name}. Extract 3-5 key vocabulary and grammar phrases, except proper nouns.
---
-{text}
---
 
-Respond with a valid JSON object that has a "flashcards" array containing multiple flashcard objects, one for each extracted word or phrase.
-{flashcard_description}"""
+def get_repair_flashcard_fields_prompt(flashcard_json: str, errors: List[str]):
+    """Generate a prompt for correcting the invalid fields of a flashcard.
+
+    Args:
+        flashcard_json: The flashcard as generated, in JSON
+        errors: The validation errors, as "field: message"
+
+    Returns:
+        A prompt for generating corrected values of the invalid fields only
+    """
+    error_list = "\n".join(f"- {error}" for error in errors)
+    return _REPAIR_PROMPT_TEMPLATE.format(
+        flashcard_json=flashcard_json, error_list=error_list
+    )
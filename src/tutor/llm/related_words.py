@@ -0,0 +1,112 @@
+"""Parser for the `Related Words` field of flashcard notes.
+
+Each line of the field has the form
+
+    • word (pronunciation) - english [relationship]
+
+where the bullet and dash are optional, and the English may itself contain
+parentheses or brackets (the relationship is always the last bracketed part).
+Each line is split in a single pass with str.partition, which in CPython is
+considerably faster than matching a regular expression per line. Lines that do
+not parse are reported back instead of being dropped silently.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Type
+
+from pydantic import BaseModel
+
+# Anki's editor stores line breaks as <br> tags
+HTML_LINE_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_BULLETS = "•-* \t"
+
+
+class RelatedWordsParseResult(NamedTuple):
+    """Related words parsed from one note, plus the lines that did not parse."""
+
+    related_words: List[BaseModel]
+    malformed_lines: List[str]
+
+
+class RelatedWordsParser:
+    """Parses `Related Words` fields into related word models.
+
+    Args:
+        related_word_class: The RelatedWord subclass to create
+        pronunciation_field: Name of the pronunciation field of that class
+            ("pinyin" or "jyutping")
+    """
+
+    def __init__(
+        self,
+        related_word_class: Type[BaseModel],
+        pronunciation_field: str,
+    ):
+        self.related_word_class = related_word_class
+        self.pronunciation_field = pronunciation_field
+
+    def parse(self, text: str) -> RelatedWordsParseResult:
+        """Parse the `Related Words` field of one note."""
+        return self.parse_many([text])[0]
+
+    def parse_many(self, texts: Iterable[str]) -> List[RelatedWordsParseResult]:
+        """Parse the `Related Words` fields of many notes in one pass."""
+        # Bind everything used in the loop to locals; this runs for every note
+        pronunciation_field = self.pronunciation_field
+        create = self.related_word_class.__pydantic_validator__.validate_python
+
+        results = []
+        for text in texts:
+            related_words = []
+            malformed_lines = []
+            if text:
+                if "<" in text:
+                    text = HTML_LINE_BREAK.sub("\n", text)
+                if "&" in text:
+                    text = text.replace("&nbsp;", " ")
+                for line in text.split("\n"):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if "(" not in line:
+                        line = line.replace("（", "(").replace("）", ")")
+
+                    # word (pronunciation) - english [relationship]
+                    word, open_paren, rest = line.partition("(")
+                    pronunciation, close_paren, rest = rest.partition(")")
+                    # The relationship is the last bracketed part; the English
+                    # before it may contain parentheses or brackets itself
+                    english, open_bracket, relationship = rest.rpartition("[")
+                    word = word.lstrip(_BULLETS).rstrip()
+                    if (
+                        not (open_paren and close_paren and open_bracket and word)
+                        or "(" in pronunciation
+                        or not relationship.endswith("]")
+                    ):
+                        malformed_lines.append(line)
+                        continue
+
+                    english = english.strip()
+                    if english.startswith("-"):
+                        english = english[1:].lstrip()
+                    related_words.append(
+                        create(
+                            {
+                                "word": word,
+                                "english": english,
+                                "relationship": relationship[:-1].strip(),
+                                pronunciation_field: pronunciation.strip(),
+                            }
+                        )
+                    )
+            results.append(RelatedWordsParseResult(related_words, malformed_lines))
+        return results
+
+
+@lru_cache(maxsize=None)
+def get_related_words_parser(
+    related_word_class: Type[BaseModel], pronunciation_field: str
+) -> RelatedWordsParser:
+    """Get a shared parser for a related word class."""
+    return RelatedWordsParser(related_word_class, pronunciation_field)
@@ -0,0 +1,119 @@
+"""Field-level repair of flashcards that failed validation.
+
+Throwing away a whole generation because one field of one flashcard is invalid
+wastes the request and makes the user retry. Instead, the fields that failed
+validation are sent back to the model on their own, with the validation errors,
+and the corrected values are merged into the original flashcard.
+
+Each repair is recorded in the LLM telemetry, so that `ct stats llm` can report
+how often repairs are needed and whether they work.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import ValidationError
+
+from tutor.llm.models import (
+    LanguageFlashcard,
+    get_flashcard_fields_response_format,
+    get_flashcard_list_adapter,
+)
+from tutor.llm.prompts import get_repair_flashcard_fields_prompt
+from tutor.llm.telemetry import record_repair
+from tutor.utils.logging import dprint
+
+
+def get_invalid_fields(
+    error: ValidationError, flashcard_class: Type[LanguageFlashcard]
+) -> Optional[Dict[int, Dict[str, List[str]]]]:
+    """Group the errors of a flashcard list validation by flashcard and field.
+
+    Returns:
+        Error messages by field name, by index of the flashcard in the list.
+        None if an error is not about a field of a flashcard, and so cannot be
+        repaired field by field.
+    """
+    invalid: Dict[int, Dict[str, List[str]]] = {}
+    for e in error.errors():
+        loc = e["loc"]
+        if (
+            len(loc) < 2
+            or not isinstance(loc[0], int)
+            or loc[1] not in flashcard_class.model_fields
+        ):
+            return None
+        path = ".".join(str(part) for part in loc[1:])
+        invalid.setdefault(loc[0], {}).setdefault(loc[1], []).append(
+            f"{path}: {e['msg']}"
+        )
+    return invalid
+
+
+def repair_flashcards_data(
+    flashcards_data: List[Dict[str, Any]],
+    flashcard_class: Type[LanguageFlashcard],
+    error: ValidationError,
+    request_json: Callable[[str, Dict], str],
+    model: str,
+) -> List[LanguageFlashcard]:
+    """Repair the invalid fields of flashcards and validate them again.
+
+    Args:
+        flashcards_data: The flashcards as returned by the model
+        flashcard_class: The class the flashcards should validate as
+        error: The error from validating flashcards_data
+        request_json: Sends a prompt with a response format, returning the
+            model's JSON response
+        model: The model that generated the flashcards, for telemetry
+
+    Returns:
+        The validated flashcards
+
+    Raises:
+        ValidationError: If the flashcards cannot be repaired
+        json.JSONDecodeError: If a repair response is not JSON
+    """
+    invalid = get_invalid_fields(error, flashcard_class)
+    if invalid is None:
+        record_repair(model, flashcards=0, fields=0, outcome="unrepairable")
+        raise error
+
+    repaired_flashcards = 0
+    repaired_fields = 0
+    outcome = "failed"
+    try:
+        repaired = list(flashcards_data)
+        for index, field_errors in invalid.items():
+            field_names = tuple(sorted(field_errors))
+            item = flashcards_data[index]
+            dprint(
+                f"Repairing fields {field_names} of flashcard {index}: {field_errors}"
+            )
+            prompt = get_repair_flashcard_fields_prompt(
+                json.dumps(item, ensure_ascii=False),
+                [message for messages in field_errors.values() for message in messages],
+            )
+            response_format = get_flashcard_fields_response_format(
+                flashcard_class, field_names
+            )
+            values = json.loads(request_json(prompt, response_format))
+            repaired[index] = {
+                **item,
+                **{name: values[name] for name in field_names if name in values},
+            }
+            repaired_flashcards += 1
+            repaired_fields += len(field_names)
+
+        flashcards = get_flashcard_list_adapter(flashcard_class).validate_python(
+            repaired
+        )
+        outcome = "ok"
+        return flashcards
+    finally:
+        record_repair(
+            model,
+            flashcards=repaired_flashcards,
+            fields=repaired_fields,
+            outcome=outcome,
+        )
@@ -0,0 +1,191 @@
+"""Persistent on-disk cache of LLM responses.
+
+Flashcard generation requests are deterministic (fixed model, prompt and
+seed), so re-running a command after a crash used to pay for the same words
+again. Raw responses are stored in SQLite in the config directory, keyed by a
+hash of the model, seed and prompt. Prompts whose response failed validation
+are remembered in a separate negative cache so they are not retried on every
+run. Entries are evicted by age, and least recently used entries are evicted
+once the cache grows past its size limit.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from tutor.utils.config import get_config_dir
+from tutor.utils.logging import dprint
+
+DEFAULT_MAX_AGE_SECONDS = 90 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# Failures are retried sooner, in case the prompt or model improved
+DEFAULT_FAILURE_MAX_AGE_SECONDS = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at);
+CREATE TABLE IF NOT EXISTS failures (
+    key TEXT PRIMARY KEY,
+    error TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def get_default_response_cache_path() -> Path:
+    """Returns the default location of the LLM response cache."""
+    return get_config_dir() / "llm_cache.sqlite3"
+
+
+def get_cache_key(model: str, prompt: str, seed: Optional[int]) -> str:
+    """Hash the parts of a request that determine its response."""
+    digest = hashlib.sha256()
+    for part in (model, str(seed), prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite cache of raw LLM responses, with a negative cache of failures."""
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        failure_max_age: float = DEFAULT_FAILURE_MAX_AGE_SECONDS,
+    ):
+        self.db_path = Path(db_path) if db_path else get_default_response_cache_path()
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.failure_max_age = failure_max_age
+        self._lock = threading.Lock()
+        # Shared between threads; every use is guarded by the lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self.evict()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "LLMResponseCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None if there is no fresh one."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.max_age),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key)
+            )
+        return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a response, clearing any failure recorded for the key."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, size, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+            self._conn.execute("DELETE FROM failures WHERE key = ?", (key,))
+            self._evict_over_size()
+
+    def get_failure(self, key: str) -> Optional[str]:
+        """Get the error of a recent failure for the key, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT error FROM failures WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.failure_max_age),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_failure(self, key: str, error: str) -> None:
+        """Record that the response for a key failed validation.
+
+        The cached response (if any) is dropped, since it is no good.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO failures (key, error, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, error, time.time()),
+            )
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def evict(self) -> None:
+        """Drop expired entries and shrink the cache to its size limit."""
+        now = time.time()
+        with self._lock, self._conn:
+            expired = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.max_age,)
+            ).rowcount
+            self._conn.execute(
+                "DELETE FROM failures WHERE created_at < ?",
+                (now - self.failure_max_age,),
+            )
+            evicted = self._evict_over_size()
+        if expired or evicted:
+            dprint(f"Evicted {expired} expired and {evicted} LRU cached responses")
+
+    def _evict_over_size(self) -> int:
+        """Delete least recently used responses until under max_bytes.
+
+        Must be called with the lock held, inside a transaction.
+        """
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return 0
+
+        keys = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_used_at"
+        ):
+            if total <= self.max_bytes:
+                break
+            keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        return len(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+# Singleton instance
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    global _response_cache
+    # Flashcards may be generated from several threads at once
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = LLMResponseCache()
+    return _response_cache
@@ -0,0 +1,220 @@
+"""Local, append-only telemetry of LLM calls.
+
+Every chat completion appends one JSON line to a file in the config directory,
+with its model, token usage, latency, retries and outcome, and the CLI command
+it was made for. Flashcard generation also records how many cards each fresh
+response produced, so tokens per card can be worked out, and how invalid
+responses were repaired. `ct stats llm` summarizes the records over a time
+window.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from tutor.cli_global_state import get_command
+from tutor.utils.config import get_config_dir
+from tutor.utils.logging import dprint
+
+# Record types
+CALL = "call"
+CARDS = "cards"
+REPAIR = "repair"
+
+# USD per million (input, cached input, output) tokens
+MODEL_PRICES: Dict[str, tuple] = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4": (30.00, 30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+}
+
+_lock = threading.Lock()
+
+
+def get_default_telemetry_path() -> Path:
+    """Returns the default location of the LLM telemetry log."""
+    return get_config_dir() / "llm_telemetry.jsonl"
+
+
+def _append(record: Dict, path: Optional[Path] = None) -> None:
+    record = {"ts": time.time(), "command": get_command(), **record}
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    try:
+        with _lock, open(path or get_default_telemetry_path(), "a") as f:
+            f.write(line)
+    except OSError as e:
+        # Telemetry must never break the call it describes
+        dprint(f"Could not record LLM telemetry: {e}")
+
+
+def record_llm_call(
+    model: str,
+    latency: float,
+    attempts: int,
+    outcome: str,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cached_tokens: int = 0,
+    queued: float = 0.0,
+) -> None:
+    """Record one LLM call.
+
+    Args:
+        model: The model called
+        latency: Wall-clock seconds of the whole call, including retries
+        attempts: Number of requests sent (1 if there were no retries)
+        outcome: "ok", or the name of the error the call failed with
+        prompt_tokens: Prompt tokens used, including cached ones
+        completion_tokens: Completion tokens used
+        cached_tokens: Prompt tokens served from the prompt prefix cache
+        queued: Seconds of the latency spent waiting on rate limits
+    """
+    _append(
+        {
+            "type": CALL,
+            "model": model,
+            "latency": round(latency, 4),
+            "queued": round(queued, 4),
+            "attempts": attempts,
+            "outcome": outcome,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+        }
+    )
+
+
+def record_cards(model: str, count: int) -> None:
+    """Record how many flashcards a fresh (uncached) response produced."""
+    _append({"type": CARDS, "model": model, "count": count})
+
+
+def record_repair(model: str, flashcards: int, fields: int, outcome: str) -> None:
+    """Record the repair of a response with invalid flashcards.
+
+    Args:
+        model: The model that generated the response
+        flashcards: Number of flashcards whose fields were regenerated
+        fields: Number of fields regenerated
+        outcome: "ok", "failed", or "unrepairable" for errors that are not
+            about a field of a flashcard
+    """
+    _append(
+        {
+            "type": REPAIR,
+            "model": model,
+            "flashcards": flashcards,
+            "fields": fields,
+            "outcome": outcome,
+        }
+    )
+
+
+def iter_records(since: float = 0.0, path: Optional[Path] = None) -> Iterator[Dict]:
+    """Iterate over the records made at or after `since` (a UNIX time)."""
+    path = path or get_default_telemetry_path()
+    if not path.exists():
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash
+                continue
+            if record.get("ts", 0) >= since:
+                yield record
+
+
+def estimate_cost(
+    model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int
+) -> Optional[float]:
+    """Estimate the cost of tokens in USD, or None for models without prices."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        # Dated snapshots are priced like their alias, e.g. gpt-4o-2024-08-06
+        prices = next(
+            (p for name, p in MODEL_PRICES.items() if model.startswith(name + "-")),
+            None,
+        )
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of the values, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(records: List[Dict]) -> Dict[tuple, Dict]:
+    """Summarize records by (command, model).
+
+    Returns:
+        Per (command, model): "calls", "errors", "retries", "p50" and "p95"
+        latency, token totals, "cards", "tokens_per_card", "cost" (None when
+        unknown), and the number of responses that needed "repairs" and of
+        those that could not be repaired ("failed_repairs")
+    """
+    latencies = defaultdict(list)
+    summaries: Dict[tuple, Dict] = defaultdict(
+        lambda: {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "cards": 0,
+            "repairs": 0,
+            "failed_repairs": 0,
+        }
+    )
+    for record in records:
+        key = (record.get("command") or "-", record.get("model", "-"))
+        summary = summaries[key]
+        if record.get("type") == CARDS:
+            summary["cards"] += record["count"]
+            continue
+        if record.get("type") == REPAIR:
+            summary["repairs"] += 1
+            if record["outcome"] != "ok":
+                summary["failed_repairs"] += 1
+            continue
+        summary["calls"] += 1
+        summary["retries"] += record["attempts"] - 1
+        if record["outcome"] != "ok":
+            summary["errors"] += 1
+        for field in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+            summary[field] += record[field]
+        latencies[key].append(record["latency"])
+
+    for key, summary in summaries.items():
+        model = key[1]
+        summary["p50"] = percentile(latencies[key], 50)
+        summary["p95"] = percentile(latencies[key], 95)
+        total_tokens = summary["prompt_tokens"] + summary["completion_tokens"]
+        summary["tokens_per_card"] = (
+            total_tokens / summary["cards"] if summary["cards"] else None
+        )
+        summary["cost"] = estimate_cost(
+            model,
+            summary["prompt_tokens"],
+            summary["cached_tokens"],
+            summary["completion_tokens"],
+        )
+    return dict(summaries)
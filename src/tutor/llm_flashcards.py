@@ -1,10 +1,33 @@
-from openai import OpenAI
+import json
 import click
-from typing import List, Type
+from concurrent.futures import Future, ThreadPoolExecutor
+from pydantic import ValidationError
+from typing import Dict, List, Optional, Tuple, Type
 from tutor.utils.logging import dprint
 from tutor.utils.anki import AnkiConnectClient, get_subdeck
-from tutor.llm.models import LanguageFlashcard, MandarinFlashcard, CantoneseFlashcard
-from tutor.cli_global_state import get_model, get_skip_confirm
+from tutor.llm.models import (
+    LanguageFlashcard,
+    MandarinFlashcard,
+    CantoneseFlashcard,
+    get_flashcard_list_adapter,
+    get_flashcards_response_format,
+)
+from tutor.llm.repair import repair_flashcards_data
+from tutor.llm.prompts import (
+    get_flashcard_system_prompt,
+    get_generate_flashcard_from_word_prompt,
+    get_generate_flashcards_from_words_prompt,
+)
+from tutor.language_processing import LanguagePreprocessor
+from tutor.llm.client import chat_completion
+from tutor.llm.response_cache import get_cache_key, get_response_cache
+from tutor.llm.telemetry import record_cards
+from tutor.cli_global_state import (
+    get_model,
+    get_refresh_cache,
+    get_skip_confirm,
+    get_use_cache,
+)
 from tutor.utils.azure import text_to_speech
 from tutor.utils.config import get_config
 
@@ -12,63 +35,230 @@ GPT_3_5_TURBO = "gpt-3.5-turbo"
 GPT_4 = "gpt-4"
 GPT_4o = "gpt-4o"
 
+# Fixed so that responses are reproducible, and therefore cacheable
+FLASHCARD_SEED = 69
 
-def generate_flashcards(text, language: str = "mandarin"):
+# Text-to-speech requests to run at once (sample usage and word of a card)
+_AUDIO_WORKERS = 2
+
+
+def generate_flashcards(
+    text, language: str = "mandarin", responses: Optional[Dict[str, str]] = None
+):
     """
     Generates flashcard content from the given text using OpenAI's GPT model.
 
+    Responses are cached on disk (see tutor.llm.response_cache), so repeating a
+    prompt does not call OpenAI again unless caching is turned off with
+    --no-cache or bypassed with --refresh.
+
     :param text: The text from which to generate flashcards.
     :param language: The language to generate flashcards for ("mandarin" or "cantonese").
+    :param responses: Responses already generated for prompts, e.g. by a batch
+        job, by prompt. A response found here is used as is.
     :return: Generated flashcard content.
     """
-    openai_client = OpenAI()
-
     # Select the appropriate flashcard class based on language
     flashcard_class = get_flashcard_class_for_language(language)
 
+    model = get_model()
+    cache = get_response_cache() if get_use_cache() else None
+    cache_key = get_flashcards_cache_key(text, model, language)
+
+    response_content = responses.get(text) if responses else None
+    if response_content is not None:
+        dprint(f"Using given response for prompt {cache_key[:12]}")
+    elif cache is not None and not get_refresh_cache():
+        failure = cache.get_failure(cache_key)
+        if failure is not None:
+            print(
+                f"Skipping {language} flashcards, the last response for this "
+                f"prompt was invalid ({failure}). Use --refresh to retry."
+            )
+            return []
+        response_content = cache.get(cache_key)
+        if response_content is not None:
+            dprint(f"Using cached response for prompt {cache_key[:12]}")
+
+    from_cache = response_content is not None
+    requested = not from_cache
     try:
         dprint(text)
-        # Use the standard completion API instead of parse
-        completion = openai_client.chat.completions.create(
-            model=get_model(),
-            response_format={"type": "json_object"},
-            messages=[{"role": "user", "content": text}],
-            seed=69,
-        )
-
-        # Extract the JSON content from the response
-        response_content = completion.choices[0].message.content
+        if not from_cache:
+            response_content = _request_flashcards_json(text, model, language)
         dprint(f"Response content: {response_content}")
+    except Exception as e:
+        print(f"Error generating {language} flashcards:", e)
+        import traceback
+
+        traceback.print_exc()
+        return []
+
+    try:
+        flashcards_data = get_flashcards_data(response_content)
+        try:
+            adapter = get_flashcard_list_adapter(flashcard_class)
+            flashcards = adapter.validate_python(flashcards_data)
+        except ValidationError as e:
+            # Ask again for just the invalid fields, not the whole response
+            dprint(f"Repairing invalid {language} flashcards: {e}")
+            flashcards = repair_flashcards_data(
+                flashcards_data,
+                flashcard_class,
+                e,
+                lambda prompt, response_format: _request_json(
+                    prompt, response_format, model
+                ),
+                model,
+            )
+            # Cache the repaired response, so the repair is not needed again
+            response_content = _dump_flashcards_json(flashcards)
+            from_cache = False
+    except (json.JSONDecodeError, ValidationError) as e:
+        print(f"Error generating {language} flashcards:", e)
+        if cache is not None:
+            cache.put_failure(cache_key, f"{type(e).__name__}: {str(e)[:200]}")
+        return []
+    except Exception as e:
+        print(f"Error repairing {language} flashcards:", e)
+        return []
 
-        # Parse the JSON content into flashcard objects
-        import json
-        from pydantic import TypeAdapter
+    if requested:
+        record_cards(model, len(flashcards))
+    if cache is not None and not from_cache:
+        cache.put(cache_key, model, response_content)
+    return flashcards
 
-        # Parse the JSON response
-        response_data = json.loads(response_content)
 
-        # Handle both single flashcard and list of flashcards
-        if isinstance(response_data, list):
-            flashcards_data = response_data
-        else:
-            # If it's a single object or has a nested structure
-            if "flashcards" in response_data:
-                flashcards_data = response_data["flashcards"]
+def generate_flashcards_for_words(
+    words: List[str], language: str = "mandarin"
+) -> Dict[str, LanguageFlashcard]:
+    """Generate one flashcard for each word, asking for all of them at once.
+
+    Flashcards in the response are matched back to the words by their `word`
+    field (after the same simplified/traditional conversion the words went
+    through). Words missing from the response are then requested again one by
+    one, with the single-word prompt.
+
+    :param words: The words to generate flashcards for.
+    :param language: The language to generate flashcards for ("mandarin" or "cantonese").
+    :return: Flashcards by word. Words no flashcard could be generated for are left out.
+    """
+    flashcards_by_word: Dict[str, LanguageFlashcard] = {}
+    if len(words) > 1:
+        prompt = get_generate_flashcards_from_words_prompt(words, language)
+        dprint(prompt)
+        wanted = set(words)
+        for flashcard in generate_flashcards(prompt, language):
+            word = LanguagePreprocessor.process_for_language(
+                flashcard.word.strip(), language
+            )
+            if word in wanted and word not in flashcards_by_word:
+                flashcards_by_word[word] = flashcard
             else:
-                # Treat as a single flashcard
-                flashcards_data = [response_data]
+                dprint(f"Ignoring flashcard for unrequested word '{flashcard.word}'")
+
+    missing = [word for word in words if word not in flashcards_by_word]
+    if len(words) > 1 and missing:
+        dprint(f"Re-requesting words missing from the batch response: {missing}")
+    for word in missing:
+        prompt = get_generate_flashcard_from_word_prompt(word, language)
+        dprint(prompt)
+        flashcards = generate_flashcards(prompt, language)
+        if flashcards:
+            flashcards_by_word[word] = flashcards[0]
+    return flashcards_by_word
+
+
+def _request_flashcards_json(text: str, model: str, language: str) -> str:
+    """Ask OpenAI for flashcards, returning the raw JSON response."""
+    # Use the standard completion API instead of parse
+    completion = chat_completion(**get_flashcards_request(text, model, language))
+    # Extract the JSON content from the response
+    return completion.choices[0].message.content
+
+
+def _request_json(text: str, response_format: Dict, model: str) -> str:
+    """Send a prompt with a structured-output format, returning the JSON."""
+    completion = chat_completion(
+        model=model,
+        response_format=_get_response_format(model, response_format),
+        messages=[{"role": "user", "content": text}],
+        seed=FLASHCARD_SEED,
+    )
+    return completion.choices[0].message.content
 
-        # Use TypeAdapter to convert the JSON data to flashcard objects
-        adapter = TypeAdapter(List[flashcard_class])
-        flashcards = adapter.validate_python(flashcards_data)
 
-        return flashcards
-    except Exception as e:
-        print(f"Error generating {language} flashcards:", e)
-        import traceback
+def _get_response_format(model: str, structured_format: Dict) -> Dict:
+    """Use a structured-output format, unless the model is too old for one."""
+    if model in (GPT_3_5_TURBO, GPT_4):
+        return {"type": "json_object"}
+    return structured_format
 
-        traceback.print_exc()
-        return []
+
+def get_flashcards_request(text: str, model: str, language: str = "mandarin") -> Dict:
+    """Get the chat completion parameters for a flashcard prompt.
+
+    The response must match the flashcard model's JSON schema (a "flashcards"
+    array), which OpenAI enforces with strict structured outputs.
+
+    Also used as the request body of batch jobs, so that their responses are
+    interchangeable with (and cached like) synchronous ones.
+    """
+    flashcard_class = get_flashcard_class_for_language(language)
+    return {
+        "model": model,
+        "response_format": _get_response_format(
+            model, get_flashcards_response_format(flashcard_class)
+        ),
+        # The static system prompt comes first so that it is a cacheable prefix
+        "messages": [
+            {"role": "system", "content": get_flashcard_system_prompt(language)},
+            {"role": "user", "content": text},
+        ],
+        "seed": FLASHCARD_SEED,
+    }
+
+
+def get_flashcards_cache_key(text: str, model: str, language: str = "mandarin") -> str:
+    """Get the response cache key of a flashcard prompt.
+
+    The key covers the system prompt too, which changes with the language and
+    the configured learner level.
+    """
+    return get_cache_key(
+        model, f"{get_flashcard_system_prompt(language)}\0{text}", FLASHCARD_SEED
+    )
+
+
+def get_flashcards_data(response_content: str) -> List[Dict]:
+    """Get the list of flashcard dicts from a JSON response.
+
+    Raises:
+        json.JSONDecodeError: If the response is not JSON
+    """
+    response_data = json.loads(response_content)
+
+    # Handle both single flashcard and list of flashcards
+    if isinstance(response_data, list):
+        return response_data
+    # If it's a single object or has a nested structure
+    if "flashcards" in response_data:
+        return response_data["flashcards"]
+    # Treat as a single flashcard
+    return [response_data]
+
+
+def _dump_flashcards_json(flashcards: List[LanguageFlashcard]) -> str:
+    return json.dumps(
+        {
+            "flashcards": [
+                flashcard.model_dump(mode="json", exclude={"anki_note_id"})
+                for flashcard in flashcards
+            ]
+        },
+        ensure_ascii=False,
+    )
 
 
 def get_flashcard_class_for_language(language: str) -> Type[LanguageFlashcard]:
@@ -86,19 +276,9 @@ def get_flashcard_class_for_language(language: str) -> Type[LanguageFlashcard]:
         return MandarinFlashcard
 
 
-def get_word_exists_query(word: str, language: str = "mandarin"):
-    """
-    Returns a query to check if a word exists in Anki.
-
-    :param word: The word to check for.
-    :param language: The language of the word.
-    :return: An Anki query string.
-    """
-    return f'"deck:{get_config().default_deck}" Chinese:{word}'
-
-
-def get_similar_words_exists_query(word: str):
-    return f'"deck:{get_config().default_deck}" Chinese:*{word}*'
+def _cancel_all(futures: Tuple[Future, ...]) -> None:
+    for future in futures:
+        future.cancel()
 
 
 def maybe_add_flashcards_to_deck(
@@ -107,53 +287,100 @@ def maybe_add_flashcards_to_deck(
     """Add flashcards to deck.
 
     The caller should have already checked if the cards exist in Anki.
-    This function will only ask for confirmation and add the cards.
+    This function will only ask for confirmation and add the cards. The audio
+    for each card is synthesized in the background while its confirmation
+    prompt is showing, and dropped if the card is skipped. Confirmed cards are
+    added together with a single bulk request once every card has been
+    reviewed.
 
     Returns:
         bool: True if any cards were added, False if all cards were skipped
     """
     ankiconnect_client = AnkiConnectClient()
-    num_added = 0
+    confirmed = []
+    audio_filepaths = []
+    skip_confirm = get_skip_confirm()
+    executor = ThreadPoolExecutor(max_workers=_AUDIO_WORKERS)
+    pending_audio = {}
+
+    def start_audio(index: int) -> None:
+        f = flashcards[index]
+        pending_audio[index] = (
+            executor.submit(text_to_speech, f.sample_usage, f.LANGUAGE),
+            executor.submit(text_to_speech, f.word, f.LANGUAGE),
+        )
+
+    if skip_confirm:
+        # Nothing to wait for, so generate all the audio at once
+        for i in range(len(flashcards)):
+            start_audio(i)
 
     try:
-        for f in flashcards:
+        for i, f in enumerate(flashcards):
             print(f)
 
-            if not get_skip_confirm():
+            if not skip_confirm:
+                # Generate the audio while the user decides
+                start_audio(i)
                 try:
                     if not click.confirm("Add this to deck?", err=True, default=True):
                         dprint(" - skipped")
+                        _cancel_all(pending_audio.pop(i))
                         continue
                 except (KeyboardInterrupt, EOFError):
                     print("\nAborted by user")
-                    return False
+                    break
 
             try:
-                # Generate audio for both the word and sample usage
-                sample_usage_audio_filepath = text_to_speech(f.sample_usage, f.LANGUAGE)
-                word_audio_filepath = text_to_speech(f.word, f.LANGUAGE)
-
-                # Add the flashcard with both audio files
-                note_id = ankiconnect_client.add_flashcard(
-                    deck,
-                    f,
-                    sample_usage_audio_filepath=sample_usage_audio_filepath,
-                    word_audio_filepath=word_audio_filepath,
-                )
-                dprint(f" - added with note ID: {note_id}!")
-                num_added += 1
-                click.secho(f"Added {num_added} new card(s)!", fg="green")
+                # Audio for both the word and sample usage
+                sample_usage_audio, word_audio = pending_audio.pop(i)
+                sample_usage_audio_filepath = sample_usage_audio.result()
+                word_audio_filepath = word_audio.result()
             except Exception as e:
                 click.secho(
                     f"Error adding flashcard for '{f.word}': {str(e)}", fg="red"
                 )
                 continue
 
+            confirmed.append(f)
+            audio_filepaths.append((sample_usage_audio_filepath, word_audio_filepath))
     except KeyboardInterrupt:
         click.secho("\nAborted by user", fg="yellow", bold=True)
-        return False
     finally:
-        return num_added > 0
+        # Audio of cards that will not be added is dropped. Synthesis that
+        # already started finishes in the background; its files are named by
+        # their text (see tutor.utils.media), so they are reused if the card
+        # is added later.
+        for futures in pending_audio.values():
+            _cancel_all(futures)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not confirmed:
+        return False
+
+    # Cards confirmed before an abort are still added
+    try:
+        results = ankiconnect_client.add_flashcards(deck, confirmed, audio_filepaths)
+    except Exception as e:
+        click.secho(f"Error adding flashcards: {str(e)}", fg="red")
+        return False
+
+    num_added = 0
+    for result in results:
+        if result.added:
+            dprint(
+                f" - added '{result.flashcard.word}' with note ID: {result.note_id}!"
+            )
+            num_added += 1
+        else:
+            click.secho(
+                f"Error adding flashcard for '{result.flashcard.word}': {result.error}",
+                fg="red",
+            )
+
+    if num_added:
+        click.secho(f"Added {num_added} new card(s)!", fg="green")
+    return num_added > 0
 
 
 def maybe_add_flashcards(flashcards: List[LanguageFlashcard], subdeck: str):
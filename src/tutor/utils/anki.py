@@ -1,12 +1,24 @@
 from enum import Enum
 import json
+import os
 from pathlib import Path
 import platform
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 
 from tutor.llm.models import LanguageFlashcard
+from tutor.llm.related_words import HTML_LINE_BREAK
+from tutor.utils.cassette import get_cassette
+from tutor.utils.logging import dprint
+from tutor.utils.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    get_circuit_breaker,
+)
 
 
 class AnkiConnectError(Exception):
@@ -33,6 +45,21 @@ class AnkiConnectError(Exception):
         return msg
 
 
+class AnkiConnectUnavailableError(AnkiConnectError):
+    """Anki could not be reached or did not answer; the request may be retried."""
+
+    def __init__(
+        self,
+        message: str,
+        action: Optional[str] = None,
+        response: Optional[Dict] = None,
+        request_sent: bool = True,
+    ):
+        # Whether Anki may have received (and acted on) the request
+        self.request_sent = request_sent
+        super().__init__(message, action, response)
+
+
 class AnkiAction(Enum):
     ADD_NOTE = "addNote"
     NOTES_INFO = "notesInfo"
@@ -49,24 +76,354 @@ class AnkiAction(Enum):
     CREATE_MODEL = "createModel"  # Create a new model
     MODEL_FIELD_NAMES = "modelFieldNames"  # Get field names for a model
     DELETE_MODEL = "deleteModelAndNotes"  # Delete a model and its notes
+    MULTI = "multi"  # Run several actions in one request
+    NOTES_MOD_TIME = "notesModTime"  # Get modification times for notes
+    ADD_NOTES = "addNotes"  # Add several notes at once
+    CAN_ADD_NOTES = "canAddNotes"  # Check which notes could be added
+
+
+DEFAULT_ANKI_CONNECT_URL = "http://localhost:8765"
+
+# Timeouts are (connect, read) in seconds. Reads get a generous default because
+# AnkiConnect answers large notesInfo/addNotes requests only once Anki's main
+# thread has finished the whole operation.
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_POOL_SIZE = 10
+# Upper bound on actions per `multi` request. Anki runs the whole batch on its
+# main thread, so very large batches freeze the UI and risk read timeouts.
+DEFAULT_BATCH_SIZE = 100
+# Number of notes fetched per notesInfo request when streaming notes
+DEFAULT_CHUNK_SIZE = 200
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def _is_idempotent(action: "AnkiAction") -> bool:
+    """Whether repeating an action that may already have run is harmless.
+
+    addNote is handled separately by checking for the note before retrying.
+    """
+    return action not in (
+        AnkiAction.ADD_NOTES,
+        AnkiAction.CREATE_MODEL,
+        AnkiAction.MULTI,
+    )
+
+
+def _escape_search_value(value: str) -> str:
+    """Escape a value for use inside a quoted Anki search term."""
+    for char in ("\\", '"', "*", "_"):
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+class AnkiBatchResult:
+    """Pending result of an action queued on an AnkiBatch.
+
+    The value becomes available once the batch has been flushed.
+    """
+
+    def __init__(self, action: AnkiAction, params: Optional[Dict] = None):
+        self.action = action
+        self.params = params
+        self.done = False
+        self.error: Optional[str] = None
+        self._result = None
+
+    def _resolve(self, result, error: Optional[str] = None) -> None:
+        self._result = result
+        self.error = error
+        self.done = True
+
+    def result(self):
+        """Return the action's result, raising AnkiConnectError if it failed."""
+        if not self.done:
+            raise AnkiConnectError(
+                "Batch has not been flushed yet", self.action.value, None
+            )
+        if self.error:
+            raise AnkiConnectError(self.error, self.action.value)
+        return self._result
+
+
+class AddFlashcardResult:
+    """Outcome of adding one flashcard with AnkiConnectClient.add_flashcards."""
+
+    def __init__(
+        self,
+        flashcard: LanguageFlashcard,
+        note_id: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        self.flashcard = flashcard
+        self.note_id = note_id
+        self.error = error
+
+    @property
+    def added(self) -> bool:
+        return self.note_id is not None
+
+    def __repr__(self) -> str:
+        return (
+            f"AddFlashcardResult(word={self.flashcard.word!r}, "
+            f"note_id={self.note_id!r}, error={self.error!r})"
+        )
+
+
+class AnkiBatch:
+    """Queue of AnkiConnect actions sent together as `multi` requests.
+
+    Actions are queued with `add` and sent when `flush` is called, when the
+    queue reaches `max_size`, or when a `with` block exits normally. Each
+    queued action gets its own AnkiBatchResult, so one failing action does not
+    hide the results of the others.
+
+    Example:
+        with client.batch() as batch:
+            pending = [batch.add(AnkiAction.FIND_NOTES, {"query": q}) for q in qs]
+        note_ids = [p.result() for p in pending]
+    """
+
+    def __init__(self, client: "AnkiConnectClient", max_size: int = DEFAULT_BATCH_SIZE):
+        self.client = client
+        self.max_size = max_size
+        self._queue: List[AnkiBatchResult] = []
+        self._flushed: List[AnkiBatchResult] = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __enter__(self) -> "AnkiBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def add(self, action: AnkiAction, params: Optional[Dict] = None) -> AnkiBatchResult:
+        """Queue an action and return a placeholder for its result."""
+        if not isinstance(action, AnkiAction):
+            raise ValueError("Invalid action type")
+
+        pending = AnkiBatchResult(action, params)
+        self._queue.append(pending)
+        if len(self._queue) >= self.max_size:
+            self._send_queue()
+        return pending
+
+    def flush(self) -> List[AnkiBatchResult]:
+        """Send all queued actions.
+
+        Returns:
+            The results of every action sent since the last call to flush,
+            including any sent automatically when the queue filled up.
+        """
+        self._send_queue()
+        flushed, self._flushed = self._flushed, []
+        return flushed
+
+    def _send_queue(self) -> None:
+        if not self._queue:
+            return
+
+        queue, self._queue = self._queue, []
+        self._flushed.extend(queue)
+
+        # A lone action gains nothing from being wrapped in `multi`
+        if len(queue) == 1:
+            pending = queue[0]
+            try:
+                pending._resolve(
+                    self.client.send_request(pending.action, pending.params)
+                )
+            except AnkiConnectError as e:
+                pending._resolve(None, e.message)
+            return
+
+        responses = self.client.send_multi(
+            [(pending.action, pending.params) for pending in queue]
+        )
+        for pending, response in zip(queue, responses):
+            pending._resolve(response.get("result"), response.get("error"))
 
 
 class AnkiConnectClient:
-    def __init__(self, address="http://localhost:8765"):
-        self.address = address
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        """Create a client that talks to AnkiConnect over a keep-alive session.
+
+        Args:
+            address: URL of the AnkiConnect server. Defaults to the
+                ANKI_CONNECT_URL environment variable, or the add-on's default
+                port on localhost.
+            pool_size: Maximum number of pooled connections kept open to Anki.
+                Threads sharing this client block for a free connection rather
+                than opening extra ones.
+            connect_timeout: Default seconds to wait for a connection to Anki
+            read_timeout: Default seconds to wait for Anki to answer a request
+            retry_policy: How to retry requests when Anki cannot be reached
+                or does not answer. Errors reported by Anki are never retried.
+            circuit_breaker: Breaker that pauses requests while Anki is
+                unresponsive. Defaults to one shared by all clients of the
+                same address.
+        """
+        self.address = address or os.getenv(
+            "ANKI_CONNECT_URL", DEFAULT_ANKI_CONNECT_URL
+        )
         self.headers = {"Content-Type": "application/json"}
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(
+            f"Anki ({self.address})"
+        )
+
+        # urllib3's connection pool is thread-safe, so a single session can be
+        # shared by every thread using this client.
+        self._adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        self._session = requests.Session()
+        self._session.mount("http://", self._adapter)
+        self._session.mount("https://", self._adapter)
+        self._session.headers.update(self.headers)
+        self._note_types = None
+
+    @property
+    def note_types(self):
+        """Cached model name lookups for this Anki (a NoteTypeCache)."""
+        if self._note_types is None:
+            from tutor.utils.anki_schema_cache import NoteTypeCache
+
+            self._note_types = NoteTypeCache(self)
+        return self._note_types
+
+    def close(self) -> None:
+        """Close all pooled connections to Anki."""
+        self._session.close()
+
+    def __enter__(self) -> "AnkiConnectClient":
+        return self
 
-    def send_request(self, action: AnkiAction, params: Optional[Dict] = None) -> Dict:
-        """Send a request to AnkiConnect and return the response."""
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Return how many requests opened a new connection vs. reused one.
+
+        Returns:
+            Dict with "requests", "new_connections" and "reused_connections"
+        """
+        requests_sent = 0
+        new_connections = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_sent += pool.num_requests
+            new_connections += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "new_connections": new_connections,
+            "reused_connections": max(requests_sent - new_connections, 0),
+        }
+
+    def send_request(
+        self,
+        action: AnkiAction,
+        params: Optional[Dict] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Dict:
+        """Send a request to AnkiConnect and return the response.
+
+        Args:
+            action: The AnkiConnect action to invoke
+            params: Parameters for the action
+            timeout: Per-call timeout in seconds, either a single value or a
+                (connect, read) tuple. Defaults to the client's timeouts.
+        """
         if not isinstance(action, AnkiAction):
             raise ValueError("Invalid action type")
 
+        cassette = get_cassette()
+        if cassette is not None:
+            return cassette.call(
+                "anki",
+                action.value,
+                {"action": action.value, "params": params},
+                lambda: self._send_with_retries(action, params, timeout),
+            )
+        return self._send_with_retries(action, params, timeout)
+
+    def _send_with_retries(
+        self,
+        action: AnkiAction,
+        params: Optional[Dict] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Dict:
+        """Send a request to AnkiConnect, retrying while Anki is unavailable."""
+        for attempt in range(self.retry_policy.max_attempts):
+            try:
+                self.circuit_breaker.before_call()
+            except CircuitOpenError as e:
+                raise AnkiConnectUnavailableError(str(e), action.value)
+
+            try:
+                if attempt > 0 and action == AnkiAction.ADD_NOTE:
+                    # The failed attempt may have added the note before the
+                    # connection dropped; never add it twice.
+                    existing_note_id = self._find_added_note(params["note"])
+                    if existing_note_id:
+                        self.circuit_breaker.record_success()
+                        return existing_note_id
+
+                result = self._send_once(action, params, timeout)
+            except AnkiConnectUnavailableError as e:
+                self.circuit_breaker.record_failure()
+                can_retry = (
+                    not e.request_sent
+                    or _is_idempotent(action)
+                    or action == AnkiAction.ADD_NOTE
+                )
+                if not can_retry or attempt + 1 >= self.retry_policy.max_attempts:
+                    raise
+                dprint(f"Retrying {action.value} after error: {e}")
+                self.retry_policy.sleep(attempt)
+                continue
+
+            self.circuit_breaker.record_success()
+            return result
+
+    def _send_once(
+        self,
+        action: AnkiAction,
+        params: Optional[Dict] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Dict:
+        """Send a single request to AnkiConnect, without retries."""
         try:
             payload = json.dumps(
                 {"action": action.value, "version": 6, "params": params or {}}
             )
-            response = requests.post(self.address, data=payload, headers=self.headers)
+            response = self._session.post(
+                self.address,
+                data=payload,
+                headers=self.headers,
+                timeout=timeout or self.timeout,
+            )
 
+            if response.status_code >= 500:
+                raise AnkiConnectUnavailableError(
+                    f"Request failed with status {response.status_code}", action.value
+                )
             if response.status_code != 200:
                 raise AnkiConnectError(
                     f"Request failed with status {response.status_code}", action.value
@@ -77,21 +434,94 @@ class AnkiConnectClient:
                 raise AnkiConnectError(result["error"], action.value, result)
 
             return result.get("result")
-        except requests.exceptions.ConnectionError:
-            raise AnkiConnectError(
+        except requests.exceptions.ConnectTimeout:
+            raise AnkiConnectUnavailableError(
+                "Failed to connect to Anki. Is it running with AnkiConnect?",
+                action.value,
+                request_sent=False,
+            )
+        except requests.exceptions.ConnectionError as e:
+            # A refused connection means the request never reached Anki
+            raise AnkiConnectUnavailableError(
                 "Failed to connect to Anki. Is it running with AnkiConnect?",
                 action.value,
+                request_sent=_was_request_sent(e),
+            )
+        except requests.exceptions.Timeout:
+            raise AnkiConnectUnavailableError(
+                "Timed out waiting for AnkiConnect to respond", action.value
             )
         except json.JSONDecodeError:
             raise AnkiConnectError(
                 "Invalid JSON response from AnkiConnect", action.value
             )
 
+    def _find_added_note(self, note: Dict) -> Optional[int]:
+        """Find a note matching an addNote request that may already have run."""
+        fields = note.get("fields", {})
+        if "Chinese" not in fields:
+            return None
+
+        query = " ".join(
+            f'"{term}"'
+            for term in [
+                f"deck:{_escape_search_value(note['deckName'])}",
+                f"note:{_escape_search_value(note['modelName'])}",
+                f"Chinese:{_escape_search_value(fields['Chinese'])}",
+            ]
+        )
+        note_ids = self._send_once(AnkiAction.FIND_NOTES, {"query": query})
+        return note_ids[0] if note_ids else None
+
+    def send_multi(
+        self, actions: List[Tuple[AnkiAction, Optional[Dict]]]
+    ) -> List[Dict]:
+        """Send several actions in a single `multi` request.
+
+        Args:
+            actions: (action, params) pairs to run in order
+
+        Returns:
+            One {"result": ..., "error": ...} dict per action, in the same order
+        """
+        for action, _ in actions:
+            if not isinstance(action, AnkiAction):
+                raise ValueError("Invalid action type")
+
+        results = self.send_request(
+            AnkiAction.MULTI,
+            {
+                "actions": [
+                    {"action": action.value, "version": 6, "params": params or {}}
+                    for action, params in actions
+                ]
+            },
+        )
+        if not isinstance(results, list) or len(results) != len(actions):
+            raise AnkiConnectError(
+                "Invalid response format for multi request",
+                AnkiAction.MULTI.value,
+                {"result": results},
+            )
+
+        # With "version" set on each action AnkiConnect wraps every result as
+        # {"result": ..., "error": ...}; older versions return bare results.
+        return [
+            r
+            if isinstance(r, dict) and set(r.keys()) == {"result", "error"}
+            else {"result": r, "error": None}
+            for r in results
+        ]
+
+    def batch(self, max_size: int = DEFAULT_BATCH_SIZE) -> AnkiBatch:
+        """Start a batch of actions to send as `multi` requests."""
+        return AnkiBatch(self, max_size=max_size)
+
     def get_note_details(self, note_ids: List[int]) -> List[LanguageFlashcard]:
         """Get detailed information about notes by their IDs."""
         try:
             note_details = self.send_request(AnkiAction.NOTES_INFO, {"notes": note_ids})
-            return [LanguageFlashcard.from_anki_json(nd) for nd in note_details]
+            return LanguageFlashcard.from_anki_json_batch(note_details)
         except AnkiConnectError as e:
             raise AnkiConnectError(
                 f"Failed to get note details for IDs: {note_ids}", e.action, e.response
@@ -108,9 +538,88 @@ class AnkiConnectClient:
 
     def find_notes(self, query: str) -> List[LanguageFlashcard]:
         """Search for and fetch notes by query."""
+        return list(self.iter_notes(query))
+
+    def iter_note_info_chunks(
+        self, note_ids: List[int], chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[List[Dict]]:
+        """Fetch raw notesInfo results for notes, one fixed-size chunk at a time.
+
+        Each chunk is only requested once the previous one has been consumed.
+
+        Args:
+            note_ids: IDs of the notes to fetch
+            chunk_size: Number of notes to fetch per notesInfo request
+
+        Yields:
+            Lists of notesInfo dicts. Notes that no longer exist are skipped.
+        """
+        for start in range(0, len(note_ids), chunk_size):
+            chunk_ids = note_ids[start : start + chunk_size]
+            try:
+                note_infos = self.send_request(
+                    AnkiAction.NOTES_INFO, {"notes": chunk_ids}
+                )
+            except AnkiConnectError as e:
+                raise AnkiConnectError(
+                    f"Failed to get note details for IDs: {chunk_ids}",
+                    e.action,
+                    e.response,
+                )
+            # Notes deleted since findNotes come back as empty objects
+            yield [note_info for note_info in note_infos if note_info]
+
+    def get_notes_mod_times(
+        self, note_ids: List[int], chunk_size: int = DEFAULT_CHUNK_SIZE * 10
+    ) -> Dict[int, int]:
+        """Get the modification time of each note.
+
+        Args:
+            note_ids: IDs of the notes to check
+            chunk_size: Number of notes to check per notesModTime request
+
+        Returns:
+            Dict mapping note IDs to their modification time (epoch seconds)
+        """
+        mod_times = {}
+        for start in range(0, len(note_ids), chunk_size):
+            chunk_ids = note_ids[start : start + chunk_size]
+            try:
+                result = self.send_request(
+                    AnkiAction.NOTES_MOD_TIME, {"notes": chunk_ids}
+                )
+            except AnkiConnectError as e:
+                raise AnkiConnectError(
+                    "Failed to get note modification times", e.action, e.response
+                )
+            mod_times.update({r["noteId"]: r["mod"] for r in result if r})
+        return mod_times
+
+    def iter_notes(
+        self,
+        query: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        limit: Optional[int] = None,
+    ) -> Iterator[LanguageFlashcard]:
+        """Search for notes by query and lazily yield them as flashcards.
+
+        The limit is applied to the matching note IDs before any note details
+        are fetched, so only the notes actually consumed are downloaded.
+
+        Args:
+            query: Anki search query
+            chunk_size: Number of notes to fetch per notesInfo request
+            limit: Maximum number of notes to yield
+
+        Yields:
+            Flashcards for the matching notes, in the order Anki returns them
+        """
         try:
             note_ids = self.find_note_ids(query)
-            return self.get_note_details(note_ids)
+            if limit is not None:
+                note_ids = note_ids[:limit]
+            for note_infos in self.iter_note_info_chunks(note_ids, chunk_size):
+                yield from LanguageFlashcard.from_anki_json_batch(note_infos)
         except AnkiConnectError as e:
             raise AnkiConnectError(
                 f"Failed to find and fetch notes with query: {query}",
@@ -118,12 +627,114 @@ class AnkiConnectClient:
                 e.response,
             )
 
+    @staticmethod
+    def _build_fields(flashcard: LanguageFlashcard) -> Dict[str, str]:
+        """Build the Anki field values for a flashcard."""
+        fields = {}
+        for field_name, anki_field_name in flashcard.ANKI_FIELD_NAMES.items():
+            # Skip fields that don't exist on this flashcard, and related
+            # words, which are formatted below
+            if hasattr(flashcard, field_name) and field_name != "related_words":
+                value = getattr(flashcard, field_name)
+                fields[anki_field_name] = value
+
+        # Handle related words specially - they are stored as formatted text
+        if hasattr(flashcard, "related_words"):
+            fields["Related Words"] = ""
+        if hasattr(flashcard, "related_words") and flashcard.related_words:
+            # Format each related word as a bullet point
+            related_words_text = []
+            for rw in flashcard.related_words:
+                # Format: word (pronunciation) - english [relationship]
+                pronunciation_field = (
+                    "pinyin" if flashcard.LANGUAGE == "mandarin" else "jyutping"
+                )
+                pronunciation = getattr(rw, pronunciation_field)
+                related_words_text.append(
+                    f"• {rw.word} ({pronunciation}) - {rw.english} [{rw.relationship}]"
+                )
+
+            fields["Related Words"] = "\n".join(related_words_text)
+
+        return fields
+
+    @staticmethod
+    def _build_audio(
+        sample_usage_audio_filepath: Optional[str] = None,
+        word_audio_filepath: Optional[str] = None,
+    ) -> Tuple[Dict[str, str], List[Dict]]:
+        """Build the audio for a note.
+
+        Audio that already lives in Anki's media folder is referenced by bare
+        filename in the field itself, so AnkiConnect does not copy it again.
+        Other files become AnkiConnect audio attachments.
+
+        Returns:
+            (field values to set, audio attachments)
+        """
+        from tutor.utils.media import get_media_index, get_sound_tag
+
+        media_index = get_media_index()
+        audio_fields = {}
+        audio_attachments = []
+
+        for filepath, field in [
+            (sample_usage_audio_filepath, "Sample Usage (Audio)"),
+            (word_audio_filepath, "Word (Audio)"),
+        ]:
+            if not filepath:
+                continue
+
+            media_filename = media_index.in_collection(filepath)
+            if media_filename:
+                audio_fields[field] = get_sound_tag(media_filename)
+            else:
+                audio_attachments.append(
+                    {
+                        "path": str(filepath),
+                        "filename": Path(filepath).name,
+                        "fields": [field],
+                    }
+                )
+
+        return audio_fields, audio_attachments
+
+    def _build_note(
+        self,
+        deck_name: str,
+        flashcard: LanguageFlashcard,
+        sample_usage_audio_filepath: Optional[str] = None,
+        word_audio_filepath: Optional[str] = None,
+    ) -> Dict:
+        """Build the AnkiConnect note for adding a flashcard to a deck."""
+        # Check if the note type exists for this language
+        from tutor.commands.setup_anki import NoteTypeManager
+
+        note_type_manager = NoteTypeManager(self)
+        model_name = note_type_manager.check_note_type_exists(flashcard.LANGUAGE)
+
+        # Add audio if provided
+        audio_fields, audio_attachments = self._build_audio(
+            sample_usage_audio_filepath, word_audio_filepath
+        )
+        note = {
+            "deckName": deck_name,
+            "modelName": model_name,
+            "fields": {**self._build_fields(flashcard), **audio_fields},
+            "tags": [],
+        }
+        if audio_attachments:
+            note["audio"] = audio_attachments
+
+        return note
+
     def add_flashcard(
         self,
         deck_name,
         flashcard: LanguageFlashcard,
         sample_usage_audio_filepath=None,
         word_audio_filepath=None,
+        batch: Optional[AnkiBatch] = None,
     ):
         """Add a new flashcard and return its note ID.
 
@@ -132,71 +743,20 @@ class AnkiConnectClient:
             flashcard: The flashcard to add (MandarinFlashcard or CantoneseFlashcard)
             sample_usage_audio_filepath: Path to the audio file for the sample usage
             word_audio_filepath: Path to the audio file for the word itself
+            batch: If given, queue the addNote action on this batch instead of
+                sending it right away
 
         Returns:
-            The note ID of the added flashcard
+            The note ID of the added flashcard, or an AnkiBatchResult that will
+            hold the note ID once the batch is flushed
         """
         try:
-            # Check if the note type exists for this language
-            from tutor.commands.setup_anki import NoteTypeManager
-
-            note_type_manager = NoteTypeManager(self)
-            model_name = note_type_manager.check_note_type_exists(flashcard.LANGUAGE)
-
-            # Get the fields required by this flashcard type
-            fields = {}
-            for field_name, anki_field_name in flashcard.ANKI_FIELD_NAMES.items():
-                # Skip fields that don't exist on this flashcard
-                if hasattr(flashcard, field_name):
-                    value = getattr(flashcard, field_name)
-                    fields[anki_field_name] = value
-
-            # Handle related words specially - this is not in ANKI_FIELD_NAMES mapping
-            if hasattr(flashcard, "related_words") and flashcard.related_words:
-                # Format each related word as a bullet point
-                related_words_text = []
-                for rw in flashcard.related_words:
-                    # Format: word (pronunciation) - english [relationship]
-                    pronunciation_field = (
-                        "pinyin" if flashcard.LANGUAGE == "mandarin" else "jyutping"
-                    )
-                    pronunciation = getattr(rw, pronunciation_field)
-                    related_words_text.append(
-                        f"• {rw.word} ({pronunciation}) - {rw.english} [{rw.relationship}]"
-                    )
-
-                fields["Related Words"] = "\n".join(related_words_text)
-
-            note = {
-                "deckName": deck_name,
-                "modelName": model_name,
-                "fields": fields,
-                "tags": [],
-            }
-
-            # Add audio attachments if provided
-            audio_attachments = []
-
-            if sample_usage_audio_filepath:
-                audio_attachments.append(
-                    {
-                        "path": sample_usage_audio_filepath,
-                        "filename": sample_usage_audio_filepath,
-                        "fields": ["Sample Usage (Audio)"],
-                    }
-                )
-
-            if word_audio_filepath:
-                audio_attachments.append(
-                    {
-                        "path": word_audio_filepath,
-                        "filename": word_audio_filepath,
-                        "fields": ["Word (Audio)"],
-                    }
-                )
+            note = self._build_note(
+                deck_name, flashcard, sample_usage_audio_filepath, word_audio_filepath
+            )
 
-            if audio_attachments:
-                note["audio"] = audio_attachments
+            if batch is not None:
+                return batch.add(AnkiAction.ADD_NOTE, {"note": note})
 
             note_id = self.send_request(AnkiAction.ADD_NOTE, {"note": note})
             if not note_id:
@@ -210,6 +770,94 @@ class AnkiConnectClient:
                 f"Failed to add flashcard for '{flashcard.word}':", e.action, e.response
             )
 
+    def add_flashcards(
+        self,
+        deck_name: str,
+        flashcards: List[LanguageFlashcard],
+        audio_filepaths: Optional[List[Tuple[Optional[str], Optional[str]]]] = None,
+    ) -> List["AddFlashcardResult"]:
+        """Add many flashcards with a couple of requests instead of one per card.
+
+        A single canAddNotes request drops duplicates up front, then the rest
+        are inserted with a single addNotes request.
+
+        Args:
+            deck_name: The name of the deck to add the flashcards to
+            flashcards: The flashcards to add
+            audio_filepaths: Optional (sample usage audio, word audio) paths for
+                each flashcard, in the same order as flashcards
+
+        Returns:
+            One AddFlashcardResult per flashcard, in the same order
+        """
+        if audio_filepaths is None:
+            audio_filepaths = [(None, None)] * len(flashcards)
+        if len(audio_filepaths) != len(flashcards):
+            raise ValueError("audio_filepaths must have one entry per flashcard")
+
+        results = [AddFlashcardResult(flashcard) for flashcard in flashcards]
+        if not flashcards:
+            return results
+
+        try:
+            notes = [
+                self._build_note(deck_name, flashcard, sample_audio, word_audio)
+                for flashcard, (sample_audio, word_audio) in zip(
+                    flashcards, audio_filepaths
+                )
+            ]
+
+            can_add = self.send_request(AnkiAction.CAN_ADD_NOTES, {"notes": notes})
+            to_add = []
+            for result, note, ok in zip(results, notes, can_add):
+                if ok:
+                    to_add.append((result, note))
+                else:
+                    result.error = "Note is a duplicate or has an empty first field"
+
+            if not to_add:
+                return results
+
+            try:
+                note_ids = self.send_request(
+                    AnkiAction.ADD_NOTES, {"notes": [note for _, note in to_add]}
+                )
+            except AnkiConnectUnavailableError:
+                # Anki may have added the notes before the connection failed,
+                # so adding them again one by one could duplicate them
+                raise
+            except AnkiConnectError:
+                # Newer AnkiConnect versions fail the whole addNotes request if
+                # any note fails; add the notes one by one (as a single multi
+                # request) so each card gets its own note ID or error.
+                with self.batch() as batch:
+                    pending = [
+                        batch.add(AnkiAction.ADD_NOTE, {"note": note})
+                        for _, note in to_add
+                    ]
+                for (result, _), p in zip(to_add, pending):
+                    result.note_id = p.result() if not p.error else None
+                    result.error = p.error
+                return results
+
+            for (result, _), note_id in zip(to_add, note_ids):
+                if note_id:
+                    result.note_id = note_id
+                else:
+                    result.error = "No note ID returned"
+            return results
+        except AnkiConnectUnavailableError as e:
+            message = f"Failed to add {len(flashcards)} flashcards"
+            if e.request_sent:
+                message += "; some may have been added, check Anki before retrying"
+            raise AnkiConnectUnavailableError(
+                message, e.action, e.response, request_sent=e.request_sent
+            )
+        except AnkiConnectError as e:
+            raise AnkiConnectError(
+                f"Failed to add {len(flashcards)} flashcards", e.action, e.response
+            )
+
     def update_model_styling(self, model_name: str, css: str) -> None:
         """Update the CSS styling for a model.
 
@@ -265,10 +913,7 @@ class AnkiConnectClient:
                     AnkiAction.NOTE_FIELDS.value,
                     result,
                 )
-            # Anki returns fields as {"fieldName": {"value": "content", "order": N}}
-            # Transform to simple {"fieldName": "content"} format
-            fields = result[0]["fields"]
-            return {name: info["value"] for name, info in fields.items()}
+            return get_field_values(result[0])
         except AnkiConnectError as e:
             raise AnkiConnectError(
                 f"Failed to get fields for note ID {note_id}", e.action, e.response
@@ -336,82 +981,76 @@ class AnkiConnectClient:
         flashcard: LanguageFlashcard,
         sample_usage_audio_filepath: Optional[str] = None,
         word_audio_filepath: Optional[str] = None,
-    ) -> None:
-        """Update an existing flashcard.
+        batch: Optional[AnkiBatch] = None,
+        current_fields: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Update an existing flashcard, writing only the fields that changed.
+
+        The new field values are compared with the note's current ones, and
+        only the differences are sent, in a single updateNoteFields request.
+        A note whose fields already match is not written at all, so Anki does
+        not mark it as modified.
 
         Args:
             note_id: The ID of the note to update
             flashcard: The updated flashcard data
             sample_usage_audio_filepath: Optional path to the audio file for the sample usage
             word_audio_filepath: Optional path to the audio file for the word itself
+            batch: If given, queue the update on this batch instead of sending
+                it right away. Errors then surface when the batch is flushed.
+            current_fields: The note's current field values, if already known.
+                Otherwise they are fetched from Anki.
+
+        Returns:
+            True if an update was sent (or queued), False if nothing changed
         """
         try:
-            # Prepare fields based on the flashcard's ANKI_FIELD_NAMES mapping
-            fields = {}
-            for field_name, anki_field_name in flashcard.ANKI_FIELD_NAMES.items():
-                # Skip fields that don't exist on this flashcard
-                if hasattr(flashcard, field_name):
-                    value = getattr(flashcard, field_name)
-                    fields[anki_field_name] = value
-
-            # Handle related words specially - this is not in ANKI_FIELD_NAMES mapping
-            if hasattr(flashcard, "related_words") and flashcard.related_words:
-                # Format each related word as a bullet point
-                related_words_text = []
-                for rw in flashcard.related_words:
-                    # Format: word (pronunciation) - english [relationship]
-                    pronunciation_field = (
-                        "pinyin" if flashcard.LANGUAGE == "mandarin" else "jyutping"
-                    )
-                    pronunciation = getattr(rw, pronunciation_field)
-                    related_words_text.append(
-                        f"• {rw.word} ({pronunciation}) - {rw.english} [{rw.relationship}]"
-                    )
-
-                fields["Related Words"] = "\n".join(related_words_text)
-
-            payload = {
-                "note": {
-                    "id": note_id,
-                    "fields": fields,
-                }
-            }
+            if current_fields is None:
+                current_fields = self.get_note_fields(note_id)
 
-            # Handle audio updates if provided
-            audio_attachments = []
-            fields_to_clear = []
-
-            if sample_usage_audio_filepath:
-                fields_to_clear.append("Sample Usage (Audio)")
-                audio_attachments.append(
-                    {
-                        "path": sample_usage_audio_filepath,
-                        "filename": sample_usage_audio_filepath,
-                        "fields": ["Sample Usage (Audio)"],
-                    }
-                )
-
-            if word_audio_filepath:
-                fields_to_clear.append("Word (Audio)")
-                audio_attachments.append(
-                    {
-                        "path": word_audio_filepath,
-                        "filename": word_audio_filepath,
-                        "fields": ["Word (Audio)"],
-                    }
-                )
-
-            # If we have audio to update, first clear the fields
-            if fields_to_clear:
-                for field in fields_to_clear:
-                    payload["note"]["fields"][field] = ""
-                self.send_request(AnkiAction.UPDATE_NOTE_FIELDS, payload)
-
-                # Then update with new audio
-                if audio_attachments:
-                    payload["note"]["audio"] = audio_attachments
+            audio_fields, audio_attachments = self._build_audio(
+                sample_usage_audio_filepath, word_audio_filepath
+            )
+            new_fields = {**self._build_fields(flashcard), **audio_fields}
+            changed_fields = {
+                field: value
+                for field, value in new_fields.items()
+                if _normalize_line_breaks(current_fields.get(field))
+                != _normalize_line_breaks(value)
+            }
 
-            self.send_request(AnkiAction.UPDATE_NOTE_FIELDS, payload)
+            # Attached audio whose field already plays the same file is skipped:
+            # audio filenames are hashes of their text, so the file is the same
+            from tutor.utils.media import get_sound_tag
+
+            attachments = []
+            for attachment in audio_attachments:
+                sound_tag = get_sound_tag(attachment["filename"])
+                fields = [
+                    field
+                    for field in attachment["fields"]
+                    if current_fields.get(field) != sound_tag
+                ]
+                if fields:
+                    attachments.append({**attachment, "fields": fields})
+                    # AnkiConnect appends attached audio to the field's value
+                    # after setting the fields, so clear the field in the same
+                    # request
+                    changed_fields.update({field: "" for field in fields})
+
+            if not changed_fields:
+                dprint(f"Note {note_id} is unchanged, skipping update")
+                return False
+
+            note = {"id": note_id, "fields": changed_fields}
+            if attachments:
+                note["audio"] = attachments
+
+            if batch is not None:
+                batch.add(AnkiAction.UPDATE_NOTE_FIELDS, {"note": note})
+            else:
+                self.send_request(AnkiAction.UPDATE_NOTE_FIELDS, {"note": note})
+            return True
         except AnkiConnectError as e:
             raise AnkiConnectError(
                 f"Failed to update flashcard '{flashcard.word}' (note ID: {note_id})",
@@ -447,6 +1086,30 @@ class AnkiConnectClient:
             )
 
 
+def _was_request_sent(error: requests.exceptions.ConnectionError) -> bool:
+    """Whether a connection error happened after the request was sent."""
+    reason = error.args[0] if error.args else None
+    # urllib3 wraps failures to open a connection in NewConnectionError
+    reason = getattr(reason, "reason", reason)
+    return not isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+def _normalize_line_breaks(value: Optional[str]) -> Optional[str]:
+    """Write a field's <br> tags as newlines, so the two compare equal."""
+    if value and "<" in value:
+        return HTML_LINE_BREAK.sub("\n", value)
+    return value
+
+
+def get_field_values(note_info: Dict) -> Dict[str, str]:
+    """Get a note's field values from a notesInfo result.
+
+    Anki returns fields as {"fieldName": {"value": "content", "order": N}};
+    this transforms them to a simple {"fieldName": "content"} format.
+    """
+    return {name: info["value"] for name, info in note_info["fields"].items()}
+
+
 def get_subdeck(base_deck_name: str, subdeck_name: str):
     return f"{base_deck_name}::{subdeck_name}"
 
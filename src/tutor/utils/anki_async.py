@@ -0,0 +1,139 @@
+"""Asyncio counterpart to AnkiConnectClient.
+
+Requests are run on worker threads over the sync client's pooled session, so
+asyncio pipelines can overlap Anki I/O with OpenAI or Azure calls. A semaphore
+bounds how many requests are in flight at once, since the AnkiConnect add-on
+handles requests one at a time on Anki's main thread.
+"""
+
+import asyncio
+import functools
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from tutor.llm.models import LanguageFlashcard
+from tutor.utils.anki import AnkiAction, AnkiConnectClient, Timeout
+
+# Anki serializes requests anyway; a few in flight just hides network latency
+DEFAULT_MAX_IN_FLIGHT = 4
+
+T = TypeVar("T")
+
+
+class AsyncAnkiConnectClient:
+    """Async AnkiConnect client with a bounded number of in-flight requests.
+
+    Example:
+        async with AsyncAnkiConnectClient(max_in_flight=2) as client:
+            decks, cards = await asyncio.gather(
+                client.list_decks(), client.find_notes('deck:"Chinese"')
+            )
+    """
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        client: Optional[AnkiConnectClient] = None,
+    ):
+        """Create an async client.
+
+        Args:
+            address: URL of the AnkiConnect server (see AnkiConnectClient)
+            max_in_flight: Maximum number of concurrent requests to Anki
+            client: Sync client to run requests with. By default one is created
+                with a connection pool large enough for max_in_flight.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.max_in_flight = max_in_flight
+        self.client = client or AnkiConnectClient(
+            address=address, pool_size=max_in_flight
+        )
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def close(self) -> None:
+        """Close all pooled connections to Anki."""
+        self.client.close()
+
+    async def __aenter__(self) -> "AsyncAnkiConnectClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking client call on a worker thread, bounded by the limit."""
+        async with self._semaphore:
+            return await asyncio.to_thread(functools.partial(func, *args, **kwargs))
+
+    async def send_request(
+        self,
+        action: AnkiAction,
+        params: Optional[Dict] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Dict:
+        """Send a request to AnkiConnect and return the response."""
+        return await self._run(self.client.send_request, action, params, timeout)
+
+    async def find_note_ids(self, query: str) -> List[int]:
+        """Search for notes by query (e.g., deck name or tags)."""
+        return await self._run(self.client.find_note_ids, query)
+
+    async def get_note_details(self, note_ids: List[int]) -> List[LanguageFlashcard]:
+        """Get detailed information about notes by their IDs."""
+        return await self._run(self.client.get_note_details, note_ids)
+
+    async def find_notes(self, query: str) -> List[LanguageFlashcard]:
+        """Search for and fetch notes by query."""
+        return await self._run(self.client.find_notes, query)
+
+    async def add_flashcard(
+        self,
+        deck_name: str,
+        flashcard: LanguageFlashcard,
+        sample_usage_audio_filepath: Optional[str] = None,
+        word_audio_filepath: Optional[str] = None,
+    ) -> int:
+        """Add a new flashcard and return its note ID."""
+        return await self._run(
+            self.client.add_flashcard,
+            deck_name,
+            flashcard,
+            sample_usage_audio_filepath=sample_usage_audio_filepath,
+            word_audio_filepath=word_audio_filepath,
+        )
+
+    async def update_flashcard(
+        self,
+        note_id: int,
+        flashcard: LanguageFlashcard,
+        sample_usage_audio_filepath: Optional[str] = None,
+        word_audio_filepath: Optional[str] = None,
+        current_fields: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Update the changed fields of an existing flashcard."""
+        return await self._run(
+            self.client.update_flashcard,
+            note_id,
+            flashcard,
+            sample_usage_audio_filepath=sample_usage_audio_filepath,
+            word_audio_filepath=word_audio_filepath,
+            current_fields=current_fields,
+        )
+
+    async def get_note_fields(self, note_id: int) -> Dict[str, str]:
+        """Get the fields of a note by its ID."""
+        return await self._run(self.client.get_note_fields, note_id)
+
+    async def list_decks(self) -> List[str]:
+        """List all available deck names."""
+        return await self._run(self.client.list_decks)
+
+    async def add_deck(self, deck_name: str) -> None:
+        """Create a new deck."""
+        await self._run(self.client.add_deck, deck_name)
+
+    async def maybe_add_deck(self, deck_name: str) -> None:
+        """Create a deck if it doesn't exist."""
+        await self._run(self.client.maybe_add_deck, deck_name)
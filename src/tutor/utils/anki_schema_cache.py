@@ -0,0 +1,98 @@
+"""Cache of Anki note type (model) names.
+
+Adding a card needs to know that our note type exists. Rather than sending
+`modelNames` for every card, the names are cached with a TTL and persisted
+between CLI invocations. `setup-anki` invalidates the cache when it creates a
+model.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tutor.utils.anki import AnkiAction, AnkiConnectClient
+from tutor.utils.config import get_config_dir
+from tutor.utils.logging import dprint
+
+# Note types are rarely created outside of setup-anki, which invalidates the cache
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+def get_default_schema_cache_path() -> Path:
+    """Returns the default location of the note type cache."""
+    return get_config_dir() / "anki_schema_cache.json"
+
+
+class NoteTypeCache:
+    """TTL cache of the model names of one Anki."""
+
+    def __init__(
+        self,
+        client: AnkiConnectClient,
+        cache_path: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.client = client
+        self.cache_path = (
+            Path(cache_path) if cache_path else get_default_schema_cache_path()
+        )
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def model_names(self, refresh: bool = False) -> List[str]:
+        """Get the names of all models (note types) in Anki."""
+        with self._lock:
+            entry = self._data.get("model_names")
+            if refresh or not self._is_fresh(entry):
+                names = self.client.send_request(AnkiAction.MODEL_NAMES, {})
+                entry = self._data["model_names"] = self._entry(names)
+                self._save()
+            return list(entry["value"])
+
+    def has_model(self, model_name: str) -> bool:
+        """Check whether a model exists, refreshing the cache once on a miss."""
+        if model_name in self.model_names():
+            return True
+        return model_name in self.model_names(refresh=True)
+
+    def invalidate(self) -> None:
+        """Drop the cached model names after a model is created."""
+        with self._lock:
+            self._data.pop("model_names", None)
+            self._save()
+
+    def _entry(self, value) -> Dict:
+        return {"value": value, "fetched_at": time.time()}
+
+    def _is_fresh(self, entry: Optional[Dict]) -> bool:
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl
+
+    def _load(self) -> Dict:
+        # One file holds the caches of every Anki address we have talked to
+        try:
+            with open(self.cache_path) as f:
+                all_data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return all_data.get(self.client.address, {})
+
+    def _save(self) -> None:
+        try:
+            try:
+                with open(self.cache_path) as f:
+                    all_data = json.load(f)
+            except (OSError, ValueError):
+                all_data = {}
+            all_data[self.client.address] = self._data
+
+            tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(all_data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            # The cache is only an optimization; keep going without it
+            dprint(f"Failed to save note type cache: {e}")
@@ -1,8 +1,10 @@
 import os
-import hashlib
+import tempfile
 from typing import Dict
 import azure.cognitiveservices.speech as speechsdk
-from tutor.utils.anki import get_default_anki_media_dir
+from tutor.utils.cassette import get_cassette
+from tutor.utils.logging import dprint
+from tutor.utils.media import get_audio_filename, get_media_index
 
 # Mapping of languages to Azure voice names
 LANGUAGE_VOICE_MAP: Dict[str, str] = {
@@ -15,13 +17,38 @@ LANGUAGE_VOICE_MAP: Dict[str, str] = {
 def text_to_speech(text: str, language: str) -> str:
     """Convert text to speech using Azure Text-to-Speech service.
 
+    Audio is stored in Anki's media folder under a hash of the text, so text
+    that already has audio in the collection is not synthesized again.
+
     Args:
         text: The text to convert to speech
         language: The language of the text (e.g., 'mandarin', 'cantonese')
 
     Returns:
         Path to the generated audio file
+
+    Raises:
+        RuntimeError: If speech synthesis was canceled or failed
     """
+    cassette = get_cassette()
+    if cassette is not None:
+        return cassette.call(
+            "tts",
+            language,
+            {"text": text, "language": language},
+            lambda: _text_to_speech(text, language),
+        )
+    return _text_to_speech(text, language)
+
+
+def _text_to_speech(text: str, language: str) -> str:
+    media_index = get_media_index()
+    media_filename = get_audio_filename(text, language.lower())
+    filename = str(media_index.path_for(media_filename))
+    if media_filename in media_index:
+        dprint(f"Reusing existing audio for '{text}': {filename}")
+        return filename
+
     speech_key = os.environ.get("AZURE_SPEECH_SERVICE_KEY")
     service_region = os.environ.get("AZURE_SPEECH_SERVICE_REGION")
 
@@ -38,32 +65,40 @@ def text_to_speech(text: str, language: str) -> str:
 
     speech_config.speech_synthesis_voice_name = voice_name
 
-    # Configure the output to save to a file
-    filename = str(
-        get_default_anki_media_dir()
-        / f"chinese-tutor-{hashlib.md5(text.encode()).hexdigest()}.wav"
-    )
-    audio_output = speechsdk.audio.AudioOutputConfig(filename=filename)
-
-    # Create a speech synthesizer with audio output
-    synthesizer = speechsdk.SpeechSynthesizer(
-        speech_config=speech_config, audio_config=audio_output
+    # Synthesize to a temporary file, and only move it into place once
+    # complete: a file under the final name is reused by later runs
+    fd, temp_filename = tempfile.mkstemp(
+        prefix=".", suffix=".wav.tmp", dir=os.path.dirname(filename)
     )
+    os.close(fd)
+    try:
+        audio_output = speechsdk.audio.AudioOutputConfig(filename=temp_filename)
 
-    # Perform speech synthesis
-    result = synthesizer.speak_text_async(text).get()
-
-    # Check result
-    if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-        from tutor.utils.logging import dprint
+        # Create a speech synthesizer with audio output
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config, audio_config=audio_output
+        )
 
-        dprint(f"Speech synthesis succeeded. Audio saved to: {filename}")
-    elif result.reason == speechsdk.ResultReason.Canceled:
-        cancellation_details = result.cancellation_details
-        from tutor.utils.logging import dprint
+        # Perform speech synthesis
+        result = synthesizer.speak_text_async(text).get()
+        # Release the output file before moving it
+        del synthesizer
 
-        dprint(f"Speech synthesis canceled: {cancellation_details.reason}")
-        if cancellation_details.reason == speechsdk.CancellationReason.Error:
-            dprint(f"Error details: {cancellation_details.error_details}")
+        # Check result
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            os.replace(temp_filename, filename)
+            dprint(f"Speech synthesis succeeded. Audio saved to: {filename}")
+            media_index.add(media_filename)
+            return filename
 
-    return filename
+        message = f"Speech synthesis of '{text}' did not complete: {result.reason}"
+        if result.reason == speechsdk.ResultReason.Canceled:
+            cancellation_details = result.cancellation_details
+            message = f"Speech synthesis canceled: {cancellation_details.reason}"
+            if cancellation_details.reason == speechsdk.CancellationReason.Error:
+                message += f" ({cancellation_details.error_details})"
+        dprint(message)
+        raise RuntimeError(message)
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
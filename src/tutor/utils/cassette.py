@@ -0,0 +1,302 @@
+"""Record/replay cassettes for the tool's external I/O.
+
+Reproducing or profiling a slow `ct g` or `ct fix-cards` run otherwise needs
+live OpenAI, Azure Speech and Anki. With `ct --record run.jsonl ...` every
+call to those services (chat completions, text-to-speech and AnkiConnect
+requests) is written to a cassette along with its result and how long it
+took. `ct --replay run.jsonl ...` then answers the same calls from the
+cassette without any network, sleeping for the recorded durations or for a
+fixed latency model (`--replay-latency`), so pipeline changes can be
+benchmarked deterministically.
+
+Replayed calls are matched to recorded ones by a hash of their request. A call
+that was never recorded raises CassetteMissError rather than being answered
+with some other call's response.
+"""
+
+import hashlib
+import importlib
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from tutor.utils.logging import dprint
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMissError(Exception):
+    """Raised when a replayed call was never recorded on the cassette."""
+
+
+def _describe(value: Any) -> Any:
+    """JSON fallback for request values, e.g. structured output classes."""
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return repr(value)
+
+
+def get_interaction_key(kind: str, name: str, request: Any) -> str:
+    """Get the key a request is recorded and replayed under."""
+    data = json.dumps(
+        [kind, name, request], sort_keys=True, default=_describe, ensure_ascii=False
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class LatencyModel:
+    """How long replayed calls take.
+
+    Either the durations they took when recorded, or a fixed number of
+    seconds per kind of call.
+    """
+
+    def __init__(self, fixed: Optional[Dict[str, float]] = None, default: float = 0.0):
+        """Create a latency model.
+
+        Args:
+            fixed: Seconds per kind of call ("openai", "tts", "anki"), or None
+                to use the recorded durations
+            default: Seconds for kinds missing from `fixed`
+        """
+        self.fixed = fixed
+        self.default = default
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse a latency model.
+
+        "recorded" replays the recorded durations, "none" replays instantly,
+        a number of seconds applies to every call, and "openai=2,tts=0.5"
+        sets seconds per kind of call (other kinds replay instantly).
+
+        Raises:
+            ValueError: If the spec cannot be parsed
+        """
+        spec = spec.strip()
+        if spec == "recorded":
+            return cls()
+        if spec == "none":
+            return cls(fixed={})
+        if "=" not in spec:
+            return cls(fixed={}, default=float(spec))
+        fixed = {}
+        for part in spec.split(","):
+            kind, _, seconds = part.partition("=")
+            fixed[kind.strip()] = float(seconds)
+        return cls(fixed=fixed)
+
+    def duration(self, kind: str, recorded: float) -> float:
+        """Seconds a replayed call of this kind should take."""
+        if self.fixed is None:
+            return recorded
+        return self.fixed.get(kind, self.default)
+
+
+def _json_safe(value: Any) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _dump_error(e: Exception) -> Dict:
+    return {
+        "type": f"{type(e).__module__}.{type(e).__qualname__}",
+        "args": [arg if _json_safe(arg) else repr(arg) for arg in e.args],
+        "attrs": {k: v for k, v in vars(e).items() if _json_safe(v)},
+    }
+
+
+def _load_error(error: Dict) -> Exception:
+    """Rebuild a recorded exception, so callers can catch it as usual."""
+    module_name, _, qualname = error["type"].rpartition(".")
+    try:
+        cls = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            cls = getattr(cls, part)
+        # Skip __init__, whose signature differs between exception classes
+        exc = cls.__new__(cls)
+        exc.args = tuple(error["args"])
+        exc.__dict__.update(error["attrs"])
+        return exc
+    except Exception:
+        return RuntimeError(f"{error['type']}: {error['args']}")
+
+
+class Cassette:
+    """Records calls to external services to a JSON lines file, or replays them."""
+
+    def __init__(self, path: Path, mode: str, latency: Optional[LatencyModel] = None):
+        """Open a cassette.
+
+        Args:
+            path: The cassette file. Recording overwrites it.
+            mode: RECORD or REPLAY
+            latency: How long replayed calls take; by default as recorded
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency or LatencyModel()
+        self.count = 0
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, List[Dict]] = defaultdict(list)
+
+        if mode == REPLAY:
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        interaction = json.loads(line)
+                        self._by_key[interaction["key"]].append(interaction)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("")
+
+    def call(
+        self,
+        kind: str,
+        name: str,
+        request: Any,
+        send: Callable[[], Any],
+        encode: Callable[[Any], Any] = lambda result: result,
+        decode: Callable[[Any], Any] = lambda response: response,
+    ) -> Any:
+        """Make a call through the cassette.
+
+        Args:
+            kind: The service called ("openai", "tts" or "anki")
+            name: What was called, e.g. the model or AnkiConnect action
+            request: The request, which identifies the call on replay
+            send: Makes the real call, when recording
+            encode: Converts the result to JSON data for the cassette
+            decode: Converts the JSON data back to a result on replay
+
+        Returns:
+            The result of the call, real or replayed
+
+        Raises:
+            CassetteMissError: If replaying a call that was never recorded
+        """
+        key = get_interaction_key(kind, name, request)
+        if self.mode == REPLAY:
+            interaction = self._take(kind, name, key)
+            time.sleep(self.latency.duration(kind, interaction["duration"]))
+            if "error" in interaction:
+                raise _load_error(interaction["error"])
+            return decode(interaction["response"])
+
+        started_at = time.monotonic()
+        try:
+            result = send()
+        except Exception as e:
+            self._write(kind, name, key, started_at, error=_dump_error(e))
+            raise
+        self._write(kind, name, key, started_at, response=encode(result))
+        return result
+
+    def stream(
+        self,
+        kind: str,
+        name: str,
+        request: Any,
+        send: Callable[[], Iterator[str]],
+    ) -> Iterator[str]:
+        """Make a streaming call through the cassette, like `call`.
+
+        The chunks are recorded with the time each of them arrived, and
+        replayed at the same times (or spread evenly over a fixed latency).
+        """
+        key = get_interaction_key(kind, name, request)
+        if self.mode == REPLAY:
+            yield from self._replay_stream(kind, name, key)
+            return
+
+        started_at = time.monotonic()
+        chunks, offsets = [], []
+        try:
+            for chunk in send():
+                chunks.append(chunk)
+                offsets.append(time.monotonic() - started_at)
+                yield chunk
+        except Exception as e:
+            response = {"chunks": chunks, "offsets": offsets}
+            self._write(
+                kind, name, key, started_at, response=response, error=_dump_error(e)
+            )
+            raise
+        except GeneratorExit:
+            # The caller stopped reading; record what it got
+            response = {"chunks": chunks, "offsets": offsets}
+            self._write(kind, name, key, started_at, response=response)
+            raise
+        response = {"chunks": chunks, "offsets": offsets}
+        self._write(kind, name, key, started_at, response=response)
+
+    def _replay_stream(self, kind: str, name: str, key: str) -> Iterator[str]:
+        interaction = self._take(kind, name, key)
+        chunks = interaction["response"]["chunks"]
+        if self.latency.fixed is None:
+            offsets = interaction["response"]["offsets"]
+        else:
+            total = self.latency.duration(kind, interaction["duration"])
+            offsets = [total * (i + 1) / len(chunks) for i in range(len(chunks))]
+
+        started_at = time.monotonic()
+        for chunk, offset in zip(chunks, offsets):
+            time.sleep(max(0.0, started_at + offset - time.monotonic()))
+            yield chunk
+        if "error" in interaction:
+            raise _load_error(interaction["error"])
+
+    def _take(self, kind: str, name: str, key: str) -> Dict:
+        """Find the recording to replay for a call, and mark it used."""
+        with self._lock:
+            self.count += 1
+            recorded = self._by_key.get(key, [])
+            for interaction in recorded:
+                if not interaction.get("used"):
+                    interaction["used"] = True
+                    return interaction
+            if recorded:
+                # Called more often than when recorded; repeat the last answer
+                return recorded[-1]
+        raise CassetteMissError(f"No recorded {kind} call to {name} on {self.path}")
+
+    def _write(
+        self, kind: str, name: str, key: str, started_at: float, **result
+    ) -> None:
+        interaction = {
+            "kind": kind,
+            "name": name,
+            "key": key,
+            "duration": round(time.monotonic() - started_at, 4),
+            **result,
+        }
+        line = json.dumps(interaction, ensure_ascii=False, default=_describe)
+        with self._lock:
+            self.count += 1
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+        dprint(f"Recorded {kind} call to {name} ({interaction['duration']}s)")
+
+
+# The cassette of this process, if recording or replaying
+_cassette: Optional[Cassette] = None
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    global _cassette
+    _cassette = cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    return _cassette
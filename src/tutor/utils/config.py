@@ -4,6 +4,20 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 
 
+def get_config_dir() -> Path:
+    """Return the chinese-tutor config directory, creating it if needed.
+
+    Besides config.yaml this holds local state such as the deck mirror.
+    """
+    if os.name == "nt":  # Windows
+        config_dir = Path(os.getenv("APPDATA", "")) / "chinese-tutor"
+    else:  # Unix-like
+        config_dir = Path.home() / ".config" / "chinese-tutor"
+
+    config_dir.mkdir(parents=True, exist_ok=True)
+    return config_dir
+
+
 class Config:
     def __init__(self) -> None:
         self.config_path: Path = self._get_config_path()
@@ -16,13 +30,7 @@ class Config:
             )
 
     def _get_config_path(self) -> Path:
-        if os.name == "nt":  # Windows
-            config_dir = Path(os.getenv("APPDATA", "")) / "chinese-tutor"
-        else:  # Unix-like
-            config_dir = Path.home() / ".config" / "chinese-tutor"
-
-        config_dir.mkdir(parents=True, exist_ok=True)
-        return config_dir / "config.yaml"
+        return get_config_dir() / "config.yaml"
 
     def _load_config(self) -> Dict[str, Any]:
         if not self.config_path.exists():
@@ -84,6 +92,17 @@ class Config:
         self._config["learner_level"] = value.lower()
         self.save_config(self._config)
 
+    @property
+    def openai_rate_limits(self) -> Dict[str, Dict[str, int]]:
+        """Get the OpenAI rate limits per model.
+
+        Returns:
+            Dict[str, Dict[str, int]]: `requests_per_minute` and
+            `tokens_per_minute` by model name. Models without limits use the
+            ones OpenAI reports.
+        """
+        return self._config.get("openai_rate_limits", {})
+
 
 # Singleton instance
 _config: Optional[Config] = None
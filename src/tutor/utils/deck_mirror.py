@@ -0,0 +1,281 @@
+"""Local SQLite mirror of the chinese-tutor notes in Anki.
+
+Existence checks and similar-word lookups used to query a live Anki over HTTP,
+which scans the whole deck and fails when Anki is closed. The mirror keeps a
+copy of each note's notesInfo JSON on disk, keyed by note ID and indexed by the
+`Chinese` field, and is kept up to date incrementally using note modification
+times so only changed notes are re-fetched.
+
+Commands only sync the mirror when it is empty or stale; `ct sync` refreshes it
+explicitly. Since the mirror can miss notes added since then, or notes of
+other note types, word lookups that miss the mirror still ask Anki.
+"""
+
+import html
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import click
+
+from tutor.llm.models import LanguageFlashcard
+from tutor.utils.anki import AnkiConnectClient, AnkiConnectError
+from tutor.utils.config import get_config_dir
+from tutor.utils.logging import dprint
+
+# Only notes using our own note types are mirrored
+MIRROR_NOTE_QUERY = "note:chinese-tutor-*"
+
+# Commands re-sync a deck's mirror when its last sync is older than this
+STALE_AFTER_SECONDS = 24 * 60 * 60
+
+_HTML_TAG = re.compile(r"<[^>]*>")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    note_id INTEGER PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    chinese TEXT NOT NULL,
+    mod INTEGER NOT NULL,
+    note_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_chinese ON notes (chinese);
+CREATE TABLE IF NOT EXISTS deck_notes (
+    deck TEXT NOT NULL,
+    note_id INTEGER NOT NULL,
+    PRIMARY KEY (deck, note_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    deck TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def normalize_field(value: str) -> str:
+    """Normalize a field for lookups, dropping the HTML Anki's editor adds."""
+    if "<" in value:
+        value = _HTML_TAG.sub("", value)
+    if "&" in value:
+        value = html.unescape(value)
+    return value.replace("\xa0", " ").strip()
+
+
+def get_default_mirror_path() -> Path:
+    """Returns the default location of the deck mirror database."""
+    return get_config_dir() / "deck_mirror.sqlite3"
+
+
+class DeckMirror:
+    """On-disk mirror of the chinese-tutor notes in one or more Anki decks."""
+
+    def __init__(
+        self,
+        client: Optional[AnkiConnectClient] = None,
+        db_path: Optional[Path] = None,
+    ):
+        self.client = client or AnkiConnectClient()
+        self.db_path = Path(db_path) if db_path else get_default_mirror_path()
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "DeckMirror":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def sync(self, deck: str, full: bool = False) -> Dict[str, int]:
+        """Bring the mirror of a deck up to date with Anki.
+
+        Only notes whose modification time changed since the last sync are
+        re-fetched with notesInfo.
+
+        Args:
+            deck: Name of the deck to sync (subdecks are included)
+            full: Re-fetch every note, ignoring stored modification times
+
+        Returns:
+            Counts of "added", "updated", "removed" and "unchanged" notes
+        """
+        note_ids = self.client.find_note_ids(f'deck:"{deck}" {MIRROR_NOTE_QUERY}')
+        mod_times = self.client.get_notes_mod_times(note_ids)
+
+        stored_mods = dict(self._conn.execute("SELECT note_id, mod FROM notes"))
+        new_ids = [nid for nid in note_ids if nid not in stored_mods]
+        changed_ids = [
+            nid
+            for nid in note_ids
+            if nid in stored_mods and (full or stored_mods[nid] != mod_times.get(nid))
+        ]
+        stats = {
+            "added": len(new_ids),
+            "updated": len(changed_ids),
+            "removed": 0,
+            "unchanged": len(note_ids) - len(new_ids) - len(changed_ids),
+        }
+
+        for note_infos in self.client.iter_note_info_chunks(new_ids + changed_ids):
+            self._upsert(note_infos, mod_times)
+
+        with self._conn:
+            previous_ids = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT note_id FROM deck_notes WHERE deck = ?", (deck,)
+                )
+            }
+            stats["removed"] = len(previous_ids - set(note_ids))
+            self._conn.execute("DELETE FROM deck_notes WHERE deck = ?", (deck,))
+            self._conn.executemany(
+                "INSERT INTO deck_notes (deck, note_id) VALUES (?, ?)",
+                [(deck, nid) for nid in note_ids],
+            )
+            # Drop notes that are no longer in any mirrored deck
+            self._conn.execute(
+                "DELETE FROM notes WHERE note_id NOT IN "
+                "(SELECT note_id FROM deck_notes)"
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (deck, synced_at) VALUES (?, ?)",
+                (deck, time.time()),
+            )
+
+        dprint(f"Synced deck mirror for '{deck}': {stats}")
+        return stats
+
+    def try_sync(self, deck: str) -> bool:
+        """Sync the deck if Anki is reachable, otherwise fall back to the mirror.
+
+        Returns:
+            True if the sync succeeded
+        """
+        try:
+            self.sync(deck)
+            return True
+        except AnkiConnectError as e:
+            dprint(f"Deck mirror sync failed: {e}")
+            synced_at = self.last_synced_at(deck)
+            if synced_at is None:
+                click.secho(
+                    "Could not reach Anki and the local deck mirror is empty.",
+                    fg="yellow",
+                    err=True,
+                )
+            else:
+                click.secho(
+                    "Could not reach Anki, using local deck mirror from "
+                    f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(synced_at))}.",
+                    fg="yellow",
+                    err=True,
+                )
+            return False
+
+    def sync_if_stale(self, deck: str, max_age: float = STALE_AFTER_SECONDS) -> bool:
+        """Sync the deck if it was never synced, or not in the last `max_age` seconds.
+
+        Returns:
+            True if the deck was synced
+        """
+        synced_at = self.last_synced_at(deck)
+        if synced_at is not None and time.time() - synced_at < max_age:
+            return False
+        return self.try_sync(deck)
+
+    def last_synced_at(self, deck: str) -> Optional[float]:
+        """Return when the deck was last synced, or None if it never was."""
+        row = self._conn.execute(
+            "SELECT synced_at FROM sync_state WHERE deck = ?", (deck,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_by_word(self, deck: str, word: str) -> List[LanguageFlashcard]:
+        """Find notes in a deck whose `Chinese` field is `word`.
+
+        The mirror is checked first. On a miss, Anki is searched directly if it
+        is reachable, since the mirror only has our own note types as of the
+        last sync.
+        """
+        flashcards = self._query(
+            "SELECT n.note_json FROM notes n "
+            "JOIN deck_notes d ON d.note_id = n.note_id "
+            "WHERE d.deck = ? AND n.chinese = ? ORDER BY n.note_id",
+            (deck, normalize_field(word)),
+        )
+        if flashcards:
+            return flashcards
+
+        try:
+            note_ids = self.client.find_note_ids(f'"deck:{deck}" Chinese:{word}')
+            return [
+                flashcard
+                for note_infos in self.client.iter_note_info_chunks(note_ids)
+                for flashcard in LanguageFlashcard.from_anki_json_batch(note_infos)
+            ]
+        except AnkiConnectError as e:
+            dprint(f"Could not look up '{word}' in Anki: {e}")
+            return []
+
+    def find_similar(self, deck: str, word: str) -> List[LanguageFlashcard]:
+        """Find notes in a deck whose `Chinese` field contains `word`."""
+        return self._query(
+            "SELECT n.note_json FROM notes n "
+            "JOIN deck_notes d ON d.note_id = n.note_id "
+            "WHERE d.deck = ? AND instr(n.chinese, ?) > 0 ORDER BY n.note_id",
+            (deck, word),
+        )
+
+    def get_notes(self, note_ids: Iterable[int]) -> Dict[int, LanguageFlashcard]:
+        """Get mirrored notes by ID. IDs missing from the mirror are omitted."""
+        note_infos = self.get_note_infos(note_ids)
+        flashcards = LanguageFlashcard.from_anki_json_batch(list(note_infos.values()))
+        return dict(zip(note_infos, flashcards))
+
+    def get_note_infos(self, note_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Get the mirrored notesInfo JSON of notes by ID.
+
+        IDs missing from the mirror are omitted.
+        """
+        note_ids = list(note_ids)
+        notes = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(note_ids), 500):
+            chunk = note_ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for note_id, note_json in self._conn.execute(
+                f"SELECT note_id, note_json FROM notes WHERE note_id IN ({placeholders})",
+                chunk,
+            ):
+                notes[note_id] = json.loads(note_json)
+        return notes
+
+    def _query(self, sql: str, params: tuple) -> List[LanguageFlashcard]:
+        return LanguageFlashcard.from_anki_json_batch(
+            [json.loads(row[0]) for row in self._conn.execute(sql, params)]
+        )
+
+    def _upsert(self, note_infos: List[Dict], mod_times: Dict[int, int]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO notes "
+                "(note_id, model_name, chinese, mod, note_json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        note_info["noteId"],
+                        note_info.get("modelName", ""),
+                        normalize_field(
+                            note_info["fields"].get("Chinese", {}).get("value", "")
+                        ),
+                        mod_times.get(note_info["noteId"], note_info.get("mod", 0)),
+                        json.dumps(note_info, ensure_ascii=False),
+                    )
+                    for note_info in note_infos
+                ],
+            )
@@ -0,0 +1,716 @@
+"""A local stand-in for Anki with the AnkiConnect add-on.
+
+FakeAnkiServer speaks the AnkiConnect HTTP protocol on top of an in-memory
+collection, so the Anki client and the commands built on it can be exercised
+and benchmarked without a running Anki desktop. The collection can be seeded
+with a large synthetic Mandarin and Cantonese deck, and every request can be
+given a fixed latency to mimic a busy Anki.
+
+Like the real add-on, requests are handled one at a time: Anki runs them all
+on its main thread.
+
+Example:
+    with FakeAnkiServer(latency=0.005) as server:
+        server.collection.seed(100_000)
+        client = AnkiConnectClient(address=server.address)
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tutor.llm.models import CantoneseFlashcard, MandarinFlashcard
+from tutor.utils.logging import dprint
+
+DEFAULT_FAKE_ANKI_PORT = 8765
+# Deliberately not a typical deck name, so benchmarking never touches the
+# deck mirror of a real deck
+DEFAULT_SYNTHETIC_DECK = "Chinese Tutor Benchmark"
+
+# (character, pinyin, jyutping) used to build unique synthetic words
+_SYLLABLES = [
+    ("你", "nǐ", "nei5"),
+    ("好", "hǎo", "hou2"),
+    ("我", "wǒ", "ngo5"),
+    ("们", "men", "mun4"),
+    ("学", "xué", "hok6"),
+    ("习", "xí", "zaap6"),
+    ("中", "zhōng", "zung1"),
+    ("文", "wén", "man4"),
+    ("天", "tiān", "tin1"),
+    ("气", "qì", "hei3"),
+    ("朋", "péng", "pang4"),
+    ("友", "yǒu", "jau5"),
+    ("吃", "chī", "hek3"),
+    ("饭", "fàn", "faan6"),
+    ("喝", "hē", "hot3"),
+    ("水", "shuǐ", "seoi2"),
+    ("工", "gōng", "gung1"),
+    ("作", "zuò", "zok3"),
+    ("时", "shí", "si4"),
+    ("间", "jiān", "gaan1"),
+    ("地", "dì", "dei6"),
+    ("方", "fāng", "fong1"),
+    ("电", "diàn", "din6"),
+    ("话", "huà", "waa6"),
+    ("车", "chē", "ce1"),
+    ("站", "zhàn", "zaam6"),
+    ("书", "shū", "syu1"),
+    ("店", "diàn", "dim3"),
+    ("开", "kāi", "hoi1"),
+    ("心", "xīn", "sam1"),
+    ("生", "shēng", "saang1"),
+    ("日", "rì", "jat6"),
+    ("快", "kuài", "faai3"),
+    ("乐", "lè", "lok6"),
+    ("新", "xīn", "san1"),
+    ("年", "nián", "nin4"),
+    ("家", "jiā", "gaa1"),
+    ("人", "rén", "jan4"),
+    ("大", "dà", "daai6"),
+    ("小", "xiǎo", "siu2"),
+    ("上", "shàng", "soeng6"),
+    ("下", "xià", "haa6"),
+    ("东", "dōng", "dung1"),
+    ("西", "xī", "sai1"),
+    ("南", "nán", "naam4"),
+    ("北", "běi", "bak1"),
+    ("山", "shān", "saan1"),
+    ("海", "hǎi", "hoi2"),
+    ("花", "huā", "faa1"),
+    ("草", "cǎo", "cou2"),
+    ("风", "fēng", "fung1"),
+    ("雨", "yǔ", "jyu5"),
+    ("雪", "xuě", "syut3"),
+    ("云", "yún", "wan4"),
+    ("茶", "chá", "caa4"),
+    ("酒", "jiǔ", "zau2"),
+    ("钱", "qián", "cin2"),
+    ("买", "mǎi", "maai5"),
+    ("卖", "mài", "maai6"),
+    ("看", "kàn", "hon3"),
+]
+_RELATIONSHIPS = ["synonym", "antonym", "commonly paired", "similar pattern"]
+
+
+class FakeAnkiError(Exception):
+    """An error reported back to the client in the response's `error` field."""
+
+
+def _split_escaped(text: str, separator: str) -> Tuple[str, Optional[str]]:
+    """Split text at the first separator that is not escaped with a backslash."""
+    i = 0
+    while i < len(text):
+        if text[i] == "\\":
+            i += 2
+            continue
+        if text[i] == separator:
+            return text[:i], text[i + 1 :]
+        i += 1
+    return text, None
+
+
+def _compile_search(pattern: str) -> re.Pattern:
+    """Compile an Anki search value, where `*` and `_` are wildcards."""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        if char == "*":
+            regex.append(".*")
+        elif char == "_":
+            regex.append(".")
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return re.compile("".join(regex), re.IGNORECASE | re.DOTALL)
+
+
+def _tokenize(query: str) -> List[str]:
+    """Split a search query into terms, parentheses and operators."""
+    tokens = []
+    i = 0
+    while i < len(query):
+        char = query[i]
+        if char.isspace():
+            i += 1
+        elif char in "()":
+            tokens.append(char)
+            i += 1
+        else:
+            # A term runs until whitespace or a parenthesis outside of quotes.
+            # Quotes are dropped; escapes are kept for the term to interpret.
+            term = []
+            in_quotes = False
+            while i < len(query):
+                char = query[i]
+                if char == "\\" and i + 1 < len(query):
+                    term.append(query[i : i + 2])
+                    i += 2
+                    continue
+                if char == '"':
+                    in_quotes = not in_quotes
+                elif not in_quotes and (char.isspace() or char in "()"):
+                    break
+                else:
+                    term.append(char)
+                i += 1
+            tokens.append("".join(term))
+    return tokens
+
+
+NotePredicate = Callable[[Dict[str, Any]], bool]
+
+
+class _QueryParser:
+    """Recursive-descent parser for the subset of Anki search syntax we use.
+
+    Supports implicit AND, OR, negation with `-`, parentheses, and the terms
+    deck:, note:, tag:, nid:, rated:DAYS[:EASE], Field:value and plain text.
+    """
+
+    def __init__(self, query: str):
+        self.tokens = _tokenize(query)
+        self.pos = 0
+
+    def parse(self) -> NotePredicate:
+        if not self.tokens:
+            return lambda note: True
+        predicate = self._parse_or()
+        if self.pos != len(self.tokens):
+            raise FakeAnkiError(f"Invalid search: unexpected '{self.tokens[self.pos]}'")
+        return predicate
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _parse_or(self) -> NotePredicate:
+        options = [self._parse_and()]
+        while self._peek() is not None and self._peek().lower() == "or":
+            self.pos += 1
+            options.append(self._parse_and())
+        if len(options) == 1:
+            return options[0]
+        return lambda note: any(option(note) for option in options)
+
+    def _parse_and(self) -> NotePredicate:
+        terms = []
+        while self._peek() not in (None, ")") and self._peek().lower() != "or":
+            if self._peek().lower() == "and":
+                self.pos += 1
+                continue
+            terms.append(self._parse_unary())
+        if not terms:
+            raise FakeAnkiError("Invalid search: empty expression")
+        if len(terms) == 1:
+            return terms[0]
+        return lambda note: all(term(note) for term in terms)
+
+    def _parse_unary(self) -> NotePredicate:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        if token == "(":
+            predicate = self._parse_or()
+            if self._peek() != ")":
+                raise FakeAnkiError("Invalid search: unbalanced parentheses")
+            self.pos += 1
+            return predicate
+        if token.startswith("-") and len(token) > 1:
+            predicate = self._parse_term(token[1:])
+            return lambda note: not predicate(note)
+        if token == "-":
+            predicate = self._parse_unary()
+            return lambda note: not predicate(note)
+        return self._parse_term(token)
+
+    def _parse_term(self, term: str) -> NotePredicate:
+        key, value = _split_escaped(term, ":")
+        if value is None:
+            pattern = _compile_search(f"*{term}*")
+            return lambda note: any(
+                pattern.fullmatch(v) for v in note["fields"].values()
+            )
+
+        key = key.lower()
+        if key == "deck":
+            if value == "*":
+                return lambda note: True
+            pattern = _compile_search(value)
+            # A deck search also matches its subdecks
+            return lambda note: any(
+                pattern.fullmatch("::".join(note["deck"].split("::")[: i + 1]))
+                for i in range(note["deck"].count("::") + 1)
+            )
+        if key == "note":
+            pattern = _compile_search(value)
+            return lambda note: bool(pattern.fullmatch(note["modelName"]))
+        if key == "tag":
+            pattern = _compile_search(value)
+            return lambda note: any(pattern.fullmatch(t) for t in note["tags"])
+        if key == "nid":
+            note_ids = {int(n) for n in value.split(",")}
+            return lambda note: note["noteId"] in note_ids
+        if key == "rated":
+            days, _, ease = value.partition(":")
+            days, ease = int(days), int(ease) if ease else None
+            return lambda note: (
+                note["lastReview"] is not None
+                and (
+                    note["lastReview"][0] < days
+                    and (ease is None or note["lastReview"][1] == ease)
+                )
+            )
+
+        pattern = _compile_search(value)
+        return lambda note: any(
+            name.lower() == key and pattern.fullmatch(field_value)
+            for name, field_value in note["fields"].items()
+        )
+
+
+class FakeAnkiCollection:
+    """In-memory Anki collection that answers AnkiConnect actions.
+
+    Notes are stored as dicts with the keys noteId, modelName, deck, tags,
+    fields (name -> value), mod and lastReview, an optional
+    (days ago, ease) pair consulted by `rated:` searches.
+    """
+
+    def __init__(self):
+        self.decks: Dict[str, int] = {"Default": 1}
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.notes: Dict[int, Dict[str, Any]] = {}
+        self.media: set = set()
+        self._next_id = int(time.time() * 1000)
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def handle(self, action: str, params: Dict[str, Any]) -> Any:
+        """Run one AnkiConnect action and return its result.
+
+        Raises:
+            FakeAnkiError: If Anki would report an error for the action
+        """
+        handler = getattr(self, f"_action_{action}", None)
+        if handler is None:
+            raise FakeAnkiError("unsupported action")
+        try:
+            return handler(**params)
+        except TypeError as e:
+            raise FakeAnkiError(f"invalid parameters for {action}: {e}")
+
+    # Decks
+
+    def _action_deckNames(self) -> List[str]:
+        return sorted(self.decks)
+
+    def _action_createDeck(self, deck: str) -> int:
+        if deck not in self.decks:
+            self.decks[deck] = self._new_id()
+        return self.decks[deck]
+
+    # Note types
+
+    def _get_model(self, model_name: str) -> Dict[str, Any]:
+        if model_name not in self.models:
+            raise FakeAnkiError(f"model was not found: {model_name}")
+        return self.models[model_name]
+
+    def _action_modelNames(self) -> List[str]:
+        return sorted(self.models)
+
+    def _action_modelFieldNames(self, modelName: str) -> List[str]:
+        return list(self._get_model(modelName)["fields"])
+
+    def _action_createModel(
+        self,
+        modelName: str,
+        inOrderFields: List[str],
+        cardTemplates: List[Dict[str, str]],
+        css: str = "",
+        **kwargs,
+    ) -> Dict[str, Any]:
+        if modelName in self.models:
+            raise FakeAnkiError("Model name already exists")
+        self.models[modelName] = {
+            "fields": list(inOrderFields),
+            "css": css,
+            "templates": {
+                t.get("Name", f"Card {i + 1}"): {"Front": t["Front"], "Back": t["Back"]}
+                for i, t in enumerate(cardTemplates)
+            },
+        }
+        return {"name": modelName, "id": self._new_id()}
+
+    def _action_modelTemplates(self, modelName: str) -> Dict[str, Dict[str, str]]:
+        return self._get_model(modelName)["templates"]
+
+    def _action_modelStyling(self, modelName: str) -> Dict[str, str]:
+        return {"css": self._get_model(modelName)["css"]}
+
+    def _action_updateModelTemplates(self, model: Dict[str, Any]) -> None:
+        templates = self._get_model(model["name"])["templates"]
+        for name, template in model["templates"].items():
+            templates.setdefault(name, {}).update(template)
+
+    def _action_updateModelStyling(self, model: Dict[str, Any]) -> None:
+        self._get_model(model["name"])["css"] = model["css"]
+
+    def _action_deleteModelAndNotes(self, modelName: str) -> None:
+        self._get_model(modelName)
+        del self.models[modelName]
+        self.notes = {
+            nid: note
+            for nid, note in self.notes.items()
+            if note["modelName"] != modelName
+        }
+
+    # Notes
+
+    def find(self, query: str) -> List[int]:
+        """Get the IDs of the notes matching an Anki search query."""
+        predicate = _QueryParser(query).parse()
+        return [nid for nid, note in self.notes.items() if predicate(note)]
+
+    def _action_findNotes(self, query: str) -> List[int]:
+        return self.find(query)
+
+    def _action_notesInfo(self, notes: List[int]) -> List[Dict[str, Any]]:
+        infos = []
+        for note_id in notes:
+            note = self.notes.get(note_id)
+            if note is None:
+                # AnkiConnect returns an empty entry for unknown notes
+                infos.append({})
+                continue
+            model_fields = self.models[note["modelName"]]["fields"]
+            infos.append(
+                {
+                    "noteId": note_id,
+                    "modelName": note["modelName"],
+                    "tags": list(note["tags"]),
+                    "fields": {
+                        name: {"value": note["fields"].get(name, ""), "order": i}
+                        for i, name in enumerate(model_fields)
+                    },
+                    "cards": [note_id],
+                    "mod": note["mod"],
+                }
+            )
+        return infos
+
+    def _action_notesModTime(self, notes: List[int]) -> List[Dict[str, int]]:
+        return [
+            {"noteId": note_id, "mod": self.notes[note_id]["mod"]}
+            for note_id in notes
+            if note_id in self.notes
+        ]
+
+    def _check_note(self, note: Dict[str, Any]) -> None:
+        """Raise the error Anki would give when adding this note."""
+        if note.get("deckName") not in self.decks:
+            raise FakeAnkiError(f"deck was not found: {note.get('deckName')}")
+        model = self._get_model(note.get("modelName"))
+        first_field = model["fields"][0]
+        first_value = note.get("fields", {}).get(first_field, "")
+        if not first_value.strip():
+            raise FakeAnkiError("cannot create note because it is empty")
+        if note.get("options", {}).get("allowDuplicate"):
+            return
+        for other in self.notes.values():
+            if (
+                other["modelName"] == note["modelName"]
+                and other["deck"] == note["deckName"]
+                and other["fields"].get(first_field) == first_value
+            ):
+                raise FakeAnkiError("cannot create note because it is a duplicate")
+
+    def _attach_audio(self, fields: Dict[str, str], audio: Iterable[Dict]) -> None:
+        """Record attached audio in the media folder and append its sound tags."""
+        for attachment in audio:
+            self.media.add(attachment["filename"])
+            for field in attachment.get("fields", []):
+                fields[field] = (
+                    fields.get(field, "") + f"[sound:{attachment['filename']}]"
+                )
+
+    def _action_addNote(self, note: Dict[str, Any]) -> int:
+        self._check_note(note)
+        model_fields = self.models[note["modelName"]]["fields"]
+        fields = {
+            name: value
+            for name, value in note["fields"].items()
+            if name in model_fields
+        }
+        self._attach_audio(fields, note.get("audio", []))
+
+        note_id = self._new_id()
+        self.notes[note_id] = {
+            "noteId": note_id,
+            "modelName": note["modelName"],
+            "deck": note["deckName"],
+            "tags": list(note.get("tags", [])),
+            "fields": fields,
+            "mod": int(time.time()),
+            "lastReview": None,
+        }
+        return note_id
+
+    def _action_addNotes(self, notes: List[Dict[str, Any]]) -> List[Optional[int]]:
+        note_ids = []
+        for note in notes:
+            try:
+                note_ids.append(self._action_addNote(note))
+            except FakeAnkiError:
+                note_ids.append(None)
+        return note_ids
+
+    def _action_canAddNotes(self, notes: List[Dict[str, Any]]) -> List[bool]:
+        can_add = []
+        for note in notes:
+            try:
+                self._check_note(note)
+                can_add.append(True)
+            except FakeAnkiError:
+                can_add.append(False)
+        return can_add
+
+    def _action_updateNoteFields(self, note: Dict[str, Any]) -> None:
+        stored = self.notes.get(note["id"])
+        if stored is None:
+            raise FakeAnkiError(f"note was not found: {note['id']}")
+        model_fields = self.models[stored["modelName"]]["fields"]
+        for name, value in note.get("fields", {}).items():
+            if name in model_fields:
+                stored["fields"][name] = value
+        self._attach_audio(stored["fields"], note.get("audio", []))
+        stored["mod"] = int(time.time())
+
+    def _action_multi(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for action in actions:
+            try:
+                result = self.handle(action["action"], action.get("params", {}))
+                results.append({"result": result, "error": None})
+            except FakeAnkiError as e:
+                results.append({"result": None, "error": str(e)})
+        return results
+
+    # Synthetic data
+
+    def ensure_models(self) -> None:
+        """Create the chinese-tutor note types if they do not exist yet."""
+        for flashcard_class in (MandarinFlashcard, CantoneseFlashcard):
+            model_name = f"chinese-tutor-{flashcard_class.LANGUAGE}"
+            if model_name in self.models:
+                continue
+            self._action_createModel(
+                modelName=model_name,
+                inOrderFields=list(flashcard_class.ANKI_FIELD_NAMES.values())
+                + ["Sample Usage (Audio)", "Word (Audio)"],
+                cardTemplates=[
+                    {"Name": "Chinese front", "Front": "{{Chinese}}", "Back": ""},
+                    {"Name": "English front", "Front": "{{English}}", "Back": ""},
+                ],
+            )
+
+    def seed(
+        self,
+        num_notes: int,
+        deck: str = DEFAULT_SYNTHETIC_DECK,
+        cantonese_fraction: float = 0.2,
+        incomplete_fraction: float = 0.05,
+        seed: int = 0,
+    ) -> None:
+        """Fill the collection with synthetic notes.
+
+        Args:
+            num_notes: Number of notes to add
+            deck: Deck to add the notes to (created if needed)
+            cantonese_fraction: Share of notes using the Cantonese note type
+            incomplete_fraction: Share of notes missing their audio, so that
+                commands like fix-cards have work to do
+            seed: Random seed; the same seed always gives the same notes
+        """
+        rng = random.Random(seed)
+        self.ensure_models()
+        self._action_createDeck(deck)
+
+        # Continue numbering from notes already in the deck so words stay unique
+        start = sum(1 for note in self.notes.values() if note["deck"] == deck)
+        now = int(time.time())
+        for i in range(start, start + num_notes):
+            syllables = self._syllables_for(i)
+            word = "".join(s[0] for s in syllables)
+            cantonese = rng.random() < cantonese_fraction
+            language = "cantonese" if cantonese else "mandarin"
+            reading_index = 2 if cantonese else 1
+            reading = " ".join(s[reading_index] for s in syllables)
+
+            related = []
+            for _ in range(rng.randint(0, 3)):
+                other = self._syllables_for(rng.randrange(len(_SYLLABLES) ** 2))
+                related.append(
+                    f"• {''.join(s[0] for s in other)} "
+                    f"({' '.join(s[reading_index] for s in other)}) - "
+                    f"word {rng.randrange(1000)} [{rng.choice(_RELATIONSHIPS)}]"
+                )
+
+            fields = {
+                "Chinese": word,
+                "Pinyin" if not cantonese else "Jyutping": reading,
+                "English": f"synthetic word {i}",
+                "Sample Usage": f"我们今天学习“{word}”。",
+                "Sample Usage (English)": f"Today we are learning word {i}.",
+                "Related Words": "\n".join(related),
+            }
+            if rng.random() >= incomplete_fraction:
+                for field, text in [
+                    ("Word (Audio)", word),
+                    ("Sample Usage (Audio)", fields["Sample Usage"]),
+                ]:
+                    key = text if not cantonese else f"cantonese:{text}"
+                    digest = hashlib.md5(key.encode()).hexdigest()
+                    fields[field] = f"[sound:chinese-tutor-{digest}.wav]"
+
+            note_id = self._new_id()
+            self.notes[note_id] = {
+                "noteId": note_id,
+                "modelName": f"chinese-tutor-{language}",
+                "deck": deck,
+                "tags": [],
+                "fields": fields,
+                "mod": now - rng.randrange(365 * 24 * 60 * 60),
+                "lastReview": (
+                    (rng.randrange(30), rng.choices([1, 2, 3, 4], [1, 2, 12, 3])[0])
+                    if rng.random() < 0.7
+                    else None
+                ),
+            }
+
+    @staticmethod
+    def _syllables_for(index: int) -> List[Tuple[str, str, str]]:
+        """Map an index to a unique word of at least two syllables."""
+        syllables = []
+        index += len(_SYLLABLES)
+        while index:
+            index, remainder = divmod(index, len(_SYLLABLES))
+            syllables.append(_SYLLABLES[remainder])
+        return syllables
+
+
+class _FakeAnkiRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real add-on, so connection pooling is exercised
+    protocol_version = "HTTP/1.1"
+    server: "_FakeAnkiHTTPServer"
+
+    def do_GET(self) -> None:
+        self._send_body(b"AnkiConnect v.6")
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            request = json.loads(body)
+            action = request["action"]
+            params = request.get("params", {})
+        except (ValueError, KeyError, TypeError):
+            self._send_json({"result": None, "error": "invalid request"})
+            return
+
+        fake_anki = self.server.fake_anki
+        with fake_anki.lock:
+            if fake_anki.latency:
+                time.sleep(fake_anki.latency)
+            try:
+                response = {
+                    "result": fake_anki.collection.handle(action, params),
+                    "error": None,
+                }
+            except FakeAnkiError as e:
+                response = {"result": None, "error": str(e)}
+            fake_anki.request_count += 1
+        self._send_json(response)
+
+    def _send_json(self, response: Dict[str, Any]) -> None:
+        self._send_body(json.dumps(response).encode(), "application/json")
+
+    def _send_body(self, body: bytes, content_type: str = "text/plain") -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        dprint(f"fake-anki: {format % args}")
+
+
+class _FakeAnkiHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake_anki: "FakeAnkiServer"
+
+
+class FakeAnkiServer:
+    """AnkiConnect-compatible HTTP server backed by a FakeAnkiCollection."""
+
+    def __init__(
+        self,
+        collection: Optional[FakeAnkiCollection] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+    ):
+        """Create a server; it starts listening right away.
+
+        Args:
+            collection: Collection to serve. Defaults to an empty one.
+            host: Interface to listen on
+            port: Port to listen on; 0 picks a free port
+            latency: Seconds added to every request, to mimic a busy Anki
+        """
+        self.collection = collection or FakeAnkiCollection()
+        self.latency = latency
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self._httpd = _FakeAnkiHTTPServer((host, port), _FakeAnkiRequestHandler)
+        self._httpd.fake_anki = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        """Handle requests on the current thread until shutdown."""
+        self._httpd.serve_forever()
+
+    def start(self) -> "FakeAnkiServer":
+        """Handle requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeAnkiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,114 @@
+"""Index of the media files already in Anki's collection.media folder.
+
+Generated audio is named after a hash of its text, so a file that is already
+in the collection never needs to be synthesized again, and notes can reference
+it by bare filename instead of having AnkiConnect copy it a second time.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Set
+
+from tutor.utils.anki import get_default_anki_media_dir
+from tutor.utils.logging import dprint
+
+MEDIA_FILENAME_PREFIX = "chinese-tutor-"
+
+
+def get_audio_filename(text: str, language: str = "mandarin") -> str:
+    """Returns the media filename used for the generated audio of some text.
+
+    Mandarin keeps the original text-only hash so existing audio is reused;
+    other languages include the language so the same characters are not
+    shared across voices.
+    """
+    key = text if language == "mandarin" else f"{language}:{text}"
+    return f"{MEDIA_FILENAME_PREFIX}{hashlib.md5(key.encode()).hexdigest()}.wav"
+
+
+def get_sound_tag(filename: str) -> str:
+    """Returns the Anki field value that plays a media file."""
+    return f"[sound:{filename}]"
+
+
+def _is_usable(entry: os.DirEntry) -> bool:
+    # Empty generated audio is left behind by synthesis that never completed
+    return entry.is_file() and (
+        not entry.name.startswith(MEDIA_FILENAME_PREFIX) or entry.stat().st_size > 0
+    )
+
+
+class MediaIndex:
+    """In-memory set of filenames in the collection.media folder.
+
+    The folder is scanned once, on first use; files written afterwards are
+    recorded with `add`. Empty generated audio files are not indexed, so their
+    audio is synthesized again.
+    """
+
+    def __init__(self, media_dir: Optional[Path] = None):
+        self._media_dir = media_dir
+        self._filenames: Optional[Set[str]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def media_dir(self) -> Optional[Path]:
+        if self._media_dir is None:
+            try:
+                self._media_dir = get_default_anki_media_dir()
+            except NotImplementedError:
+                return None
+        return self._media_dir
+
+    def _load(self) -> Set[str]:
+        with self._lock:
+            if self._filenames is None:
+                filenames = set()
+                if self.media_dir is not None and self.media_dir.is_dir():
+                    with os.scandir(self.media_dir) as entries:
+                        filenames = {e.name for e in entries if _is_usable(e)}
+                dprint(f"Indexed {len(filenames)} media files in {self.media_dir}")
+                self._filenames = filenames
+            return self._filenames
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._load()
+
+    def add(self, filename: str) -> None:
+        """Record a file that was just written to the media folder."""
+        self._load()
+        with self._lock:
+            self._filenames.add(filename)
+
+    def path_for(self, filename: str) -> Path:
+        """Returns the path of a file in the media folder."""
+        if self.media_dir is None:
+            raise NotImplementedError("No Anki media folder for this system")
+        return self.media_dir / filename
+
+    def in_collection(self, filepath: str) -> Optional[str]:
+        """Check whether a file already lives in the media folder.
+
+        Returns:
+            The file's bare filename if it is in the collection, otherwise None
+        """
+        path = Path(filepath)
+        if self.media_dir is None or path.parent != self.media_dir:
+            return None
+        return path.name if path.name in self else None
+
+
+# Process-wide index, so the media folder is only scanned once per run
+_media_index: Optional[MediaIndex] = None
+_media_index_lock = threading.Lock()
+
+
+def get_media_index() -> MediaIndex:
+    global _media_index
+    # Audio is synthesized from several threads at once
+    with _media_index_lock:
+        if _media_index is None:
+            _media_index = MediaIndex()
+    return _media_index
@@ -0,0 +1,128 @@
+"""Compact, read-only table of notes for scanning whole decks.
+
+Building a pydantic flashcard (with nested related-word models) for every note
+is slow and memory hungry when a command only needs to look at a few fields of
+each note. NoteTable stores notes column by column instead: one array of note
+IDs plus one list of interned strings per field, filled straight from
+AnkiConnect's notesInfo JSON. Rows are turned into full flashcards only when a
+command actually needs one.
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from tutor.llm.models import LanguageFlashcard
+from tutor.utils.anki import DEFAULT_CHUNK_SIZE, AnkiConnectClient
+
+
+class NoteTable:
+    """Notes stored as columns: note IDs, model names and one column per field.
+
+    Fields a note's model lacks are stored as empty strings, so every column
+    has one entry per row.
+    """
+
+    __slots__ = ("note_ids", "model_names", "_columns", "_row_by_id")
+
+    def __init__(self):
+        self.note_ids = array("q")
+        self.model_names: List[str] = []
+        self._columns: Dict[str, List[str]] = {}
+        self._row_by_id: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def from_note_infos(cls, note_infos: Iterable[Dict]) -> "NoteTable":
+        """Build a table from notesInfo results."""
+        table = cls()
+        table.extend(note_infos)
+        return table
+
+    @classmethod
+    def from_client(
+        cls,
+        client: AnkiConnectClient,
+        note_ids: List[int],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> "NoteTable":
+        """Fetch notes in chunks, keeping only their compact form in memory."""
+        table = cls()
+        for note_infos in client.iter_note_info_chunks(note_ids, chunk_size):
+            table.extend(note_infos)
+        return table
+
+    def extend(self, note_infos: Iterable[Dict]) -> None:
+        """Append notesInfo results. Empty entries (deleted notes) are skipped."""
+        for note_info in note_infos:
+            if not note_info:
+                continue
+            row = len(self.note_ids)
+            self.note_ids.append(note_info["noteId"])
+            self.model_names.append(sys.intern(note_info.get("modelName", "")))
+
+            fields = note_info.get("fields", {})
+            for name, field in fields.items():
+                column = self._columns.get(name)
+                if column is None:
+                    column = self._columns[sys.intern(name)] = [""] * row
+                column.append(sys.intern(field["value"]))
+            # Pad the columns of fields this note does not have
+            for name, column in self._columns.items():
+                if len(column) == row:
+                    column.append("")
+        self._row_by_id = None
+
+    def __len__(self) -> int:
+        return len(self.note_ids)
+
+    @property
+    def field_names(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, field_name: str) -> List[str]:
+        """Get every row's value of a field ("" for rows without it)."""
+        return self._columns.get(field_name, [""] * len(self))
+
+    def get(self, row: int, field_name: str) -> str:
+        """Get one field value of a row ("" if the row does not have it)."""
+        column = self._columns.get(field_name)
+        return column[row] if column is not None else ""
+
+    def fields(self, row: int) -> Dict[str, str]:
+        """Get the field values of a row, by field name."""
+        return {name: column[row] for name, column in self._columns.items()}
+
+    def row_of(self, note_id: int) -> int:
+        """Get the row of a note ID.
+
+        Raises:
+            KeyError: If the note is not in the table
+        """
+        if self._row_by_id is None:
+            self._row_by_id = {nid: row for row, nid in enumerate(self.note_ids)}
+        return self._row_by_id[note_id]
+
+    def word(self, row: int) -> str:
+        return self.get(row, "Chinese")
+
+    def pronunciation(self, row: int) -> str:
+        """Get the row's Pinyin, or Jyutping for Cantonese notes."""
+        return self.get(row, "Pinyin") or self.get(row, "Jyutping")
+
+    def to_note_info(self, row: int) -> Dict:
+        """Rebuild the notesInfo JSON of a row."""
+        return {
+            "noteId": self.note_ids[row],
+            "modelName": self.model_names[row],
+            "fields": {
+                name: {"value": value} for name, value in self.fields(row).items()
+            },
+        }
+
+    def to_flashcard(self, row: int) -> LanguageFlashcard:
+        """Build the full flashcard of a row."""
+        return LanguageFlashcard.from_anki_json(self.to_note_info(row))
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over row numbers."""
+        return iter(range(len(self)))
@@ -0,0 +1,142 @@
+"""Retry and circuit-breaker helpers for flaky network calls.
+
+Anki stops answering AnkiConnect while it syncs, so a single dropped request
+should not abort a long-running command. RetryPolicy decides how often and how
+long to wait between attempts; CircuitBreaker pauses callers while a service is
+down instead of letting every request burn through its retries.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import click
+
+from tutor.utils.logging import dprint
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+    ):
+        """Create a retry policy.
+
+        Args:
+            max_attempts: Total number of attempts, including the first one
+            base_delay: Seconds to wait (before jitter) after the first failure
+            max_delay: Upper bound on the wait between two attempts
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given (zero-based) failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def sleep(self, attempt: int) -> None:
+        time.sleep(self.delay(attempt))
+
+
+class CircuitOpenError(Exception):
+    """Raised when a service stays unresponsive for longer than we will wait."""
+
+
+class CircuitBreaker:
+    """Pauses calls to a service after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    callers wait in `before_call` for `reset_timeout` seconds. A single probe
+    call is then let through: success closes the circuit, failure opens it
+    again. Callers give up with CircuitOpenError after waiting `max_wait`
+    seconds in total.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 15.0,
+        max_wait: float = 300.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def before_call(self) -> None:
+        """Block while the circuit is open, or raise if it stays open too long."""
+        waited = 0.0
+        announced = False
+        while True:
+            with self._lock:
+                if self._opened_at is None:
+                    return
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining <= 0 and not self._probing:
+                    # Half-open: let this caller probe the service
+                    self._probing = True
+                    return
+
+            if waited >= self.max_wait:
+                raise CircuitOpenError(
+                    f"{self.name} has been unresponsive for {waited:.0f} seconds"
+                )
+            if not announced:
+                click.secho(
+                    f"{self.name} is not responding, pausing until it recovers...",
+                    fg="yellow",
+                    err=True,
+                )
+                announced = True
+
+            pause = min(max(remaining, 0.1), self.max_wait - waited)
+            time.sleep(pause)
+            waited += pause
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                dprint(f"{self.name} circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    dprint(f"{self.name} circuit opened")
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+# One breaker per service address, shared by every client in the process
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker for a service."""
+    with _circuit_breakers_lock:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = CircuitBreaker(name, **kwargs)
+        return _circuit_breakers[name]
@@ -1,11 +1,13 @@
+import json
 import pathlib
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from openai import OpenAI
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from ..cli_global_state import get_model
+from ..llm.client import chat_completion, parse_chat_completion, stream_chat_completion
+from ..llm.json_stream import JsonFieldStream
 
 # Load environment variables
 load_dotenv()
@@ -58,7 +60,6 @@ def get_conversation_review(
     dialogue_history: List[dict], scenario: str
 ) -> ConversationReview:
     """Generate a comprehensive review of the entire conversation."""
-    openai_client = OpenAI()
 
     # Format dialogue history for the prompt
     history_text = "\n".join(
@@ -67,7 +68,7 @@ def get_conversation_review(
     )
 
     try:
-        completion = openai_client.beta.chat.completions.parse(
+        completion = parse_chat_completion(
             model=get_model(),
             response_format=ConversationReview,
             messages=[
@@ -91,13 +92,20 @@ def get_conversation_review(
         )
 
 
-def get_dialogue_response(
+# Shown when the next line of dialogue cannot be generated
+_FALLBACK_DIALOGUE_RESPONSE = DialogueResponse(
+    next_line_zh="好的，让我们继续",
+    next_line_pinyin="hǎo de, ràng wǒ men jì xù",
+    next_line_en="Okay, let's continue",
+)
+
+
+def _get_dialogue_request(
     user_response: str,
     dialogue_history: List[dict],
     scenario: str,
-) -> DialogueResponse:
-    """Generate the next dialogue response using OpenAI."""
-    openai_client = OpenAI()
+) -> dict:
+    """Build the chat completion parameters for the next dialogue line."""
 
     # Format dialogue history for the prompt
     history_text = "\n".join(
@@ -118,33 +126,77 @@ Provide the next line of dialogue naturally. Follow these rules:
 3. Focus on natural, practical dialogue
 4. Keep responses concise and natural
 
-Format your response as a JSON object with these fields:
+Format your response as a JSON object with these fields, in this order:
 - next_line_zh: Next line in Chinese
 - next_line_pinyin: Pinyin for the next line
 - next_line_en: English translation"""
 
+    return dict(
+        model=get_model(),  # Use the same model as flashcards
+        response_format={"type": "json_object"},
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a helpful Chinese language tutor. Always respond in the exact JSON format requested.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+    )
+
+
+def get_dialogue_response(
+    user_response: str,
+    dialogue_history: List[dict],
+    scenario: str,
+) -> DialogueResponse:
+    """Generate the next dialogue response using OpenAI."""
     try:
-        completion = openai_client.chat.completions.create(
-            model=get_model(),  # Use the same model as flashcards
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful Chinese language tutor. Always respond in the exact JSON format requested.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+        completion = chat_completion(
+            **_get_dialogue_request(user_response, dialogue_history, scenario)
         )
         response_json = completion.choices[0].message.content
         return DialogueResponse.model_validate_json(response_json)
     except Exception as e:
         print(f"Error generating dialogue response: {e}")
         # Return a fallback response
-        return DialogueResponse(
-            next_line_zh="好的，让我们继续",
-            next_line_pinyin="hǎo de, ràng wǒ men jì xù",
-            next_line_en="Okay, let's continue",
-        )
+        return _FALLBACK_DIALOGUE_RESPONSE
+
+
+def stream_dialogue_response(
+    user_response: str,
+    dialogue_history: List[dict],
+    scenario: str,
+) -> Iterator[Tuple[str, dict]]:
+    """Generate the next dialogue response, streaming its fields as they arrive.
+
+    The JSON response is parsed as it streams, so next_line_zh can be shown
+    before the pinyin and English have been generated.
+
+    Yields:
+        ("delta", {"field": ..., "text": ...}) for each piece of field text,
+        then ("done", response) with the complete, validated response (or the
+        fallback response if generation failed)
+    """
+    parser = JsonFieldStream()
+    content = []
+    try:
+        for chunk in stream_chat_completion(
+            **_get_dialogue_request(user_response, dialogue_history, scenario)
+        ):
+            content.append(chunk)
+            for field, text in parser.feed(chunk):
+                if field in DialogueResponse.model_fields:
+                    yield "delta", {"field": field, "text": text}
+        response = DialogueResponse.model_validate_json("".join(content))
+    except Exception as e:
+        print(f"Error generating dialogue response: {e}")
+        response = _FALLBACK_DIALOGUE_RESPONSE
+    yield "done", response.model_dump()
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
 def create_app():
@@ -218,6 +270,20 @@ def create_app():
         response = get_dialogue_response(user_response, history, scenario)
         return jsonify(response.model_dump())
 
+    @app.route("/api/respond/stream", methods=["POST"])
+    def stream_response_to_dialogue():
+        """Like /api/respond, but streams the response as server-sent events."""
+        user_response = request.json.get("response", "")
+        history = request.json.get("history", [])
+        scenario = request.json.get("scenario", "restaurant")
+        events = stream_dialogue_response(user_response, history, scenario)
+        return Response(
+            stream_with_context(_format_sse(event, data) for event, data in events),
+            mimetype="text/event-stream",
+            # Keep proxies from buffering the stream
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @app.route("/api/review", methods=["POST"])
     def review_conversation():
         """Generate a comprehensive review of the conversation."""
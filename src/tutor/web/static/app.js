@@ -243,6 +243,38 @@ const styleSheet = document.createElement("style");
 styleSheet.innerText = styles;
 document.head.appendChild(styleSheet);
 
+// Dialogue message keys of the fields streamed by /api/respond/stream
+const DIALOGUE_FIELDS = {
+    next_line_zh: 'content_zh',
+    next_line_pinyin: 'content_pinyin',
+    next_line_en: 'content_en',
+};
+
+// Read a fetch response of server-sent events, calling onEvent(event, data)
+// with the parsed JSON data of each event as it arrives
+async function readServerSentEvents(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let end;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            let event = 'message';
+            const data = [];
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data.push(line.slice(6));
+            }
+            onEvent(event, JSON.parse(data.join('\n')));
+        }
+    }
+}
+
 function DialogueApp() {
     const [dialogue, setDialogue] = React.useState([]);
     const [userInput, setUserInput] = React.useState('');
@@ -316,13 +348,18 @@ function DialogueApp() {
         if (!userInput.trim() || isLoading) return;
 
         setIsLoading(true);
+        // The tutor's line is shown as it streams in, field by field
+        const tutorMessage = { role: 'tutor', content_zh: '' };
+        const newDialogue = [...dialogue, {
+            role: 'user',
+            content_zh: userInput,
+        }, tutorMessage];
+        const showTutorMessage = () => setDialogue([
+            ...newDialogue.slice(0, -1),
+            { ...tutorMessage },
+        ]);
         try {
-            const newDialogue = [...dialogue, {
-                role: 'user',
-                content_zh: userInput,
-            }];
-
-            const response = await fetch('http://localhost:5001/api/respond', {
+            const response = await fetch('http://localhost:5001/api/respond/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -337,18 +374,25 @@ function DialogueApp() {
 
                 }),
             });
-            const data = await response.json();
-
-            // Continue with dialogue
-            newDialogue.push({
-                role: 'tutor',
-                content_zh: data.next_line_zh,
-                content_pinyin: data.next_line_pinyin,
-                content_en: data.next_line_en,
+            if (!response.ok) {
+                throw new Error(`Server responded with ${response.status}`);
+            }
+            setUserInput('');
+            showTutorMessage();
+
+            await readServerSentEvents(response, (event, data) => {
+                if (event === 'delta') {
+                    const key = DIALOGUE_FIELDS[data.field];
+                    tutorMessage[key] = (tutorMessage[key] || '') + data.text;
+                } else if (event === 'done') {
+                    // The complete response replaces what was streamed
+                    tutorMessage.content_zh = data.next_line_zh;
+                    tutorMessage.content_pinyin = data.next_line_pinyin;
+                    tutorMessage.content_en = data.next_line_en;
+                }
+                showTutorMessage();
             });
 
-            setDialogue(newDialogue);
-            setUserInput('');
             // Clear cached review since conversation changed
             setReview(null);
         } catch (error) {
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from tutor.commands import fix_cards
+from tutor.commands.fix_cards import (
+    _get_malformed_related_words,
+    _get_update_reasons,
+)
+from tutor.llm.models import ChineseFlashcard, MandarinFlashcard
+
+FIELDS = {
+    **{field: "value" for field in ChineseFlashcard.get_content_fields()},
+    **{field: "[sound:audio.mp3]" for field in ChineseFlashcard.get_audio_fields()},
+}
+
+
+def test_malformed_related_words_do_not_trigger_regeneration():
+    fields = {
+        **FIELDS,
+        "Related Words": "教育 (jiào yù) - education [related field]\nmy own note",
+    }
+
+    assert _get_update_reasons(fields, force_update=False) == (False, False, [])
+    assert _get_malformed_related_words(fields) == ["my own note"]
+
+
+def test_audio_is_only_counted_when_the_update_is_sent(monkeypatch):
+    monkeypatch.setattr(fix_cards, "text_to_speech", lambda text, language: "a.wav")
+    card = MandarinFlashcard(
+        anki_note_id=1,
+        word="你好",
+        pinyin="nǐ hǎo",
+        english="hello",
+        sample_usage="你好吗？",
+        sample_usage_english="How are you?",
+    )
+    fields = {**FIELDS, "Word (Audio)": ""}
+    stats = {"updated": 0, "audio_updated": 0, "skipped": 0}
+    client = SimpleNamespace(update_flashcard=lambda *args, **kwargs: False)
+
+    assert not fix_cards._fix_card(
+        client, card, fields, False, stats, False, False, batch=None
+    )
+    assert stats == {"updated": 0, "audio_updated": 0, "skipped": 1}
@@ -0,0 +1,115 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tutor.commands import generate_flashcard_from_word as command
+from tutor.llm.models import MandarinFlashcard
+
+
+class FakeMirror:
+    def __init__(self, client):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def sync_if_stale(self, deck):
+        return True
+
+    def find_by_word(self, deck, word):
+        return ["existing card"] if word == "旧" else []
+
+
+def _flashcard(word):
+    return MandarinFlashcard(
+        word=word,
+        pinyin="pin yin",
+        english="english",
+        sample_usage=f"{word}。",
+        sample_usage_english="Sample.",
+    )
+
+
+@pytest.fixture
+def added(monkeypatch):
+    """Run the command against fakes, returning the words added, in order."""
+    added = []
+
+    def fake_generate(words, language):
+        # Later batches finish first
+        time.sleep(0.05 if "一" in words else 0)
+        return {word: _flashcard(word) for word in words}
+
+    def fake_add(flashcards, deck):
+        added.extend(f.word for f in flashcards)
+        return True
+
+    monkeypatch.setattr(command, "AnkiConnectClient", lambda: None)
+    monkeypatch.setattr(command, "DeckMirror", FakeMirror)
+    monkeypatch.setattr(
+        command, "get_config", lambda: SimpleNamespace(default_deck="Deck")
+    )
+    monkeypatch.setattr(command, "generate_flashcards_for_words", fake_generate)
+    monkeypatch.setattr(command, "maybe_add_flashcards_to_deck", fake_add)
+    return added
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_cards_are_added_in_input_order(added, jobs):
+    words = ("一", "二", "旧", "三", "二", "四", "五")
+
+    command._generate_flashcard_from_word_impl("Deck", words, batch_size=2, jobs=jobs)
+
+    assert added == ["一", "二", "三", "四", "五"]
+
+
+def test_next_batch_is_generated_while_the_current_one_is_reviewed(added, monkeypatch):
+    started = []
+
+    def fake_generate(words, language):
+        started.extend(words)
+        return {word: _flashcard(word) for word in words}
+
+    def fake_add(flashcards, deck):
+        # Give the look-ahead time to start
+        time.sleep(0.05)
+        added.append((flashcards[0].word, list(started)))
+        return True
+
+    monkeypatch.setattr(command, "generate_flashcards_for_words", fake_generate)
+    monkeypatch.setattr(command, "maybe_add_flashcards_to_deck", fake_add)
+
+    command._generate_flashcard_from_word_impl("Deck", ("一", "二", "三"), jobs=1)
+
+    # When the first card is reviewed, only the second has been pre-generated
+    assert added[0] == ("一", ["一", "二"])
+
+
+def test_interrupt_does_not_wait_for_running_look_ahead(added, monkeypatch):
+    release = threading.Event()
+    finished = []
+
+    def fake_generate(words, language):
+        if "二" in words:
+            release.wait(timeout=5)
+        finished.extend(words)
+        return {word: _flashcard(word) for word in words}
+
+    def fake_add(flashcards, deck):
+        # Let the look-ahead start before the user hits Ctrl-C
+        time.sleep(0.05)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(command, "generate_flashcards_for_words", fake_generate)
+    monkeypatch.setattr(command, "maybe_add_flashcards_to_deck", fake_add)
+
+    try:
+        command._generate_flashcard_from_word_impl("Deck", ("一", "二"), jobs=1)
+        assert finished == ["一"]
+    finally:
+        release.set()
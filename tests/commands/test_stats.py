@@ -0,0 +1,38 @@
+import json
+import time
+
+import click
+import pytest
+
+from tutor.commands.stats import _llm_stats_impl, _parse_window
+
+
+def test_parse_window():
+    assert _parse_window("30m") == 1800
+    assert _parse_window("7d") == 7 * 86400
+    assert _parse_window("all") is None
+    with pytest.raises(click.BadParameter):
+        _parse_window("7 days")
+
+
+def test_llm_stats(telemetry_path):
+    assert _llm_stats_impl(3600) == "No LLM calls recorded in this window"
+
+    record = {
+        "type": "call",
+        "ts": time.time(),
+        "command": "fix-cards",
+        "model": "gpt-4o",
+        "latency": 2.5,
+        "attempts": 1,
+        "outcome": "ok",
+        "prompt_tokens": 1000,
+        "cached_tokens": 0,
+        "completion_tokens": 100,
+    }
+    telemetry_path.write_text(json.dumps(record) + "\n")
+
+    report = _llm_stats_impl(3600)
+    assert "fix-cards" in report
+    assert "2.50" in report
+    assert "Estimated total cost: $0.0035" in report
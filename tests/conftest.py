@@ -0,0 +1,21 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tutor.llm import prompts, telemetry
+
+
+@pytest.fixture(autouse=True)
+def learner_level(monkeypatch):
+    """Build prompts without reading the user's config.yaml."""
+    monkeypatch.setattr(
+        prompts, "get_config", lambda: SimpleNamespace(learner_level="intermediate")
+    )
+
+
+@pytest.fixture(autouse=True)
+def telemetry_path(tmp_path, monkeypatch):
+    """Record LLM telemetry to a temporary file instead of the config dir."""
+    path = tmp_path / "llm_telemetry.jsonl"
+    monkeypatch.setattr(telemetry, "get_default_telemetry_path", lambda: path)
+    return path
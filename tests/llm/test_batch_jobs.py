@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from tutor.llm.batch_jobs import (
+    COMPLETED,
+    SUBMITTED,
+    BatchJobStore,
+    LocalBatchBackend,
+    get_batch_responses_by_prompt,
+    refresh_batch_job,
+    submit_batch_job,
+)
+from tutor.llm_flashcards import FLASHCARD_SEED
+
+
+def _respond(body):
+    prompt = body["messages"][-1]["content"]
+    if prompt == "fail":
+        raise RuntimeError("model overloaded")
+    return {"choices": [{"message": {"content": json.dumps({"word": prompt})}}]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BatchJobStore(tmp_path / "jobs")
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalBatchBackend(tmp_path / "local", respond=_respond)
+
+
+def test_submit_writes_requests_and_saves_job(store, backend):
+    job = submit_batch_job(
+        store, backend, {"note-1": "你好", "note-2": "再见"}, "gpt-4o", {"deck": "D"}
+    )
+
+    requests = [
+        json.loads(line)
+        for line in store.requests_path(job.job_id).read_text().splitlines()
+    ]
+    assert [r["custom_id"] for r in requests] == ["note-1", "note-2"]
+    assert requests[0]["url"] == "/v1/chat/completions"
+    assert requests[0]["body"]["seed"] == FLASHCARD_SEED
+    assert requests[0]["body"]["model"] == "gpt-4o"
+
+    loaded = store.load(job.job_id)
+    assert loaded == job
+    assert loaded.status == SUBMITTED
+    assert store.list() == [job]
+
+
+def test_refresh_stores_results_with_the_job(store, backend):
+    job = submit_batch_job(store, backend, {"a": "你好", "b": "fail"}, "gpt-4o")
+
+    job = refresh_batch_job(store, job, backend)
+
+    assert job.status == COMPLETED
+    loaded = store.load(job.job_id)
+    assert loaded.status == COMPLETED
+    assert loaded.responses == {"a": json.dumps({"word": "你好"})}
+    assert "model overloaded" in job.errors["b"]
+    assert get_batch_responses_by_prompt(loaded) == {
+        "你好": json.dumps({"word": "你好"})
+    }
+
+
+def test_load_unknown_job(store):
+    with pytest.raises(KeyError):
+        store.load("missing")
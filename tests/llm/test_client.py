@@ -0,0 +1,166 @@
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from tutor.llm import client as llm_client
+from tutor.llm.client import (
+    RateLimiter,
+    TokenBucket,
+    _call_rate_limited,
+    _parse_duration,
+    estimate_tokens,
+)
+from tutor.utils.retry import RetryPolicy
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("20", 20), ("1.5s", 1.5), ("120ms", 0.12), ("6m0s", 360), ("1h2m3s", 3723)],
+)
+def test_parse_duration(value, seconds):
+    assert _parse_duration(value) == pytest.approx(seconds)
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(capacity=60)  # one per second
+    bucket.take(60)
+
+    assert bucket.wait_time(1, now=bucket._updated_at) == pytest.approx(1)
+    assert bucket.wait_time(1, now=bucket._updated_at + 2) == 0
+    # Requests larger than the bucket only wait for a full bucket
+    assert bucket.wait_time(1000, now=bucket._updated_at) == pytest.approx(58)
+
+
+def test_headers_adjust_limits_within_configured_caps():
+    limiter = RateLimiter("gpt-4o", tokens_per_minute=10_000)
+
+    limiter.record_success(
+        {
+            "x-ratelimit-limit-requests": "5000",
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-limit-tokens": "800000",
+        }
+    )
+
+    assert limiter.requests.capacity == 5000
+    assert limiter.requests._level == 10
+    assert limiter.tokens.capacity == 10_000
+
+
+def test_rate_limited_pauses_and_slows_down():
+    limiter = RateLimiter("gpt-4o")
+
+    assert limiter.record_rate_limited({"retry-after": "2"}) == 2
+    assert limiter.requests.rate_factor == 0.5
+
+    limiter.record_success({})
+    assert limiter.requests.rate_factor == pytest.approx(0.55)
+
+
+def test_estimate_tokens():
+    params = {"messages": [{"role": "user", "content": "x" * 100}], "max_tokens": 50}
+    assert estimate_tokens(params) == 100
+
+
+def _rate_limit_error():
+    response = SimpleNamespace(
+        status_code=429, headers={"retry-after": "0"}, request=None
+    )
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_retries_rate_limited_requests(monkeypatch):
+    monkeypatch.setattr(llm_client, "get_openai_client", lambda: None)
+    monkeypatch.setattr(llm_client, "_usage", {})
+    limiter = RateLimiter("test-model")
+    monkeypatch.setattr(llm_client, "get_rate_limiter", lambda model: limiter)
+    calls = []
+
+    def send(client, params):
+        calls.append(params)
+        if len(calls) == 1:
+            raise _rate_limit_error()
+        usage = SimpleNamespace(total_tokens=10, prompt_tokens=8, completion_tokens=2)
+        completion = SimpleNamespace(usage=usage)
+        return SimpleNamespace(headers={}, parse=lambda: completion)
+
+    params = {"model": "test-model", "messages": []}
+    completion = _call_rate_limited(params, send, RetryPolicy(base_delay=0))
+
+    assert completion.usage.total_tokens == 10
+    assert len(calls) == 2
+    assert limiter.requests.rate_factor < 1
+
+
+def test_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(llm_client, "get_openai_client", lambda: None)
+    monkeypatch.setattr(
+        llm_client, "get_rate_limiter", lambda model: RateLimiter(model)
+    )
+
+    def send(client, params):
+        raise _rate_limit_error()
+
+    with pytest.raises(openai.RateLimitError):
+        _call_rate_limited(
+            {"model": "m", "messages": []}, send, RetryPolicy(max_attempts=2)
+        )
+
+
+def test_usage_records_cached_tokens(monkeypatch):
+    monkeypatch.setattr(llm_client, "_usage", {})
+    usage = SimpleNamespace(
+        prompt_tokens=2000,
+        completion_tokens=300,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+    )
+
+    llm_client._record_usage("gpt-4o", usage)
+    llm_client._record_usage("gpt-4o", usage)
+
+    assert llm_client.get_usage_stats()["gpt-4o"] == {
+        "requests": 2,
+        "prompt_tokens": 4000,
+        "cached_tokens": 3072,
+        "completion_tokens": 600,
+    }
+    assert "3072 cached, 77%" in llm_client.format_usage_summary()
+
+
+def test_stream_chat_completion_yields_content_and_records_usage(monkeypatch):
+    monkeypatch.setattr(llm_client, "_usage", {})
+    monkeypatch.setattr(
+        llm_client, "get_rate_limiter", lambda model: RateLimiter(model)
+    )
+    usage = SimpleNamespace(total_tokens=10, prompt_tokens=8, completion_tokens=2)
+
+    def chunk(content=None, usage=None):
+        choices = (
+            []
+            if content is None
+            else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+        )
+        return SimpleNamespace(choices=choices, usage=usage)
+
+    stream = [chunk("{"), chunk('"a": 1}'), chunk(usage=usage)]
+    sent = []
+
+    def create(**params):
+        sent.append(params)
+        return SimpleNamespace(headers={}, parse=lambda: iter(stream))
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(
+                with_raw_response=SimpleNamespace(create=create)
+            )
+        )
+    )
+    monkeypatch.setattr(llm_client, "get_openai_client", lambda: client)
+
+    content = list(llm_client.stream_chat_completion(model="gpt-4o", messages=[]))
+
+    assert content == ["{", '"a": 1}']
+    assert sent[0]["stream"] is True
+    assert llm_client.get_usage_stats()["gpt-4o"]["completion_tokens"] == 2
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from tutor.llm.json_stream import JsonFieldStream
+
+RESPONSE = json.dumps(
+    {
+        "next_line_zh": '你好，"欢迎"光临！😀',
+        "skipped": {"nested": ["a", "}"], "n": 1},
+        "count": 3,
+        "next_line_pinyin": "nǐ hǎo\\n",
+        "next_line_en": "Hello, welcome!",
+    },
+    ensure_ascii=True,
+)
+
+
+def _fields(chunks):
+    parser = JsonFieldStream()
+    fields = {}
+    for chunk in chunks:
+        for field, text in parser.feed(chunk):
+            fields[field] = fields.get(field, "") + text
+    return fields, parser
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, len(RESPONSE)])
+def test_fields_match_json_loads_for_any_chunking(size):
+    chunks = [RESPONSE[i : i + size] for i in range(0, len(RESPONSE), size)]
+
+    fields, parser = _fields(chunks)
+
+    expected = json.loads(RESPONSE)
+    assert fields == {
+        key: value for key, value in expected.items() if isinstance(value, str)
+    }
+    assert parser.done
+
+
+def test_reports_field_text_before_the_object_is_complete():
+    parser = JsonFieldStream()
+
+    assert parser.feed('{"next_line_zh": "你') == [("next_line_zh", "你")]
+    assert parser.feed('好", "next_line_pinyin": "n') == [
+        ("next_line_zh", "好"),
+        ("next_line_pinyin", "n"),
+    ]
+    assert not parser.done
@@ -1,9 +1,13 @@
+import pytest
+from pydantic import ValidationError
+
 from tutor.llm.models import (
     LanguageFlashcard,
     MandarinFlashcard,
     CantoneseFlashcard,
     MandarinRelatedWord,
     CantoneseRelatedWord,
+    get_flashcard_list_adapter,
 )
 
 
@@ -52,6 +56,29 @@ class TestLanguageFlashcard:
         assert flashcard.word == "你好"
         assert flashcard.jyutping == "nei5 hou2"
 
+    def test_from_anki_json_validates(self):
+        """Test that malformed notes are rejected."""
+        note = {
+            "noteId": "not a note id",
+            "modelName": "chinese-tutor-cantonese",
+            "fields": {
+                "Chinese": {"value": "你好"},
+                "Jyutping": {"value": "nei5 hou2"},
+                "English": {"value": "hello"},
+                "Sample Usage": {"value": "你好吗？"},
+                "Sample Usage (English)": {"value": "How are you?"},
+            },
+        }
+
+        with pytest.raises(ValidationError):
+            LanguageFlashcard.from_anki_json(note)
+
+    def test_flashcard_list_adapter_is_cached(self):
+        """Test that TypeAdapters are only built once per flashcard class."""
+        adapter = get_flashcard_list_adapter(MandarinFlashcard)
+        assert get_flashcard_list_adapter(MandarinFlashcard) is adapter
+        assert get_flashcard_list_adapter(CantoneseFlashcard) is not adapter
+
     def test_parse_related_words(self):
         """Test the _parse_related_words helper method."""
         # Sample related words text
@@ -224,3 +251,19 @@ class TestRelatedWords:
 
         # Test string representation
         assert str(word) == "學習 (hok6 zaap6) - to study [similar usage]"
+
+
+def test_flashcards_response_format_is_strict():
+    from tutor.llm.models import get_flashcards_response_format
+
+    response_format = get_flashcards_response_format(MandarinFlashcard)
+    schema = response_format["json_schema"]["schema"]
+    flashcard = schema["$defs"]["MandarinFlashcard"]
+
+    assert response_format["json_schema"]["strict"] is True
+    assert schema["required"] == ["flashcards"]
+    assert flashcard["additionalProperties"] is False
+    assert set(flashcard["required"]) == set(flashcard["properties"])
+    assert "anki_note_id" not in flashcard["properties"]
+    assert "default" not in flashcard["properties"]["frequency"]
+    assert flashcard["properties"]["frequency"]["type"] == ["null", "string"]
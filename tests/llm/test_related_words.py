@@ -0,0 +1,95 @@
+from tutor.llm.models import (
+    CantoneseFlashcard,
+    CantoneseRelatedWord,
+    LanguageFlashcard,
+    MandarinFlashcard,
+    MandarinRelatedWord,
+)
+from tutor.llm.related_words import RelatedWordsParser
+
+
+def test_parses_both_pronunciation_fields():
+    mandarin = RelatedWordsParser(MandarinRelatedWord, "pinyin").parse(
+        "• 教育 (jiào yù) - education [related field]"
+    )
+    cantonese = RelatedWordsParser(CantoneseRelatedWord, "jyutping").parse(
+        "教育 (gaau3 juk6) - education [related field]"
+    )
+
+    assert mandarin.related_words == [
+        MandarinRelatedWord(
+            word="教育",
+            pinyin="jiào yù",
+            english="education",
+            relationship="related field",
+        )
+    ]
+    assert cantonese.related_words[0].jyutping == "gaau3 juk6"
+    assert mandarin.malformed_lines == cantonese.malformed_lines == []
+
+
+def test_english_may_contain_parentheses_and_brackets():
+    result = RelatedWordsParser(MandarinRelatedWord, "pinyin").parse(
+        "- 好 (hǎo) - good (informal) [a.k.a. [fine]] [synonym]\n"
+        "行（xíng）- OK [casual variant]"
+    )
+
+    assert [(w.word, w.english, w.relationship) for w in result.related_words] == [
+        ("好", "good (informal) [a.k.a. [fine]]", "synonym"),
+        ("行", "OK", "casual variant"),
+    ]
+
+
+def test_reports_malformed_lines():
+    result = RelatedWordsParser(MandarinRelatedWord, "pinyin").parse(
+        "教育 (jiào yù) - education [related field]<br>"
+        "考试 - exam [common context]<br />"
+        "\n"
+        "学习 (xué xí) - to study"
+    )
+
+    assert [w.word for w in result.related_words] == ["教育"]
+    assert result.malformed_lines == [
+        "考试 - exam [common context]",
+        "学习 (xué xí) - to study",
+    ]
+
+
+def test_parse_many_matches_parse():
+    parser = RelatedWordsParser(MandarinRelatedWord, "pinyin")
+    texts = ["", "教育 (jiào yù) - education [related field]", "bad line"]
+
+    assert parser.parse_many(texts) == [parser.parse(text) for text in texts]
+
+
+def test_from_anki_json_batch_matches_single_notes():
+    def note(note_id, model_name, pronunciation_field, related_words):
+        return {
+            "noteId": note_id,
+            "modelName": model_name,
+            "fields": {
+                "Chinese": {"value": "你好"},
+                pronunciation_field: {"value": "pron"},
+                "English": {"value": "hello"},
+                "Sample Usage": {"value": "你好吗？"},
+                "Sample Usage (English)": {"value": "How are you?"},
+                "Related Words": {"value": related_words},
+            },
+        }
+
+    notes = [
+        note(1, "chinese-tutor-mandarin", "Pinyin", "您好 (nín hǎo) - hello [formal]"),
+        note(2, "chinese-tutor-cantonese", "Jyutping", "早晨 (zou2 san4) - hi [x]"),
+        note(3, "chinese-tutor-mandarin", "Pinyin", "not a related word"),
+    ]
+
+    flashcards = LanguageFlashcard.from_anki_json_batch(notes)
+
+    assert flashcards == [LanguageFlashcard.from_anki_json(n) for n in notes]
+    assert [type(f) for f in flashcards] == [
+        MandarinFlashcard,
+        CantoneseFlashcard,
+        MandarinFlashcard,
+    ]
+    assert flashcards[1].related_words[0].jyutping == "zou2 san4"
+    assert flashcards[2].related_words == []
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from tutor.llm import repair
+from tutor.llm.models import MandarinFlashcard, get_flashcard_list_adapter
+from tutor.llm.repair import get_invalid_fields, repair_flashcards_data
+
+VALID = {
+    "word": "你好",
+    "pinyin": "nǐ hǎo",
+    "english": "hello",
+    "sample_usage": "你好吗？",
+    "sample_usage_english": "How are you?",
+}
+
+
+def _validation_error(flashcards_data):
+    with pytest.raises(ValidationError) as error:
+        get_flashcard_list_adapter(MandarinFlashcard).validate_python(flashcards_data)
+    return error.value
+
+
+def _repair_records(path):
+    return [
+        json.loads(line)
+        for line in path.read_text().splitlines()
+        if json.loads(line)["type"] == "repair"
+    ]
+
+
+@pytest.fixture(autouse=True)
+def repair_prompt(monkeypatch):
+    monkeypatch.setattr(
+        repair, "get_repair_flashcard_fields_prompt", lambda item, errors: errors
+    )
+
+
+def test_only_invalid_fields_are_requested(telemetry_path):
+    invalid = {**VALID, "frequency": "sometimes"}
+    del invalid["pinyin"]
+    data = [VALID, invalid]
+    requests = []
+
+    def request_json(errors, response_format):
+        requests.append((errors, response_format))
+        return json.dumps({"frequency": "common", "pinyin": "nǐ hǎo"})
+
+    flashcards = repair_flashcards_data(
+        data, MandarinFlashcard, _validation_error(data), request_json, "gpt-4o"
+    )
+
+    assert [f.frequency for f in flashcards] == [None, "common"]
+    assert flashcards[1].pinyin == "nǐ hǎo"
+    assert len(requests) == 1
+    errors, response_format = requests[0]
+    assert len(errors) == 2
+    schema = response_format["json_schema"]["schema"]
+    assert sorted(schema["properties"]) == ["frequency", "pinyin"]
+    [record] = _repair_records(telemetry_path)
+    assert record["model"] == "gpt-4o"
+    assert (record["flashcards"], record["fields"], record["outcome"]) == (1, 2, "ok")
+
+
+def test_failed_repair_is_recorded(telemetry_path):
+    data = [{**VALID, "frequency": "sometimes"}]
+
+    with pytest.raises(ValidationError):
+        repair_flashcards_data(
+            data,
+            MandarinFlashcard,
+            _validation_error(data),
+            lambda errors, response_format: json.dumps({"frequency": "often"}),
+            "gpt-4o",
+        )
+    assert [r["outcome"] for r in _repair_records(telemetry_path)] == ["failed"]
+
+
+def test_errors_outside_fields_are_not_repairable():
+    error = _validation_error(["not a flashcard"])
+
+    assert get_invalid_fields(error, MandarinFlashcard) is None
@@ -0,0 +1,154 @@
+import json
+import time
+
+import pytest
+
+from tutor import llm_flashcards
+from tutor.cli_global_state import set_model, set_refresh_cache, set_use_cache
+from tutor.llm.models import MandarinFlashcard
+from tutor.llm.response_cache import LLMResponseCache, get_cache_key
+
+FLASHCARD_JSON = json.dumps(
+    {
+        "flashcards": [
+            {
+                "word": "你好",
+                "pinyin": "nǐ hǎo",
+                "english": "hello",
+                "sample_usage": "你好吗？",
+                "sample_usage_english": "How are you?",
+            }
+        ]
+    }
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with LLMResponseCache(db_path=tmp_path / "llm_cache.sqlite3") as cache:
+        yield cache
+
+
+def test_key_depends_on_model_prompt_and_seed():
+    key = get_cache_key("gpt-4o", "prompt", 69)
+
+    assert key == get_cache_key("gpt-4o", "prompt", 69)
+    assert key != get_cache_key("gpt-4", "prompt", 69)
+    assert key != get_cache_key("gpt-4o", "prompt2", 69)
+    assert key != get_cache_key("gpt-4o", "prompt", 70)
+
+
+def test_put_get_and_failures(cache):
+    assert cache.get("k") is None
+
+    cache.put("k", "gpt-4o", "{}")
+    assert cache.get("k") == "{}"
+
+    # A failure replaces the response, and a later response clears the failure
+    cache.put_failure("k", "ValidationError: bad")
+    assert cache.get("k") is None
+    assert cache.get_failure("k") == "ValidationError: bad"
+    cache.put("k", "gpt-4o", "[]")
+    assert cache.get_failure("k") is None
+
+
+def test_evicts_least_recently_used_over_size(tmp_path):
+    with LLMResponseCache(db_path=tmp_path / "c.sqlite3", max_bytes=10) as cache:
+        cache.put("a", "m", "aaaa")
+        time.sleep(0.01)
+        cache.put("b", "m", "bbbb")
+        time.sleep(0.01)
+        cache.get("a")
+        cache.put("c", "m", "cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "aaaa"
+        assert cache.get("c") == "cccc"
+
+
+def test_evicts_expired_entries(tmp_path):
+    db_path = tmp_path / "c.sqlite3"
+    with LLMResponseCache(db_path=db_path) as cache:
+        cache.put("a", "m", "aaaa")
+
+    with LLMResponseCache(db_path=db_path, max_age=-1) as cache:
+        assert len(cache) == 0
+
+
+@pytest.fixture
+def generate(cache, monkeypatch):
+    """generate_flashcards with a fake OpenAI, returning the prompts it sent."""
+    prompts = []
+    responses = {}
+
+    def fake_request(text, model, language):
+        prompts.append(text)
+        return responses.get(text, FLASHCARD_JSON)
+
+    monkeypatch.setattr(llm_flashcards, "_request_flashcards_json", fake_request)
+    monkeypatch.setattr(llm_flashcards, "get_response_cache", lambda: cache)
+    set_model("gpt-4o")
+    yield prompts, responses
+    set_use_cache(True)
+    set_refresh_cache(False)
+
+
+def test_generate_flashcards_reuses_cached_responses(generate):
+    prompts, _ = generate
+
+    first = llm_flashcards.generate_flashcards("你好")
+    second = llm_flashcards.generate_flashcards("你好")
+
+    assert prompts == ["你好"]
+    assert first == second
+    assert isinstance(second[0], MandarinFlashcard)
+
+    set_refresh_cache(True)
+    llm_flashcards.generate_flashcards("你好")
+    set_refresh_cache(False)
+    set_use_cache(False)
+    llm_flashcards.generate_flashcards("你好")
+    assert prompts == ["你好"] * 3
+
+
+def test_generate_flashcards_remembers_invalid_responses(generate, cache):
+    prompts, responses = generate
+    responses["bad"] = "not json"
+
+    assert llm_flashcards.generate_flashcards("bad") == []
+    assert llm_flashcards.generate_flashcards("bad") == []
+
+    assert prompts == ["bad"]
+    assert "JSONDecodeError" in cache.get_failure(
+        llm_flashcards.get_flashcards_cache_key("bad", "gpt-4o")
+    )
+
+
+def test_generate_flashcards_repairs_and_caches_invalid_fields(generate, monkeypatch):
+    prompts, responses = generate
+    flashcard = json.loads(FLASHCARD_JSON)["flashcards"][0]
+    del flashcard["pinyin"]
+    responses["partial"] = json.dumps({"flashcards": [flashcard]})
+    repairs = []
+
+    def fake_request_json(text, response_format, model):
+        repairs.append(text)
+        return json.dumps({"pinyin": "nǐ hǎo"})
+
+    monkeypatch.setattr(llm_flashcards, "_request_json", fake_request_json)
+
+    first = llm_flashcards.generate_flashcards("partial")
+    second = llm_flashcards.generate_flashcards("partial")
+
+    assert first[0].pinyin == "nǐ hǎo"
+    assert first == second
+    assert prompts == ["partial"]
+    assert len(repairs) == 1
+
+
+def test_generate_flashcards_records_cards_of_fresh_responses(generate, telemetry_path):
+    llm_flashcards.generate_flashcards("你好")
+    llm_flashcards.generate_flashcards("你好")
+
+    records = [json.loads(line) for line in telemetry_path.read_text().splitlines()]
+    assert [(r["type"], r["count"]) for r in records] == [("cards", 1)]
@@ -0,0 +1,147 @@
+import json
+import time
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from tutor.cli_global_state import set_command
+from tutor.llm import client as llm_client
+from tutor.llm import telemetry
+from tutor.llm.client import RateLimiter, _call_rate_limited
+from tutor.utils.retry import RetryPolicy
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _call(model="gpt-4o", latency=1.0, outcome="ok", attempts=1, **tokens):
+    return {
+        "type": telemetry.CALL,
+        "ts": time.time(),
+        "command": "fix-cards",
+        "model": model,
+        "latency": latency,
+        "attempts": attempts,
+        "outcome": outcome,
+        "prompt_tokens": tokens.get("prompt_tokens", 0),
+        "cached_tokens": tokens.get("cached_tokens", 0),
+        "completion_tokens": tokens.get("completion_tokens", 0),
+    }
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 21)]
+    assert telemetry.percentile(values, 50) == 10
+    assert telemetry.percentile(values, 95) == 19
+    assert telemetry.percentile([3.0], 95) == 3
+    assert telemetry.percentile([], 50) is None
+
+
+def test_estimate_cost():
+    # 1M uncached + 1M cached prompt tokens, 1M completion tokens
+    assert telemetry.estimate_cost(
+        "gpt-4o-2024-08-06", 2_000_000, 1_000_000, 1_000_000
+    ) == pytest.approx(2.50 + 1.25 + 10.00)
+    assert telemetry.estimate_cost("unknown-model", 1, 0, 1) is None
+
+
+def test_summarize_by_command_and_model():
+    records = [
+        _call(latency=1.0, prompt_tokens=900, completion_tokens=100),
+        _call(latency=3.0, prompt_tokens=900, completion_tokens=100, attempts=3),
+        _call(latency=9.0, outcome="APITimeoutError", attempts=5),
+        {
+            "type": telemetry.CARDS,
+            "command": "fix-cards",
+            "model": "gpt-4o",
+            "count": 4,
+        },
+        {
+            "type": telemetry.REPAIR,
+            "command": "fix-cards",
+            "model": "gpt-4o",
+            "flashcards": 1,
+            "fields": 2,
+            "outcome": "ok",
+        },
+        {
+            "type": telemetry.REPAIR,
+            "command": "fix-cards",
+            "model": "gpt-4o",
+            "flashcards": 0,
+            "fields": 0,
+            "outcome": "unrepairable",
+        },
+    ]
+
+    summary = telemetry.summarize(records)[("fix-cards", "gpt-4o")]
+
+    assert summary["calls"] == 3
+    assert summary["errors"] == 1
+    assert summary["retries"] == 6
+    assert summary["p50"] == 3.0
+    assert summary["p95"] == 9.0
+    assert summary["cards"] == 4
+    assert summary["tokens_per_card"] == 500
+    assert summary["repairs"] == 2
+    assert summary["failed_repairs"] == 1
+    assert summary["cost"] == pytest.approx((1800 * 2.50 + 200 * 10.00) / 1e6)
+
+
+def test_iter_records_filters_by_time_and_skips_torn_lines(telemetry_path):
+    old, new = _call(), _call()
+    old["ts"] -= 3600
+    telemetry_path.write_text(
+        json.dumps(old) + "\n" + json.dumps(new) + "\n" + '{"type": "ca'
+    )
+
+    assert list(telemetry.iter_records(since=time.time() - 60)) == [new]
+
+
+def test_calls_are_recorded_with_retries_and_failures(monkeypatch, telemetry_path):
+    monkeypatch.setattr(llm_client, "get_openai_client", lambda: None)
+    monkeypatch.setattr(llm_client, "_usage", {})
+    monkeypatch.setattr(
+        llm_client, "get_rate_limiter", lambda model: RateLimiter(model)
+    )
+    set_command("generate-flashcard-from-word")
+    attempts = []
+
+    def send(client, params):
+        attempts.append(params)
+        if len(attempts) == 1:
+            raise openai.APIConnectionError(request=None)
+        usage = SimpleNamespace(
+            total_tokens=10,
+            prompt_tokens=8,
+            completion_tokens=2,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=4),
+        )
+        return SimpleNamespace(headers={}, parse=lambda: SimpleNamespace(usage=usage))
+
+    def fail(client, params):
+        raise openai.BadRequestError(
+            "bad",
+            response=SimpleNamespace(status_code=400, headers={}, request=None),
+            body=None,
+        )
+
+    params = {"model": "gpt-4o", "messages": []}
+    _call_rate_limited(params, send, RetryPolicy(base_delay=0))
+    with pytest.raises(openai.BadRequestError):
+        _call_rate_limited(params, fail, RetryPolicy(base_delay=0))
+
+    ok, failed = _records(telemetry_path)
+    assert ok["command"] == "generate-flashcard-from-word"
+    assert ok["attempts"] == 2
+    assert ok["outcome"] == "ok"
+    assert (ok["prompt_tokens"], ok["cached_tokens"], ok["completion_tokens"]) == (
+        8,
+        4,
+        2,
+    )
+    assert failed["attempts"] == 1
+    assert failed["outcome"] == "BadRequestError"
+    assert failed["prompt_tokens"] == 0
@@ -0,0 +1,104 @@
+import time
+
+from tutor import llm_flashcards
+from tutor.llm.models import MandarinFlashcard
+
+
+def _flashcard(word):
+    return MandarinFlashcard(
+        word=word,
+        pinyin="pin yin",
+        english="english",
+        sample_usage=f"{word}。",
+        sample_usage_english="Sample.",
+    )
+
+
+def test_generate_flashcards_for_words_rerequests_missing_words(monkeypatch):
+    prompts = []
+
+    def fake_generate_flashcards(prompt, language="mandarin"):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            # Traditional characters are matched to the simplified word, and
+            # words that were not asked for are ignored
+            return [_flashcard("學習"), _flashcard("你好"), _flashcard("别的")]
+        return [_flashcard("再见")]
+
+    monkeypatch.setattr(llm_flashcards, "generate_flashcards", fake_generate_flashcards)
+
+    flashcards = llm_flashcards.generate_flashcards_for_words(
+        ["你好", "再见", "学习"], "mandarin"
+    )
+
+    assert list(flashcards) == ["学习", "你好", "再见"]
+    assert len(prompts) == 2
+    assert "3 words/phrases" in prompts[0]
+    assert "- 再见" in prompts[0]
+    assert "Word/phrase: 再见" in prompts[1]
+
+
+def test_generate_flashcards_for_one_word_uses_single_word_prompt(monkeypatch):
+    prompts = []
+
+    def fake_generate_flashcards(prompt, language="mandarin"):
+        prompts.append(prompt)
+        return []
+
+    monkeypatch.setattr(llm_flashcards, "generate_flashcards", fake_generate_flashcards)
+
+    assert llm_flashcards.generate_flashcards_for_words(["你好"]) == {}
+    assert len(prompts) == 1
+    assert "Word/phrase: 你好" in prompts[0]
+
+
+def test_audio_is_generated_while_confirming_and_dropped_if_skipped(monkeypatch):
+    events = []
+    confirms = []
+    added = []
+
+    def fake_tts(text, language):
+        events.append(f"tts {text}")
+        return f"{text}.wav"
+
+    def fake_confirm(message, **kwargs):
+        # Both audio requests of the card start while the prompt is showing
+        confirms.append(message)
+        card = "一二三"[len(confirms) - 1]
+        deadline = time.monotonic() + 1
+        while {f"tts {card}", f"tts {card}。"} - set(events):
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+        return len(confirms) != 2
+
+    class FakeClient:
+        def add_flashcards(self, deck, flashcards, audio_filepaths):
+            added.extend(zip([f.word for f in flashcards], audio_filepaths))
+            return []
+
+    monkeypatch.setattr(llm_flashcards, "text_to_speech", fake_tts)
+    monkeypatch.setattr(llm_flashcards.click, "confirm", fake_confirm)
+    monkeypatch.setattr(llm_flashcards, "AnkiConnectClient", FakeClient)
+    monkeypatch.setattr(llm_flashcards, "get_skip_confirm", lambda: False)
+
+    llm_flashcards.maybe_add_flashcards_to_deck(
+        [_flashcard("一"), _flashcard("二"), _flashcard("三")], "Deck"
+    )
+
+    assert added == [("一", ("一。.wav", "一.wav")), ("三", ("三。.wav", "三.wav"))]
+
+
+def test_generate_flashcards_uses_given_responses(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("the model should not be called")
+
+    monkeypatch.setattr(llm_flashcards, "_request_flashcards_json", fail)
+    monkeypatch.setattr(llm_flashcards, "get_use_cache", lambda: False)
+    monkeypatch.setattr(llm_flashcards, "get_model", lambda: "gpt-4o")
+    response = _flashcard("你好").model_dump_json(exclude={"anki_note_id"})
+
+    flashcards = llm_flashcards.generate_flashcards(
+        "prompt", responses={"prompt": f'{{"flashcards": [{response}]}}'}
+    )
+
+    assert [f.word for f in flashcards] == ["你好"]
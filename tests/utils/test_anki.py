@@ -1,22 +1,33 @@
 import pytest
 from unittest.mock import patch, Mock
 from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import json
+import threading
+
+import requests
 
 from tutor.utils.anki import (
     AnkiConnectClient,
+    AnkiConnectError,
+    AnkiConnectUnavailableError,
     AnkiAction,
     get_subdeck,
     get_default_anki_media_dir,
 )
-from tutor.llm.models import MandarinFlashcard
+from tutor.llm.models import MandarinFlashcard, MandarinRelatedWord
+from tutor.utils.retry import CircuitBreaker, RetryPolicy
 
 
 @pytest.fixture
 def anki_client():
     # Use a non-existent server address to prevent accidental connections to real Anki
     # This ensures tests won't modify production data
-    return AnkiConnectClient(address="http://non-existent-anki-test-server:9999")
+    return AnkiConnectClient(
+        address="http://non-existent-anki-test-server:9999",
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+        circuit_breaker=CircuitBreaker("Anki", failure_threshold=100),
+    )
 
 
 @pytest.fixture
@@ -39,7 +50,7 @@ def test_add_flashcard(anki_client, sample_flashcard):
         # Configure the mock to return the model name
         mock_check.return_value = "chinese-tutor-mandarin"
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             # Configure the mock responses for different API calls
             def mock_response_handler(*args, **kwargs):
                 data = json.loads(kwargs["data"])
@@ -104,119 +115,168 @@ def test_add_flashcard(anki_client, sample_flashcard):
         assert result == 1234567890
 
 
-def test_update_flashcard(anki_client, sample_flashcard):
-    with patch("requests.post") as mock_post:
-        # Configure the mock response for both calls
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"result": None, "error": None}
-        mock_post.return_value = mock_response
+def _multi_response(n):
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {
+        "result": [{"result": None, "error": None}] * n,
+        "error": None,
+    }
+    return mock_response
 
-        anki_client.update_flashcard(1234567890, sample_flashcard, "test_audio.wav")
 
-        # Verify both calls were made with correct data
-        assert mock_post.call_count == 2
-        calls = mock_post.call_args_list
+@pytest.fixture
+def current_fields():
+    return {
+        "Chinese": "你好",
+        "Pinyin": "ni hao",
+        "English": "hi",
+        "Sample Usage": "你好，我叫小明。",
+        "Sample Usage (English)": "Hello, my name is Xiao Ming.",
+        "Related Words": "",
+        "Sample Usage (Audio)": "[sound:old.wav]",
+        "Word (Audio)": "[sound:word.wav]",
+    }
+
+
+def _ok_update_response():
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"result": None, "error": None}
+    return mock_response
+
+
+def test_update_flashcard_sends_only_changed_fields(
+    anki_client, sample_flashcard, current_fields
+):
+    with patch("requests.Session.post") as mock_post:
+        mock_post.return_value = _ok_update_response()
+
+        assert anki_client.update_flashcard(
+            1234567890, sample_flashcard, current_fields=current_fields
+        )
 
-        # First call should be updateNoteFields without audio
-        first_call = calls[0][1]
-        first_data = json.loads(first_call["data"])
-        assert first_data["action"] == AnkiAction.UPDATE_NOTE_FIELDS.value
-        assert first_data["params"]["note"]["id"] == 1234567890
+        mock_post.assert_called_once()
+        data = json.loads(mock_post.call_args[1]["data"])
+        assert data["action"] == AnkiAction.UPDATE_NOTE_FIELDS.value
+        assert data["params"]["note"] == {
+            "id": 1234567890,
+            "fields": {"English": "hello"},
+        }
 
-        # Use the actual field names from the flashcard's ANKI_FIELD_NAMES mapping
-        word_field = sample_flashcard.ANKI_FIELD_NAMES["word"]
-        pinyin_field = sample_flashcard.ANKI_FIELD_NAMES["pinyin"]
 
-        assert first_data["params"]["note"]["fields"][word_field] == "你好"
-        assert first_data["params"]["note"]["fields"][pinyin_field] == "ni hao"
-        assert first_data["params"]["note"]["fields"]["Sample Usage (Audio)"] == ""
-        assert "audio" not in first_data["params"]["note"]
+def test_update_flashcard_unchanged_note_is_not_written(
+    anki_client, sample_flashcard, current_fields
+):
+    current_fields["English"] = "hello"
+    with patch("requests.Session.post") as mock_post:
+        # Audio whose field already plays the same file is not re-attached
+        assert not anki_client.update_flashcard(
+            1234567890,
+            sample_flashcard,
+            word_audio_filepath="/tmp/word.wav",
+            current_fields=current_fields,
+        )
 
-        # Second call should be updateNoteFields with audio
-        second_call = calls[1][1]
-        second_data = json.loads(second_call["data"])
-        assert second_data["action"] == AnkiAction.UPDATE_NOTE_FIELDS.value
-        assert second_data["params"]["note"]["id"] == 1234567890
+        mock_post.assert_not_called()
 
-        # Use the same field names as in the first call
-        assert second_data["params"]["note"]["fields"][word_field] == "你好"
-        assert second_data["params"]["note"]["fields"][pinyin_field] == "ni hao"
-        assert "audio" in second_data["params"]["note"]
-        assert second_data["params"]["note"]["audio"][0]["filename"] == "test_audio.wav"
 
+def test_update_flashcard_ignores_html_line_breaks(
+    anki_client, sample_flashcard, current_fields
+):
+    current_fields["English"] = "hello"
+    sample_flashcard.related_words = [
+        MandarinRelatedWord(
+            word=word, pinyin="pin yin", english="english", relationship="related"
+        )
+        for word in ["您好", "再见"]
+    ]
+    new_fields = anki_client._build_fields(sample_flashcard)
+    assert "\n" in new_fields["Related Words"]
+    current_fields["Related Words"] = new_fields["Related Words"].replace("\n", "<br>")
+    with patch("requests.Session.post") as mock_post:
+        assert not anki_client.update_flashcard(
+            1234567890, sample_flashcard, current_fields=current_fields
+        )
 
-def test_update_flashcard_with_audio(anki_client, sample_flashcard):
-    with patch("requests.post") as mock_post:
-        # Configure the mock response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"result": None, "error": None}
-        mock_post.return_value = mock_response
+        mock_post.assert_not_called()
 
-        anki_client.update_flashcard(1234567890, sample_flashcard, "test_audio.wav")
 
-        # Verify both calls were made with correct data
-        assert mock_post.call_count == 2
-        calls = mock_post.call_args_list
+def test_update_flashcard_with_audio(anki_client, sample_flashcard, current_fields):
+    current_fields["English"] = "hello"
+    with patch("requests.Session.post") as mock_post:
+        mock_post.return_value = _ok_update_response()
 
-        # First call should be updateNoteFields without audio
-        first_call = calls[0][1]
-        first_data = json.loads(first_call["data"])
-        assert first_data["action"] == AnkiAction.UPDATE_NOTE_FIELDS.value
-        assert first_data["params"]["note"]["id"] == 1234567890
+        anki_client.update_flashcard(
+            1234567890,
+            sample_flashcard,
+            sample_usage_audio_filepath="sample.wav",
+            word_audio_filepath="word.wav",
+            current_fields=current_fields,
+        )
 
-        # Use the actual field names from the flashcard's ANKI_FIELD_NAMES mapping
-        word_field = sample_flashcard.ANKI_FIELD_NAMES["word"]
-        pinyin_field = sample_flashcard.ANKI_FIELD_NAMES["pinyin"]
+        # Clearing the old audio and attaching the new is a single request
+        mock_post.assert_called_once()
+        note = json.loads(mock_post.call_args[1]["data"])["params"]["note"]
+        assert note["fields"] == {"Sample Usage (Audio)": ""}
+        assert note["audio"] == [
+            {
+                "path": "sample.wav",
+                "filename": "sample.wav",
+                "fields": ["Sample Usage (Audio)"],
+            }
+        ]
 
-        assert first_data["params"]["note"]["fields"][word_field] == "你好"
-        assert first_data["params"]["note"]["fields"][pinyin_field] == "ni hao"
-        assert first_data["params"]["note"]["fields"]["Sample Usage (Audio)"] == ""
-        assert "audio" not in first_data["params"]["note"]
 
-        # Second call should be updateNoteFields with audio
-        second_call = calls[1][1]
-        second_data = json.loads(second_call["data"])
-        assert second_data["action"] == AnkiAction.UPDATE_NOTE_FIELDS.value
-        assert second_data["params"]["note"]["id"] == 1234567890
-        assert second_data["params"]["note"]["fields"]["Chinese"] == "你好"
-        assert second_data["params"]["note"]["fields"]["Pinyin"] == "ni hao"
-        assert "audio" in second_data["params"]["note"]
-        assert second_data["params"]["note"]["audio"][0]["filename"] == "test_audio.wav"
+def test_update_flashcard_fetches_current_fields(anki_client, sample_flashcard):
+    with patch("requests.Session.post") as mock_post:
+        notes_info = Mock()
+        notes_info.status_code = 200
+        notes_info.json.return_value = {
+            "result": [
+                {
+                    "noteId": 1234567890,
+                    "fields": {"Chinese": {"value": "你好"}},
+                }
+            ],
+            "error": None,
+        }
+        mock_post.side_effect = [notes_info, _ok_update_response()]
 
+        anki_client.update_flashcard(1234567890, sample_flashcard)
 
-def test_update_flashcard_without_audio(anki_client, sample_flashcard):
-    with patch("requests.post") as mock_post:
-        # Configure the mock response
+        assert mock_post.call_count == 2
+        actions = [json.loads(c[1]["data"])["action"] for c in mock_post.call_args_list]
+        assert actions == [
+            AnkiAction.NOTES_INFO.value,
+            AnkiAction.UPDATE_NOTE_FIELDS.value,
+        ]
+        fields = json.loads(mock_post.call_args[1]["data"])["params"]["note"]["fields"]
+        assert "Chinese" not in fields
+        assert fields["Pinyin"] == "ni hao"
+
+
+def test_update_flashcard_error(anki_client, sample_flashcard, current_fields):
+    with patch("requests.Session.post") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"result": None, "error": None}
+        mock_response.json.return_value = {
+            "result": None,
+            "error": "note was not found",
+        }
         mock_post.return_value = mock_response
 
-        anki_client.update_flashcard(1234567890, sample_flashcard)
-
-        # Verify only one call was made
-        mock_post.assert_called_once()
-        call = mock_post.call_args[1]
-        data = json.loads(call["data"])
-
-        # Verify the call data
-        assert data["action"] == AnkiAction.UPDATE_NOTE_FIELDS.value
-        assert data["params"]["note"]["id"] == 1234567890
-
-        # Use the actual field names from the flashcard's ANKI_FIELD_NAMES mapping
-        word_field = sample_flashcard.ANKI_FIELD_NAMES["word"]
-        pinyin_field = sample_flashcard.ANKI_FIELD_NAMES["pinyin"]
+        with pytest.raises(AnkiConnectError) as exc_info:
+            anki_client.update_flashcard(
+                1234567890, sample_flashcard, current_fields=current_fields
+            )
 
-        assert data["params"]["note"]["fields"][word_field] == "你好"
-        assert data["params"]["note"]["fields"][pinyin_field] == "ni hao"
-        assert "Sample Usage (Audio)" not in data["params"]["note"]["fields"]
-        assert "audio" not in data["params"]["note"]
+        assert exc_info.value.action == AnkiAction.UPDATE_NOTE_FIELDS.value
+        assert "Failed to update flashcard" in str(exc_info.value)
 
 
 def test_find_notes(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         # Configure the mock responses
         find_response = Mock()
         find_response.status_code = 200
@@ -253,7 +313,7 @@ def test_find_notes(anki_client):
 
 
 def test_anki_connection_error(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         mock_post.side_effect = ConnectionError("Failed to connect to Anki")
 
         with pytest.raises(Exception) as exc_info:
@@ -263,7 +323,7 @@ def test_anki_connection_error(anki_client):
 
 
 def test_anki_error_response(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         # Configure the mock response
         mock_response = Mock()
         mock_response.status_code = 200
@@ -277,7 +337,7 @@ def test_anki_error_response(anki_client):
 
 
 def test_list_decks(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
@@ -293,7 +353,7 @@ def test_list_decks(anki_client):
 
 
 def test_add_deck(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"result": 1234567890, "error": None}
@@ -309,7 +369,7 @@ def test_add_deck(anki_client):
 
 
 def test_maybe_add_deck_existing(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
@@ -325,7 +385,7 @@ def test_maybe_add_deck_existing(anki_client):
 
 
 def test_maybe_add_deck_new(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         list_response = Mock()
         list_response.status_code = 200
         list_response.json.return_value = {"result": ["Default"], "error": None}
@@ -375,7 +435,7 @@ def test_get_default_anki_media_dir_unsupported():
 
 
 def test_update_model_styling(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"result": None, "error": None}
@@ -395,7 +455,7 @@ def test_update_model_styling(anki_client):
 
 
 def test_update_model_templates(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"result": None, "error": None}
@@ -420,7 +480,7 @@ def test_update_model_templates(anki_client):
 
 
 def test_update_card_styling_and_templates(anki_client):
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         # Configure the mock responses for both API calls
         mock_response = Mock()
         mock_response.status_code = 200
@@ -459,3 +519,374 @@ def test_update_card_styling_and_templates(anki_client):
         assert second_data["action"] == AnkiAction.UPDATE_MODEL_TEMPLATES.value
         assert second_data["params"]["model"]["name"] == model_name
         assert second_data["params"]["model"]["templates"] == templates
+
+
+@pytest.fixture
+def keep_alive_server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            body = json.dumps({"result": ["Default"], "error": None}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_send_request_reuses_pooled_connection(keep_alive_server):
+    with AnkiConnectClient(address=keep_alive_server) as client:
+        for _ in range(5):
+            assert client.list_decks() == ["Default"]
+
+        stats = client.connection_stats()
+
+    assert stats["requests"] == 5
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 4
+
+
+def test_send_request_timeouts(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"result": [], "error": None}
+        mock_post.return_value = mock_response
+
+        anki_client.send_request(AnkiAction.DECK_NAMES)
+        assert mock_post.call_args[1]["timeout"] == anki_client.timeout
+
+        anki_client.send_request(AnkiAction.DECK_NAMES, timeout=(1, 5))
+        assert mock_post.call_args[1]["timeout"] == (1, 5)
+
+
+def test_send_request_timeout_error(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = requests.exceptions.ReadTimeout()
+
+        with pytest.raises(AnkiConnectError) as exc_info:
+            anki_client.send_request(AnkiAction.DECK_NAMES)
+
+        assert "Timed out" in str(exc_info.value)
+
+
+def test_batch_sends_one_multi_request(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "result": [
+                {"result": [1], "error": None},
+                {"result": None, "error": "invalid query"},
+                {"result": [2, 3], "error": None},
+            ],
+            "error": None,
+        }
+        mock_post.return_value = mock_response
+
+        with anki_client.batch() as batch:
+            first = batch.add(AnkiAction.FIND_NOTES, {"query": "a"})
+            second = batch.add(AnkiAction.FIND_NOTES, {"query": "b"})
+            third = batch.add(AnkiAction.FIND_NOTES, {"query": "c"})
+            assert not first.done
+
+        mock_post.assert_called_once()
+        data = json.loads(mock_post.call_args[1]["data"])
+        assert data["action"] == AnkiAction.MULTI.value
+        assert [a["params"]["query"] for a in data["params"]["actions"]] == [
+            "a",
+            "b",
+            "c",
+        ]
+
+        # Each action gets its own result or error
+        assert first.result() == [1]
+        with pytest.raises(AnkiConnectError) as exc_info:
+            second.result()
+        assert "invalid query" in str(exc_info.value)
+        assert third.result() == [2, 3]
+
+
+def test_batch_auto_flushes_at_max_size(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_post.return_value = _multi_response(2)
+
+        batch = anki_client.batch(max_size=2)
+        for query in ["a", "b", "c", "d"]:
+            batch.add(AnkiAction.FIND_NOTES, {"query": query})
+
+        assert mock_post.call_count == 2
+        assert len(batch) == 0
+        assert len(batch.flush()) == 4
+        assert mock_post.call_count == 2
+
+
+def _note_info(note_id):
+    return {
+        "noteId": note_id,
+        "modelName": "chinese-tutor-mandarin",
+        "fields": {
+            "Chinese": {"value": f"词{note_id}"},
+            "Pinyin": {"value": "cí"},
+            "English": {"value": "word"},
+            "Sample Usage": {"value": "这是一个词。"},
+            "Sample Usage (English)": {"value": "This is a word."},
+        },
+    }
+
+
+def _notes_handler(note_ids):
+    def handler(*args, **kwargs):
+        data = json.loads(kwargs["data"])
+        mock_response = Mock()
+        mock_response.status_code = 200
+        if data["action"] == "findNotes":
+            result = note_ids
+        else:
+            result = [_note_info(note_id) for note_id in data["params"]["notes"]]
+        mock_response.json.return_value = {"result": result, "error": None}
+        return mock_response
+
+    return handler
+
+
+def test_iter_notes_applies_limit_before_fetching(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = _notes_handler(list(range(1, 1001)))
+
+        notes = list(anki_client.iter_notes("deck:Test", chunk_size=4, limit=10))
+
+        assert [n.anki_note_id for n in notes] == list(range(1, 11))
+        requested = [
+            json.loads(call[1]["data"])["params"]["notes"]
+            for call in mock_post.call_args_list[1:]
+        ]
+        assert requested == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+
+def test_iter_notes_fetches_lazily(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = _notes_handler([1, 2, 3, 4, 5])
+
+        notes = anki_client.iter_notes("deck:Test", chunk_size=2)
+        first = next(notes)
+
+        assert first.word == "词1"
+        # One findNotes request plus only the first notesInfo chunk
+        assert mock_post.call_count == 2
+
+
+def _bulk_add_handler(can_add, add_result, actions_seen):
+    def handler(*args, **kwargs):
+        data = json.loads(kwargs["data"])
+        actions_seen.append(data["action"])
+        mock_response = Mock()
+        mock_response.status_code = 200
+        if data["action"] == "canAddNotes":
+            body = {"result": can_add, "error": None}
+        elif data["action"] == "addNotes":
+            body = add_result(data["params"]["notes"])
+        elif data["action"] == "multi":
+            body = {
+                "result": [
+                    {"result": 500 + i, "error": None}
+                    if a["params"]["note"]["fields"]["Chinese"] != "坏"
+                    else {"result": None, "error": "cannot create note"}
+                    for i, a in enumerate(data["params"]["actions"])
+                ],
+                "error": None,
+            }
+        else:
+            body = {"result": None, "error": None}
+        mock_response.json.return_value = body
+        return mock_response
+
+    return handler
+
+
+@pytest.fixture
+def bulk_flashcards(sample_flashcard):
+    return [
+        sample_flashcard.model_copy(update={"word": word})
+        for word in ["你好", "再见", "坏"]
+    ]
+
+
+def test_add_flashcards_bulk(anki_client, bulk_flashcards):
+    actions = []
+    with (
+        patch(
+            "tutor.commands.setup_anki.NoteTypeManager.check_note_type_exists",
+            return_value="chinese-tutor-mandarin",
+        ),
+        patch("requests.Session.post") as mock_post,
+    ):
+        mock_post.side_effect = _bulk_add_handler(
+            [True, False, True],
+            lambda notes: {"result": [101, None], "error": None},
+            actions,
+        )
+
+        results = anki_client.add_flashcards(
+            "Test::Deck",
+            bulk_flashcards,
+            [("s1.wav", "w1.wav"), (None, None), ("s3.wav", None)],
+        )
+
+        add_notes = json.loads(mock_post.call_args_list[1][1]["data"])
+
+    assert actions == ["canAddNotes", "addNotes"]
+    assert [n["fields"]["Chinese"] for n in add_notes["params"]["notes"]] == [
+        "你好",
+        "坏",
+    ]
+    assert [a["filename"] for a in add_notes["params"]["notes"][0]["audio"]] == [
+        "s1.wav",
+        "w1.wav",
+    ]
+
+    assert [r.note_id for r in results] == [101, None, None]
+    assert results[0].added
+    assert "duplicate" in results[1].error
+    assert results[2].error
+
+
+def test_add_flashcards_falls_back_to_per_note_errors(anki_client, bulk_flashcards):
+    actions = []
+    with (
+        patch(
+            "tutor.commands.setup_anki.NoteTypeManager.check_note_type_exists",
+            return_value="chinese-tutor-mandarin",
+        ),
+        patch("requests.Session.post") as mock_post,
+    ):
+        mock_post.side_effect = _bulk_add_handler(
+            [True, True, True],
+            lambda notes: {"result": None, "error": ["cannot create note"]},
+            actions,
+        )
+
+        results = anki_client.add_flashcards("Test::Deck", bulk_flashcards)
+
+    assert actions == ["canAddNotes", "addNotes", "multi"]
+    assert [r.note_id for r in results] == [500, 501, None]
+    assert results[2].error == "cannot create note"
+
+
+def test_add_flashcards_does_not_re_add_notes_after_a_timeout(
+    anki_client, bulk_flashcards
+):
+    actions = []
+    handler = _bulk_add_handler([True, True, True], None, actions)
+
+    def post(*args, **kwargs):
+        if json.loads(kwargs["data"])["action"] == "addNotes":
+            actions.append("addNotes")
+            raise requests.exceptions.ReadTimeout()
+        return handler(*args, **kwargs)
+
+    with (
+        patch(
+            "tutor.commands.setup_anki.NoteTypeManager.check_note_type_exists",
+            return_value="chinese-tutor-mandarin",
+        ),
+        patch("requests.Session.post", side_effect=post),
+    ):
+        with pytest.raises(AnkiConnectUnavailableError, match="may have been added"):
+            anki_client.add_flashcards("Test::Deck", bulk_flashcards)
+
+    assert actions == ["canAddNotes", "addNotes"]
+
+
+def _ok_response(result):
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = {"result": result, "error": None}
+    return response
+
+
+def test_send_request_retries_unavailable_anki(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = [
+            requests.exceptions.ConnectionError(),
+            requests.exceptions.ReadTimeout(),
+            _ok_response(["Default"]),
+        ]
+
+        assert anki_client.send_request(AnkiAction.DECK_NAMES) == ["Default"]
+        assert mock_post.call_count == 3
+
+
+def test_send_request_does_not_retry_anki_errors(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"result": None, "error": "bad query"}
+        mock_post.return_value = mock_response
+
+        with pytest.raises(AnkiConnectError, match="bad query"):
+            anki_client.send_request(AnkiAction.FIND_NOTES, {"query": "("})
+        assert mock_post.call_count == 1
+
+
+def test_send_request_does_not_repeat_non_idempotent_actions(anki_client):
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = requests.exceptions.ReadTimeout()
+
+        with pytest.raises(AnkiConnectUnavailableError):
+            anki_client.send_request(AnkiAction.ADD_NOTES, {"notes": []})
+        assert mock_post.call_count == 1
+
+
+def test_add_note_retry_finds_note_added_by_failed_attempt(anki_client):
+    note = {
+        "deckName": "Chinese",
+        "modelName": "chinese-tutor-mandarin",
+        "fields": {"Chinese": "你好"},
+    }
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = [
+            requests.exceptions.ReadTimeout(),
+            _ok_response([1234]),
+        ]
+
+        assert anki_client.send_request(AnkiAction.ADD_NOTE, {"note": note}) == 1234
+
+        retry_payload = json.loads(mock_post.call_args_list[1].kwargs["data"])
+        assert retry_payload["action"] == "findNotes"
+        assert retry_payload["params"]["query"] == (
+            '"deck:Chinese" "note:chinese-tutor-mandarin" "Chinese:你好"'
+        )
+
+
+def test_circuit_breaker_stops_retries_while_anki_is_down():
+    breaker = CircuitBreaker("Anki", failure_threshold=2, reset_timeout=60, max_wait=0)
+    client = AnkiConnectClient(
+        address="http://non-existent-anki-test-server:9999",
+        retry_policy=RetryPolicy(max_attempts=5, base_delay=0),
+        circuit_breaker=breaker,
+    )
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = requests.exceptions.ConnectionError()
+
+        with pytest.raises(AnkiConnectUnavailableError, match="unresponsive"):
+            client.send_request(AnkiAction.DECK_NAMES)
+        assert mock_post.call_count == 2
+        assert breaker.is_open
+
+        # Later callers give up without hitting the network
+        with pytest.raises(AnkiConnectUnavailableError):
+            client.send_request(AnkiAction.DECK_NAMES)
+        assert mock_post.call_count == 2
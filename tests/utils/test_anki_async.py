@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from tutor.utils.anki_async import AsyncAnkiConnectClient
+
+
+class SlowClient:
+    """Sync client stand-in that records how many calls overlap."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_seen = 0
+        self._lock = threading.Lock()
+        self.close = Mock()
+
+    def list_decks(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_seen = max(self.max_seen, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return ["Default"]
+
+    def get_note_fields(self, note_id):
+        return {"Chinese": str(note_id)}
+
+
+def test_limits_in_flight_requests():
+    client = SlowClient()
+
+    async def run():
+        async with AsyncAnkiConnectClient(max_in_flight=2, client=client) as anki:
+            return await asyncio.gather(*(anki.list_decks() for _ in range(8)))
+
+    results = asyncio.run(run())
+
+    assert results == [["Default"]] * 8
+    assert client.max_seen == 2
+    client.close.assert_called_once()
+
+
+def test_forwards_arguments():
+    async def run():
+        anki = AsyncAnkiConnectClient(client=SlowClient())
+        return await anki.get_note_fields(42)
+
+    assert asyncio.run(run()) == {"Chinese": "42"}
+
+
+def test_rejects_invalid_limit():
+    with pytest.raises(ValueError):
+        AsyncAnkiConnectClient(max_in_flight=0, client=SlowClient())
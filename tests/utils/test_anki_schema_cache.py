@@ -0,0 +1,86 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from tutor.commands.setup_anki import NoteTypeManager
+from tutor.utils.anki import AnkiConnectClient, AnkiConnectError
+from tutor.utils.anki_schema_cache import NoteTypeCache
+
+
+@pytest.fixture
+def anki_client():
+    return AnkiConnectClient(address="http://non-existent-anki-test-server:9999")
+
+
+@pytest.fixture
+def mock_post():
+    def handler(*args, **kwargs):
+        action = json.loads(kwargs["data"])["action"]
+        mock_response = Mock()
+        mock_response.status_code = 200
+        if action == "modelNames":
+            result = ["Basic", "chinese-tutor-mandarin"]
+        else:
+            result = None
+        mock_response.json.return_value = {"result": result, "error": None}
+        return mock_response
+
+    with patch("requests.Session.post") as mock_post:
+        mock_post.side_effect = handler
+        yield mock_post
+
+
+def _actions(mock_post):
+    return [json.loads(c[1]["data"])["action"] for c in mock_post.call_args_list]
+
+
+def test_model_names_are_cached(anki_client, mock_post, tmp_path):
+    anki_client._note_types = NoteTypeCache(anki_client, tmp_path / "cache.json")
+    manager = NoteTypeManager(anki_client)
+
+    for _ in range(500):
+        assert manager.check_note_type_exists("mandarin") == "chinese-tutor-mandarin"
+
+    assert _actions(mock_post) == ["modelNames"]
+
+
+def test_cache_persists_between_instances(anki_client, mock_post, tmp_path):
+    cache_path = tmp_path / "cache.json"
+    NoteTypeCache(anki_client, cache_path).model_names()
+
+    cache = NoteTypeCache(anki_client, cache_path)
+    assert cache.model_names() == ["Basic", "chinese-tutor-mandarin"]
+    assert _actions(mock_post) == ["modelNames"]
+
+
+def test_cache_expires_after_ttl(anki_client, mock_post, tmp_path):
+    cache = NoteTypeCache(anki_client, tmp_path / "cache.json", ttl=60)
+    with patch("time.time", return_value=1000):
+        cache.model_names()
+    with patch("time.time", return_value=1030):
+        cache.model_names()
+    with patch("time.time", return_value=1100):
+        cache.model_names()
+
+    assert _actions(mock_post) == ["modelNames", "modelNames"]
+
+
+def test_missing_model_refreshes_once(anki_client, mock_post, tmp_path):
+    anki_client._note_types = NoteTypeCache(anki_client, tmp_path / "cache.json")
+    manager = NoteTypeManager(anki_client)
+
+    with pytest.raises(AnkiConnectError):
+        manager.check_note_type_exists("cantonese")
+
+    assert _actions(mock_post) == ["modelNames", "modelNames"]
+
+
+def test_invalidate(anki_client, mock_post, tmp_path):
+    cache = NoteTypeCache(anki_client, tmp_path / "cache.json")
+    cache.model_names()
+
+    cache.invalidate()
+    cache.model_names()
+
+    assert _actions(mock_post) == ["modelNames"] * 2
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tutor.utils import azure
+from tutor.utils.media import MediaIndex, get_audio_filename
+
+
+class FakeSynthesizer:
+    """Writes partial audio to the output file, then reports `reason`."""
+
+    reason = None
+
+    def __init__(self, speech_config, audio_config):
+        self.filename = audio_config.filename
+
+    def speak_text_async(self, text):
+        with open(self.filename, "wb") as f:
+            f.write(b"RIFF")
+        result = SimpleNamespace(
+            reason=self.reason,
+            cancellation_details=SimpleNamespace(
+                reason=azure.speechsdk.CancellationReason.Error,
+                error_details="connection lost",
+            ),
+        )
+        return SimpleNamespace(get=lambda: result)
+
+
+@pytest.fixture
+def media_index(tmp_path, monkeypatch):
+    index = MediaIndex(tmp_path)
+    monkeypatch.setattr(azure, "get_media_index", lambda: index)
+    monkeypatch.setattr(
+        azure.speechsdk, "SpeechConfig", lambda *args: SimpleNamespace()
+    )
+    monkeypatch.setattr(
+        azure.speechsdk.audio,
+        "AudioOutputConfig",
+        lambda filename: SimpleNamespace(filename=filename),
+    )
+    monkeypatch.setattr(azure.speechsdk, "SpeechSynthesizer", FakeSynthesizer)
+    return index
+
+
+def test_completed_audio_is_moved_into_place(media_index, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        FakeSynthesizer,
+        "reason",
+        azure.speechsdk.ResultReason.SynthesizingAudioCompleted,
+    )
+
+    filename = azure.text_to_speech("你好", "mandarin")
+
+    assert filename == str(tmp_path / get_audio_filename("你好"))
+    assert [path.name for path in tmp_path.iterdir()] == [get_audio_filename("你好")]
+    assert get_audio_filename("你好") in media_index
+
+
+def test_canceled_audio_is_not_kept(media_index, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        FakeSynthesizer, "reason", azure.speechsdk.ResultReason.Canceled
+    )
+
+    with pytest.raises(RuntimeError, match="connection lost"):
+        azure.text_to_speech("你好", "mandarin")
+
+    assert list(tmp_path.iterdir()) == []
+    assert get_audio_filename("你好") not in media_index
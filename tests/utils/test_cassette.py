@@ -0,0 +1,141 @@
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from tutor.llm import client as llm_client
+from tutor.utils.anki import AnkiConnectError
+from tutor.utils.cassette import (
+    RECORD,
+    REPLAY,
+    Cassette,
+    CassetteMissError,
+    LatencyModel,
+    set_cassette,
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    yield tmp_path / "run.jsonl"
+    set_cassette(None)
+
+
+def test_latency_model():
+    assert LatencyModel.parse("recorded").duration("openai", 1.5) == 1.5
+    assert LatencyModel.parse("none").duration("openai", 1.5) == 0
+    assert LatencyModel.parse("0.25").duration("tts", 1.5) == 0.25
+    latency = LatencyModel.parse("openai=2, anki=0.01")
+    assert latency.duration("openai", 9) == 2
+    assert latency.duration("tts", 9) == 0
+    with pytest.raises(ValueError):
+        LatencyModel.parse("fast")
+
+
+def test_replays_results_errors_and_recorded_durations(path):
+    recorder = Cassette(path, RECORD)
+
+    def slow():
+        time.sleep(0.05)
+        return [1, 2]
+
+    def fail():
+        raise AnkiConnectError("collection is not available", "findNotes")
+
+    assert recorder.call("anki", "findNotes", {"q": 1}, slow) == [1, 2]
+    with pytest.raises(AnkiConnectError):
+        recorder.call("anki", "findNotes", {"q": 2}, fail)
+
+    player = Cassette(path, REPLAY)
+    not_called = pytest.fail
+
+    # Replayed in a different order, at the recorded speed
+    with pytest.raises(AnkiConnectError) as e:
+        player.call("anki", "findNotes", {"q": 2}, not_called)
+    assert e.value.action == "findNotes"
+    assert "collection is not available" in str(e.value)
+    started_at = time.monotonic()
+    assert player.call("anki", "findNotes", {"q": 1}, not_called) == [1, 2]
+    assert time.monotonic() - started_at >= 0.05
+
+
+def test_unrecorded_requests_are_misses(path):
+    recorder = Cassette(path, RECORD)
+    recorder.call("tts", "mandarin", {"text": "你好"}, lambda: "/a/你好.wav")
+
+    player = Cassette(path, REPLAY, LatencyModel.parse("none"))
+
+    # Not answered with the recording of another request to the same name
+    with pytest.raises(CassetteMissError):
+        player.call("tts", "mandarin", {"text": "再见"}, None)
+    with pytest.raises(CassetteMissError):
+        player.call("tts", "cantonese", {"text": "你好"}, None)
+    assert player.call("tts", "mandarin", {"text": "你好"}, None) == "/a/你好.wav"
+    # Repeats of a recorded request get its last answer again
+    assert player.call("tts", "mandarin", {"text": "你好"}, None) == "/a/你好.wav"
+
+
+def test_streams_are_replayed_chunk_by_chunk(path):
+    recorder = Cassette(path, RECORD)
+    assert list(recorder.stream("openai", "m", {}, lambda: iter("abc"))) == [
+        "a",
+        "b",
+        "c",
+    ]
+
+    player = Cassette(path, REPLAY, LatencyModel.parse("openai=0.06"))
+    started_at = time.monotonic()
+    stream = player.stream("openai", "m", {}, None)
+
+    assert next(stream) == "a"
+    assert time.monotonic() - started_at >= 0.02
+    assert list(stream) == ["b", "c"]
+    assert time.monotonic() - started_at >= 0.06
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def _completion(content, **message):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content, **message},
+            }
+        ],
+    }
+
+
+def test_openai_completions_replay_as_sdk_objects(path, monkeypatch):
+    from openai.types.chat import ChatCompletion, ParsedChatCompletion
+
+    def fake_call(params, send):
+        if "response_format" in params:
+            return ParsedChatCompletion[Answer].model_validate(
+                _completion('{"text": "parsed"}', parsed={"text": "parsed"})
+            )
+        return ChatCompletion.model_validate(_completion("hello"))
+
+    monkeypatch.setattr(llm_client, "_call_rate_limited", fake_call)
+    set_cassette(Cassette(path, RECORD))
+    llm_client.chat_completion(model="gpt-4o", messages=[])
+    llm_client.parse_chat_completion(
+        model="gpt-4o", messages=[], response_format=Answer
+    )
+
+    monkeypatch.setattr(llm_client, "_call_rate_limited", pytest.fail)
+    set_cassette(Cassette(path, REPLAY, LatencyModel.parse("none")))
+    completion = llm_client.chat_completion(model="gpt-4o", messages=[])
+    parsed = llm_client.parse_chat_completion(
+        model="gpt-4o", messages=[], response_format=Answer
+    )
+
+    assert completion.choices[0].message.content == "hello"
+    assert parsed.choices[0].message.parsed == Answer(text="parsed")
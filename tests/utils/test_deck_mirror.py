@@ -0,0 +1,170 @@
+import re
+
+import pytest
+
+from tutor.utils.anki import AnkiConnectError
+from tutor.utils.deck_mirror import DeckMirror
+
+
+def _note_info(note_id, word, english="word"):
+    return {
+        "noteId": note_id,
+        "modelName": "chinese-tutor-mandarin",
+        "fields": {
+            "Chinese": {"value": word},
+            "Pinyin": {"value": "pin yin"},
+            "English": {"value": english},
+            "Sample Usage": {"value": f"{word}。"},
+            "Sample Usage (English)": {"value": "Sample."},
+        },
+    }
+
+
+class FakeAnkiClient:
+    """Minimal stand-in for the AnkiConnectClient methods the mirror uses."""
+
+    def __init__(self):
+        self.notes = {}
+        self.mod_times = {}
+        self.decks = {}
+        self.fetched_ids = []
+        self.queries = []
+        self.available = True
+
+    def set_note(self, note_id, word, mod, english="word", deck="Chinese"):
+        self.notes[note_id] = _note_info(note_id, word, english)
+        self.mod_times[note_id] = mod
+        self.decks[note_id] = deck
+
+    def find_note_ids(self, query):
+        if not self.available:
+            raise AnkiConnectError("Failed to connect to Anki")
+        self.queries.append(query)
+        deck = re.search(r'deck:"?([^"]+)"', query).group(1)
+        _, _, word = query.partition("Chinese:")
+        return sorted(
+            nid
+            for nid, note in self.notes.items()
+            if self.decks[nid] == deck
+            and (not word or note["fields"]["Chinese"]["value"] == word)
+        )
+
+    def get_notes_mod_times(self, note_ids):
+        return {nid: self.mod_times[nid] for nid in note_ids}
+
+    def iter_note_info_chunks(self, note_ids, chunk_size=200):
+        self.fetched_ids.extend(note_ids)
+        yield [self.notes[nid] for nid in note_ids]
+
+
+@pytest.fixture
+def client():
+    client = FakeAnkiClient()
+    client.set_note(1, "你好", mod=100)
+    client.set_note(2, "你们", mod=100)
+    client.set_note(3, "学习", mod=100)
+    return client
+
+
+@pytest.fixture
+def mirror(client, tmp_path):
+    with DeckMirror(client, db_path=tmp_path / "mirror.sqlite3") as mirror:
+        yield mirror
+
+
+def test_initial_sync_fetches_all_notes(mirror, client):
+    stats = mirror.sync("Chinese")
+
+    assert stats == {"added": 3, "updated": 0, "removed": 0, "unchanged": 0}
+    assert client.fetched_ids == [1, 2, 3]
+
+
+def test_incremental_sync_only_fetches_changed_notes(mirror, client):
+    mirror.sync("Chinese")
+    client.fetched_ids.clear()
+
+    client.set_note(2, "你们", mod=200, english="you (plural)")
+    client.set_note(4, "考试", mod=200)
+    del client.notes[3]
+
+    stats = mirror.sync("Chinese")
+
+    assert stats == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert client.fetched_ids == [4, 2]
+    assert mirror.find_by_word("Chinese", "你们")[0].english == "you (plural)"
+    assert mirror.find_by_word("Chinese", "学习") == []
+    assert mirror.find_by_word("Chinese", "考试")[0].anki_note_id == 4
+
+
+def test_full_sync_refetches_everything(mirror, client):
+    mirror.sync("Chinese")
+    client.fetched_ids.clear()
+
+    stats = mirror.sync("Chinese", full=True)
+
+    assert stats["updated"] == 3
+    assert client.fetched_ids == [1, 2, 3]
+
+
+def test_lookups(mirror, client):
+    client.set_note(4, "你好吗", mod=100, deck="Other")
+    mirror.sync("Chinese")
+    mirror.sync("Other")
+
+    exact = mirror.find_by_word("Chinese", "你好")
+    assert [card.anki_note_id for card in exact] == [1]
+    assert exact[0].pinyin == "pin yin"
+
+    similar = mirror.find_similar("Chinese", "你")
+    assert [card.word for card in similar] == ["你好", "你们"]
+
+    # Lookups are scoped to the given deck
+    assert mirror.find_by_word("Other", "你好") == []
+    assert [card.word for card in mirror.find_similar("Other", "你")] == ["你好吗"]
+    assert mirror.find_by_word("Chinese", "你好吗") == []
+
+    notes = mirror.get_notes([3, 1, 99])
+    assert sorted(notes) == [1, 3]
+
+
+def test_try_sync_falls_back_to_mirror(mirror, client):
+    assert mirror.try_sync("Chinese")
+
+    client.available = False
+    assert not mirror.try_sync("Chinese")
+    assert mirror.last_synced_at("Chinese") is not None
+    assert len(mirror.find_by_word("Chinese", "学习")) == 1
+
+
+def test_sync_if_stale_only_syncs_empty_or_stale_mirrors(mirror, client):
+    assert mirror.sync_if_stale("Chinese")
+    client.fetched_ids.clear()
+    client.set_note(4, "考试", mod=200)
+
+    assert not mirror.sync_if_stale("Chinese")
+    assert client.fetched_ids == []
+
+    assert mirror.sync_if_stale("Chinese", max_age=0)
+    assert client.fetched_ids == [4]
+
+
+def test_find_by_word_ignores_html_in_the_field(mirror, client):
+    client.set_note(4, "<b>考试</b>&nbsp;", mod=100)
+    mirror.sync("Chinese")
+    client.queries.clear()
+
+    assert [card.anki_note_id for card in mirror.find_by_word("Chinese", "考试")] == [4]
+    assert client.queries == []
+
+
+def test_find_by_word_asks_anki_on_a_miss(mirror, client):
+    mirror.sync("Chinese")
+    client.queries.clear()
+
+    # A note added since the last sync
+    client.set_note(4, "考试", mod=200)
+    assert [card.anki_note_id for card in mirror.find_by_word("Chinese", "考试")] == [4]
+    assert client.queries == ['"deck:Chinese" Chinese:考试']
+
+    client.available = False
+    assert mirror.find_by_word("Chinese", "汉字") == []
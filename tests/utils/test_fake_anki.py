@@ -0,0 +1,118 @@
+import pytest
+
+from tutor.llm.models import CantoneseFlashcard, MandarinFlashcard
+from tutor.utils.anki import AnkiAction, AnkiConnectClient, AnkiConnectError
+from tutor.utils.fake_anki import (
+    DEFAULT_SYNTHETIC_DECK,
+    FakeAnkiCollection,
+    FakeAnkiServer,
+)
+from tutor.utils.retry import CircuitBreaker, RetryPolicy
+
+
+@pytest.fixture
+def collection():
+    collection = FakeAnkiCollection()
+    collection.seed(500, seed=1)
+    return collection
+
+
+@pytest.fixture
+def client(collection):
+    with FakeAnkiServer(collection) as server:
+        with AnkiConnectClient(
+            address=server.address,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breaker=CircuitBreaker("fake Anki"),
+        ) as client:
+            yield client
+
+
+def _add_note(collection, deck, word, **fields):
+    collection.handle("createDeck", {"deck": deck})
+    return collection.handle(
+        "addNote",
+        {
+            "note": {
+                "deckName": deck,
+                "modelName": "chinese-tutor-mandarin",
+                "fields": {"Chinese": word, **fields},
+            }
+        },
+    )
+
+
+def test_seed_is_deterministic():
+    first, second = FakeAnkiCollection(), FakeAnkiCollection()
+    first.seed(50, seed=7)
+    second.seed(50, seed=7)
+
+    assert [n["fields"] for n in first.notes.values()] == [
+        n["fields"] for n in second.notes.values()
+    ]
+    words = [n["fields"]["Chinese"] for n in first.notes.values()]
+    assert len(set(words)) == len(words)
+
+
+def test_search_syntax(collection):
+    collection.ensure_models()
+    nihao = _add_note(collection, "Other::Sub", "你好_*")
+    _add_note(collection, "Other", "再见")
+
+    assert len(collection.find(f'deck:"{DEFAULT_SYNTHETIC_DECK}"')) == 500
+    assert collection.find('"deck:Other" Chinese:你好\\_\\*') == [nihao]
+    assert collection.find("deck:Other -Chinese:再见") == [nihao]
+    assert len(collection.find("deck:Other (Chinese:你* OR Chinese:再*)")) == 2
+    assert collection.find("note:chinese-tutor-cantonese deck:Other") == []
+    assert len(collection.find("deck:Other")) == 2
+
+    rated = collection.find(f'(deck:"{DEFAULT_SYNTHETIC_DECK}" rated:7:1)')
+    assert rated
+    for note_id in rated:
+        days_ago, ease = collection.notes[note_id]["lastReview"]
+        assert days_ago < 7 and ease == 1
+
+
+def test_client_reads_synthetic_notes(client):
+    cards = list(client.iter_notes(f'deck:"{DEFAULT_SYNTHETIC_DECK}"', chunk_size=64))
+
+    assert len(cards) == 500
+    assert {type(card) for card in cards} == {MandarinFlashcard, CantoneseFlashcard}
+    assert all(card.word for card in cards)
+
+
+def test_client_adds_and_updates_notes(client, collection):
+    card = MandarinFlashcard(
+        word="松弛感",
+        pinyin="sōng chí gǎn",
+        english="sense of ease",
+        sample_usage="她有一种松弛感。",
+        sample_usage_english="She has a sense of ease.",
+    )
+    note = {
+        "deckName": DEFAULT_SYNTHETIC_DECK,
+        "modelName": "chinese-tutor-mandarin",
+        "fields": client._build_fields(card),
+    }
+
+    assert client.send_request(AnkiAction.CAN_ADD_NOTES, {"notes": [note]}) == [True]
+    note_id = client.send_request(AnkiAction.ADD_NOTE, {"note": note})
+    with pytest.raises(AnkiConnectError, match="duplicate"):
+        client.send_request(AnkiAction.ADD_NOTE, {"note": note})
+
+    card.english = "relaxed vibe"
+    client.update_flashcard(note_id, card)
+    assert client.get_note_fields(note_id)["English"] == "relaxed vibe"
+    assert collection.notes[note_id]["fields"]["English"] == "relaxed vibe"
+
+
+def test_multi_reports_errors_per_action(client):
+    results = client.send_multi(
+        [
+            (AnkiAction.DECK_NAMES, None),
+            (AnkiAction.MODEL_FIELD_NAMES, {"modelName": "missing"}),
+        ]
+    )
+
+    assert DEFAULT_SYNTHETIC_DECK in results[0]["result"]
+    assert results[1]["error"] == "model was not found: missing"
@@ -0,0 +1,90 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from tutor.utils import media
+from tutor.utils.anki import AnkiConnectClient
+from tutor.utils.media import MediaIndex, get_audio_filename, get_sound_tag
+
+
+@pytest.fixture
+def media_dir(tmp_path):
+    (tmp_path / "chinese-tutor-existing.wav").write_bytes(b"RIFF")
+    (tmp_path / "other.mp3").write_bytes(b"ID3")
+    return tmp_path
+
+
+def test_get_audio_filename():
+    md5 = hashlib.md5("你好".encode()).hexdigest()
+    assert get_audio_filename("你好") == f"chinese-tutor-{md5}.wav"
+    assert get_audio_filename("你好", "cantonese") != get_audio_filename("你好")
+
+
+def test_index_scans_folder_once(media_dir):
+    index = MediaIndex(media_dir)
+    with patch("os.scandir", wraps=__import__("os").scandir) as scandir:
+        assert "chinese-tutor-existing.wav" in index
+        assert "other.mp3" in index
+        assert "missing.wav" not in index
+        index.add("missing.wav")
+        assert "missing.wav" in index
+
+    assert scandir.call_count == 1
+
+
+def test_index_skips_empty_generated_audio(media_dir):
+    (media_dir / "chinese-tutor-empty.wav").write_bytes(b"")
+    (media_dir / "empty.txt").write_bytes(b"")
+
+    index = MediaIndex(media_dir)
+
+    assert "chinese-tutor-empty.wav" not in index
+    assert "empty.txt" in index
+
+
+def test_in_collection(media_dir, tmp_path_factory):
+    index = MediaIndex(media_dir)
+
+    assert (
+        index.in_collection(str(media_dir / "chinese-tutor-existing.wav"))
+        == "chinese-tutor-existing.wav"
+    )
+    assert index.in_collection(str(media_dir / "not-there.wav")) is None
+    elsewhere = tmp_path_factory.mktemp("elsewhere") / "chinese-tutor-existing.wav"
+    assert index.in_collection(str(elsewhere)) is None
+
+
+def test_build_audio_references_existing_media(media_dir):
+    index = MediaIndex(media_dir)
+    with patch("tutor.utils.media.get_media_index", return_value=index):
+        fields, attachments = AnkiConnectClient._build_audio(
+            str(media_dir / "chinese-tutor-existing.wav"), "/tmp/new/word.wav"
+        )
+
+    assert fields == {
+        "Sample Usage (Audio)": get_sound_tag("chinese-tutor-existing.wav")
+    }
+    assert attachments == [
+        {
+            "path": "/tmp/new/word.wav",
+            "filename": "word.wav",
+            "fields": ["Word (Audio)"],
+        }
+    ]
+
+
+def test_media_index_is_created_once_across_threads(monkeypatch):
+    monkeypatch.setattr(media, "_media_index", None)
+    barrier = threading.Barrier(8)
+
+    def get():
+        barrier.wait()
+        return media.get_media_index()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        indexes = list(executor.map(lambda _: get(), range(8)))
+
+    assert all(index is indexes[0] for index in indexes)
@@ -0,0 +1,66 @@
+from tutor.llm.models import CantoneseFlashcard, MandarinFlashcard
+from tutor.utils.note_table import NoteTable
+
+
+def _note_info(note_id, model_name, **fields):
+    return {
+        "noteId": note_id,
+        "modelName": model_name,
+        "fields": {name: {"value": value} for name, value in fields.items()},
+    }
+
+
+MANDARIN_NOTE = _note_info(
+    1,
+    "chinese-tutor-mandarin",
+    Chinese="你好",
+    Pinyin="nǐ hǎo",
+    English="hello",
+    **{
+        "Sample Usage": "你好吗？",
+        "Sample Usage (English)": "How are you?",
+        "Related Words": "• 您好 (nín hǎo) - hello (polite) [formal variant]",
+    },
+)
+CANTONESE_NOTE = _note_info(
+    2,
+    "chinese-tutor-cantonese",
+    Chinese="你好",
+    Jyutping="nei5 hou2",
+    English="hello",
+    **{"Sample Usage": "你好嗎？", "Sample Usage (English)": "How are you?"},
+)
+
+
+def test_columns_are_filled_from_note_infos():
+    table = NoteTable.from_note_infos([MANDARIN_NOTE, {}, CANTONESE_NOTE])
+
+    assert len(table) == 2
+    assert list(table.note_ids) == [1, 2]
+    assert table.column("English") == ["hello", "hello"]
+    # Fields a note lacks are empty strings
+    assert table.column("Pinyin") == ["nǐ hǎo", ""]
+    assert table.column("Jyutping") == ["", "nei5 hou2"]
+    assert table.column("Missing") == ["", ""]
+    assert [table.pronunciation(row) for row in table] == ["nǐ hǎo", "nei5 hou2"]
+    assert table.row_of(2) == 1
+
+
+def test_field_values_are_interned():
+    table = NoteTable.from_note_infos([MANDARIN_NOTE, CANTONESE_NOTE])
+
+    assert table.get(0, "English") is table.get(1, "English")
+    assert table.model_names[0] == "chinese-tutor-mandarin"
+
+
+def test_rows_become_full_flashcards_on_demand():
+    table = NoteTable.from_note_infos([MANDARIN_NOTE, CANTONESE_NOTE])
+
+    mandarin = table.to_flashcard(0)
+    assert isinstance(mandarin, MandarinFlashcard)
+    assert mandarin.anki_note_id == 1
+    assert mandarin.related_words[0].pinyin == "nín hǎo"
+
+    cantonese = table.to_flashcard(table.row_of(2))
+    assert isinstance(cantonese, CantoneseFlashcard)
+    assert cantonese.jyutping == "nei5 hou2"
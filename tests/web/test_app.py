@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from tutor.cli_global_state import set_model
+from tutor.web import app as web_app
+
+RESPONSE = json.dumps(
+    {"next_line_zh": "好的", "next_line_pinyin": "hǎo de", "next_line_en": "OK"},
+    ensure_ascii=False,
+)
+
+
+@pytest.fixture
+def client():
+    set_model("gpt-4o")
+    return web_app.create_app().test_client()
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def test_stream_sends_field_deltas_then_the_complete_response(client, monkeypatch):
+    chunks = [RESPONSE[i : i + 4] for i in range(0, len(RESPONSE), 4)]
+    monkeypatch.setattr(web_app, "stream_chat_completion", lambda **p: iter(chunks))
+
+    response = client.post("/api/respond/stream", json={"response": "你好"})
+
+    assert response.mimetype == "text/event-stream"
+    events = _events(response.get_data(as_text=True))
+    zh = "".join(
+        data["text"]
+        for event, data in events
+        if event == "delta" and data["field"] == "next_line_zh"
+    )
+    assert zh == "好的"
+    assert events[-1] == ("done", json.loads(RESPONSE))
+
+
+def test_stream_falls_back_when_generation_fails(client, monkeypatch):
+    def fail(**params):
+        yield '{"next_line_zh": "好'
+        raise ConnectionError("lost")
+
+    monkeypatch.setattr(web_app, "stream_chat_completion", fail)
+
+    response = client.post("/api/respond/stream", json={"response": "你好"})
+
+    events = _events(response.get_data(as_text=True))
+    assert events[0] == ("delta", {"field": "next_line_zh", "text": "好"})
+    assert events[-1] == (
+        "done",
+        web_app._FALLBACK_DIALOGUE_RESPONSE.model_dump(),
+    )